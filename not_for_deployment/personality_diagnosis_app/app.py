@@ -2,414 +2,21 @@ import streamlit as st
 import datetime
 import time
 import random
-from personality_diagnosis_app.utils import date_utils, display_utils
-from personality_diagnosis_app.fortune_systems import shichuu_suimei, onmyo_gogyo, shukuyo, western_astrology, animal_fortune, kyusei_kigaku
+import os
+from personality_diagnosis_app.utils import (
+    date_utils, display_utils, fragments, profiling, result_templates, session_memo, static_assets
+)
+from personality_diagnosis_app.fortune_systems import engine, instrumentation, result_store
 import streamlit.components.v1 as components
 
-# カスタムCSS
-def load_css():
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@300;400;500;700&display=swap');
-    
-    :root {
-        --primary: #6C63FF;
-        --secondary: #6EC5FF;
-        --accent: #FF6584;
-        --background: #111132;
-        --text: #E8F3F6;
-        --card-bg: rgba(18, 18, 60, 0.6);
-        --card-border: rgba(108, 99, 255, 0.3);
-    }
-    
-    html, body, [class*="css"] {
-        font-family: 'Noto Sans JP', sans-serif;
-        color: var(--text);
-    }
-    
-    .stApp {
-        background: linear-gradient(135deg, var(--background), #232351);
-    }
-    
-    /* カスタムフォントヘッダー */
-    h1, h2, h3, h4 {
-        font-family: 'Noto Sans JP', sans-serif;
-        font-weight: 700;
-        color: white;
-        text-shadow: 0 2px 15px rgba(108, 99, 255, 0.4);
-    }
-    
-    h1 {
-        font-size: 3rem !important;
-        letter-spacing: -0.5px;
-        background: linear-gradient(to right, #FFFFFF, #6EC5FF);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 0 !important;
-    }
-    
-    h2 {
-        font-size: 1.8rem !important;
-        opacity: 0.9;
-    }
-    
-    h3 {
-        font-size: 1.5rem !important;
-        color: white;
-        margin-top: 2rem !important;
-    }
-    
-    /* 診断ボタン */
-    .stButton>button {
-        background: linear-gradient(135deg, var(--primary), var(--secondary));
-        color: white;
-        border: none;
-        padding: 0.6rem 2rem;
-        border-radius: 50px;
-        font-weight: 500;
-        font-size: 1.1rem;
-        box-shadow: 0 6px 15px rgba(108, 99, 255, 0.4);
-        transition: all 0.3s ease;
-        width: 100%;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 10px 25px rgba(108, 99, 255, 0.6);
-    }
-    
-    .stButton>button:active {
-        transform: translateY(0);
-    }
-    
-    /* 日付入力 */
-    .date-picker-container {
-        background: var(--card-bg);
-        border: 1px solid var(--card-border);
-        border-radius: 18px;
-        padding: 20px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-        margin-bottom: 20px;
-    }
-    
-    /* 結果カード */
-    .result-card {
-        background: var(--card-bg);
-        border: 1px solid var(--card-border);
-        border-radius: 18px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .result-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(to right, var(--primary), var(--secondary));
-        border-radius: 18px 18px 0 0;
-    }
-    
-    .result-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.3);
-    }
-    
-    .result-title {
-        font-size: 1.4rem;
-        font-weight: 700;
-        margin-bottom: 15px;
-        padding-bottom: 15px;
-        border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        color: white;
-    }
-    
-    .result-content {
-        font-size: 1.1rem;
-        color: rgba(255, 255, 255, 0.9);
-    }
-    
-    /* プログレスバー */
-    .stProgress > div > div {
-        background-color: var(--primary);
-        border-radius: 100px;
-        height: 8px;
-    }
-    
-    .stProgress {
-        height: 8px;
-    }
-    
-    /* パーティクルコンテナ */
-    .particles-container {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        z-index: -1;
-        pointer-events: none;
-    }
-    
-    /* 結果表示用 - ゴーストアニメーションを削除 */
-    .result-element {
-        opacity: 1; /* 常に表示 */
-        margin-bottom: 20px;
-    }
-    
-    /* 結果ヘッダー装飾 */
-    .result-header {
-        text-align: center;
-        margin: 40px 0;
-        position: relative;
-    }
-    
-    .result-header::before, .result-header::after {
-        content: "";
-        position: absolute;
-        top: 50%;
-        width: 100px;
-        height: 2px;
-        background: linear-gradient(to right, rgba(108, 99, 255, 0), rgba(108, 99, 255, 0.8));
-    }
-    
-    .result-header::before {
-        left: 20%;
-    }
-    
-    .result-header::after {
-        right: 20%;
-        background: linear-gradient(to left, rgba(108, 99, 255, 0), rgba(108, 99, 255, 0.8));
-    }
-    
-    /* DateInputのスタイル上書き */
-    .stDateInput > div {
-        background-color: rgba(30, 30, 70, 0.5) !important;
-        border-radius: 10px !important;
-        border: 1px solid rgba(108, 99, 255, 0.3) !important;
-        color: white !important;
-    }
-    
-    .stDateInput input {
-        color: white !important;
-    }
-    
-    /* データポイント */
-    .data-point {
-        margin-bottom: 12px;
-        display: flex;
-        align-items: center;
-    }
-    
-    .data-label {
-        font-weight: 500;
-        margin-right: 10px;
-        color: rgba(255, 255, 255, 0.7);
-    }
-    
-    .data-value {
-        font-weight: 700;
-        font-size: 1.1rem;
-        color: white;
-    }
-    
-    /* アニメーションコンテナ */
-    .animation-container {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        background-color: rgba(17, 17, 50, 0.95);
-        z-index: 9999;
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-    }
-    
-    /* アニメーションコンテンツ */
-    .animation-content {
-        text-align: center;
-    }
-    
-    /* 分析テキスト */
-    .analysis-text {
-        font-size: 1.5rem;
-        font-weight: 500;
-        color: white;
-        margin-top: 20px;
-    }
-    
-    .shimmer {
-        background: linear-gradient(to right, rgba(255,255,255,0) 0%, rgba(255,255,255,0.8) 50%, rgba(255,255,255,0) 100%);
-        background-size: 200% auto;
-        animation: shimmer 2s infinite linear;
-        background-clip: text;
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    
-    @keyframes shimmer {
-        0% {background-position: -100% 0;}
-        100% {background-position: 100% 0;}
-    }
-    
-    /* グロー効果 */
-    .glow {
-        text-shadow: 0 0 5px rgba(108, 99, 255, 0.8), 0 0 10px rgba(108, 99, 255, 0.5);
-    }
-    
-    /* セクションセパレーター */
-    .section-divider {
-        display: flex;
-        align-items: center;
-        margin: 2rem 0;
-    }
-    
-    .section-divider::before, .section-divider::after {
-        content: "";
-        flex: 1;
-        height: 1px;
-        background: linear-gradient(to right, rgba(108, 99, 255, 0), rgba(108, 99, 255, 0.5), rgba(108, 99, 255, 0));
-    }
-    
-    .section-divider span {
-        padding: 0 1rem;
-        color: rgba(255, 255, 255, 0.7);
-        font-size: 0.9rem;
-    }
-    
-    /* フッター */
-    .footer {
-        text-align: center;
-        padding: 20px;
-        margin-top: 50px;
-        font-size: 0.9rem;
-        color: rgba(255, 255, 255, 0.5);
-    }
+# 占術キーと診断関数の対応（有効な占術のみ、各占術のモジュールは最初の診断時に読み込む）
+# 表示内容は registry の描画関数または result_templates.CARD_SPECS で定義
+DIAGNOSERS = engine.SYSTEMS
 
-    /* 結果表示用フラグ表示 */
-    .debug-info {
-        background: rgba(255, 255, 255, 0.1);
-        padding: 5px 10px;
-        border-radius: 5px;
-        font-size: 0.8rem;
-        margin-bottom: 10px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# パーティクルアニメーション用JS
-def add_particles():
-    particles_js = """
-    <div class="particles-container" id="particles-js"></div>
-    <script src="https://cdn.jsdelivr.net/particles.js/2.0.0/particles.min.js"></script>
-    <script>
-        document.addEventListener("DOMContentLoaded", function() {
-            particlesJS("particles-js", {
-                "particles": {
-                    "number": {
-                        "value": 80,
-                        "density": {
-                            "enable": true,
-                            "value_area": 800
-                        }
-                    },
-                    "color": {
-                        "value": ["#6C63FF", "#6EC5FF", "#A594F9"]
-                    },
-                    "shape": {
-                        "type": "circle",
-                        "stroke": {
-                            "width": 0,
-                            "color": "#000000"
-                        }
-                    },
-                    "opacity": {
-                        "value": 0.3,
-                        "random": true,
-                        "anim": {
-                            "enable": true,
-                            "speed": 1,
-                            "opacity_min": 0.1,
-                            "sync": false
-                        }
-                    },
-                    "size": {
-                        "value": 3,
-                        "random": true,
-                        "anim": {
-                            "enable": true,
-                            "speed": 2,
-                            "size_min": 0.1,
-                            "sync": false
-                        }
-                    },
-                    "line_linked": {
-                        "enable": true,
-                        "distance": 150,
-                        "color": "#6C63FF",
-                        "opacity": 0.2,
-                        "width": 1
-                    },
-                    "move": {
-                        "enable": true,
-                        "speed": 1,
-                        "direction": "none",
-                        "random": true,
-                        "straight": false,
-                        "out_mode": "out",
-                        "bounce": false,
-                        "attract": {
-                            "enable": false,
-                            "rotateX": 600,
-                            "rotateY": 1200
-                        }
-                    }
-                },
-                "interactivity": {
-                    "detect_on": "canvas",
-                    "events": {
-                        "onhover": {
-                            "enable": true,
-                            "mode": "grab"
-                        },
-                        "onclick": {
-                            "enable": true,
-                            "mode": "push"
-                        },
-                        "resize": true
-                    },
-                    "modes": {
-                        "grab": {
-                            "distance": 140,
-                            "line_linked": {
-                                "opacity": 0.4
-                            }
-                        },
-                        "push": {
-                            "particles_nb": 4
-                        }
-                    }
-                },
-                "retina_detect": true
-            });
-        });
-    </script>
-    """
-    st.markdown(particles_js, unsafe_allow_html=True)
+# ページ
+SINGLE_PAGE = "個人診断"
+BULK_PAGE = "一括診断"
+ANALYTICS_PAGE = "分布分析"
 
 # 分析アニメーション
 def show_analysis_animation():
@@ -476,20 +83,48 @@ def show_analysis_animation():
     time.sleep(4.5)  # アニメーション時間に合わせて調整
 
 def main():
-    # セッション状態を初期化
-    if 'analyzed' not in st.session_state:
-        st.session_state.analyzed = False
-        st.session_state.birth_date = None
+    # スクリプト全体の再実行で送信した差分のバイト数を記録する（フラグメントだけの再実行は各フラグメントで記録）
+    with fragments.measure(fragments.APP_SCOPE):
+        show_page()
+
+def show_page():
+    # セッション状態を初期化（生年月日は序数のみを保持し、結果HTMLは共有キャッシュから参照する）
+    if 'birth_ordinal' not in st.session_state:
+        st.session_state.birth_ordinal = None
     
-    # CSSとパーティクルの読み込み
-    load_css()
-    add_particles()
+    # CSSとパーティクルの読み込み（静的アセットとして一度だけ配信）
+    static_assets.inject_static_assets()
     
     # ヘッダー（パルスアニメーション削除）
     st.markdown('<h1>性格診断システム</h1>', unsafe_allow_html=True)
+    
+    page = st.sidebar.radio("ページ", (SINGLE_PAGE, BULK_PAGE, ANALYTICS_PAGE))
+    if page == BULK_PAGE:
+        show_bulk_page()
+    elif page == ANALYTICS_PAGE:
+        show_analytics_page()
+    else:
+        show_single_page()
+    
+    # エレガントなフッター
+    st.markdown("""
+    <div class="footer">
+        <p>© 2023 性格診断システム | 高精度アルゴリズムによる分析</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def show_single_page():
     st.markdown('<h2>生年月日から導き出す、あなただけの個性</h2>', unsafe_allow_html=True)
     
-    # 日付入力セクション
+    show_input_panel()
+    
+    # 診断済みの生年月日があれば結果を表示
+    if st.session_state.birth_ordinal is not None:
+        run_diagnosis(datetime.date.fromordinal(st.session_state.birth_ordinal))
+
+# 日付入力セクション（日付の変更ではこのセクションだけを再実行し、CSSや結果カードは再送信しない）
+@fragments.fragment("input")
+def show_input_panel():
     st.markdown('<div class="date-picker-container">', unsafe_allow_html=True)
     col1, col2 = st.columns([1, 2])
     
@@ -503,11 +138,10 @@ def main():
         
         if st.button("診断を開始"):
             # セッション状態に保存
-            st.session_state.analyzed = True
-            st.session_state.birth_date = birth_date
+            st.session_state.birth_ordinal = birth_date.toordinal()
             
             show_analysis_animation()  # 分析アニメーション表示
-            st.rerun()  # 画面を再読み込み
+            st.rerun()  # 結果セクションを含む画面全体を再読み込み
     
     with col2:
         st.markdown("""
@@ -519,160 +153,179 @@ def main():
         """, unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
+
+def show_bulk_page():
+    # 一括診断はベクトル化エンジン（全占術の対応表）を使うため、ページを開いたときに読み込む
+    from personality_diagnosis_app.utils import bulk_utils
     
-    # 分析済みフラグがあれば結果を表示
-    if st.session_state.analyzed and st.session_state.birth_date:
-        run_diagnosis(st.session_state.birth_date)
+    # 終了したセッションが残した出力ファイルを削除する
+    bulk_utils.sweep_exports()
     
-    # エレガントなフッター
-    st.markdown("""
-    <div class="footer">
-        <p>© 2023 性格診断システム | 高精度アルゴリズムによる分析</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-def run_diagnosis(birth_date):
-    # 結果ヘッダー
-    st.markdown(f"""
-    <div class="result-header result-element">
-        <h2>{birth_date.year}年{birth_date.month}月{birth_date.day}日生まれの診断結果</h2>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown('<h2>名簿の生年月日から全員をまとめて診断</h2>', unsafe_allow_html=True)
     
-    # セパレーター
-    st.markdown('<div class="section-divider result-element"><span>診断結果</span></div>', unsafe_allow_html=True)
+    uploaded = st.file_uploader("📄 名簿（CSV）をアップロード", type=["csv"])
+    if uploaded is None:
+        st.info("生年月日の列を含むCSVファイルをアップロードしてください（例: 社員番号,氏名,生年月日）")
+        return
     
-    # 2列レイアウトで結果表示
-    col1, col2 = st.columns(2)
+    columns = bulk_utils.read_columns(uploaded)
+    if not columns:
+        st.error("CSVのヘッダー行を読み込めませんでした")
+        return
     
+    col1, col2 = st.columns(2)
     with col1:
-        # 四柱推命
-        try:
-            result = shichuu_suimei.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">四柱推命</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-label">日柱天干：</span>
-                        <span class="data-value glow">{result.get('ten_kan', '不明')}</span>
-                    </div>
-                    <div class="data-point">
-                        <span class="data-label">日柱十二運：</span>
-                        <span class="data-value">{result.get('juu_ni_shi', '不明')}</span>
-                    </div>
-                    <div class="data-point">
-                        <span class="data-label">月干の蔵干宿命星：</span>
-                        <span class="data-value">{result.get('tsuhen_sei', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"四柱推命データ取得エラー: {str(e)}")
+        date_column = st.selectbox("生年月日の列", columns, index=columns.index(bulk_utils.guess_date_column(columns)))
+    with col2:
+        fmt = st.selectbox("出力形式", bulk_utils.available_formats(), format_func=str.upper)
+    
+    if st.button("一括診断を開始"):
+        progress = st.progress(0.0, text="診断中...")
         
-        # 宿曜
-        try:
-            result = shukuyo.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">宿曜</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-value glow">{result.get('shukuyo', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"宿曜データ取得エラー: {str(e)}")
+        def on_progress(rows, invalid_rows):
+            # 読み込み済みのバイト数から進捗を求める（総行数は事前に分からないため）
+            ratio = min(uploaded.tell() / max(uploaded.size, 1), 1.0)
+            progress.progress(ratio, text=f"{rows:,}件を診断済み")
         
-        # 陰陽五行
         try:
-            result = onmyo_gogyo.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">陰陽五行</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-value glow">{result.get('gogyo', '不明')}の{result.get('inyo', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            export = bulk_utils.export_roster(bulk_utils.iter_roster_chunks(uploaded), date_column, fmt, on_progress)
         except Exception as e:
-            st.error(f"陰陽五行データ取得エラー: {str(e)}")
-    
-    with col2:
-        # 九星気学
-        try:
-            result = kyusei_kigaku.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">九星気学</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-label">本命星：</span>
-                        <span class="data-value glow">{result.get('honmei_sei', '不明')}</span>
-                    </div>
-                    <div class="data-point">
-                        <span class="data-label">月命星：</span>
-                        <span class="data-value">{result.get('getsu_mei_sei', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"九星気学データ取得エラー: {str(e)}")
+            st.error(f"一括診断エラー: {str(e)}")
+            return
         
-        # 西洋占星術
-        try:
-            result = western_astrology.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">西洋占星術</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-label">太陽：</span>
-                        <span class="data-value glow">{result.get('sun_sign', '不明')}</span>
-                    </div>
-                    <div class="data-point">
-                        <span class="data-label">月：</span>
-                        <span class="data-value">{result.get('moon_sign', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"西洋占星術データ取得エラー: {str(e)}")
+        progress.progress(1.0, text=f"{export.rows:,}件の診断が完了しました")
         
-        # 動物占い
-        try:
-            result = animal_fortune.diagnose(birth_date)
-            st.markdown(f"""
-            <div class="result-card result-element">
-                <div class="result-title">動物占い</div>
-                <div class="result-content">
-                    <div class="data-point">
-                        <span class="data-value glow">{result.get('type', '不明')}となる{result.get('animal', '不明')}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"動物占いデータ取得エラー: {str(e)}")
-    
-    # シェアボタン（機能は付けていない）
-    st.markdown("""
-    <div style="text-align: center; margin-top: 40px;" class="result-element">
-        <button style="background: linear-gradient(135deg, #6C63FF, #6EC5FF); color: white; border: none; padding: 10px 25px; border-radius: 50px; font-weight: 500; margin: 0 10px; box-shadow: 0 4px 15px rgba(108, 99, 255, 0.4);">
-            結果を保存
-        </button>
-        <button style="background: rgba(255, 255, 255, 0.1); color: white; border: 1px solid rgba(255, 255, 255, 0.2); padding: 10px 25px; border-radius: 50px; font-weight: 500; margin: 0 10px;">
-            結果をシェア
-        </button>
-    </div>
-    """, unsafe_allow_html=True)
+        # ダウンロードボタンの操作で再実行されても結果を保持する
+        previous = st.session_state.get("bulk_export")
+        if previous is not None:
+            bulk_utils.discard_export(previous)
+        st.session_state.bulk_export = export
+    
+    export = st.session_state.get("bulk_export")
+    if export is not None and not os.path.exists(export.path):
+        # 一定時間が経った出力ファイルは削除される（bulk_utils.EXPORT_MAX_AGE）
+        del st.session_state.bulk_export
+        st.info("診断結果の保存期間が過ぎたため、もう一度一括診断を開始してください")
+        export = None
+    if export is not None:
+        if export.invalid_rows:
+            st.warning(f"生年月日を読み取れなかった{export.invalid_rows:,}件は診断結果を空欄にしています")
+        
+        extension, mime = bulk_utils.EXPORT_FORMATS[export.fmt]
+        with open(export.path, "rb") as f:
+            st.download_button(
+                f"診断結果をダウンロード（{export.rows:,}件）",
+                data=f,
+                file_name=f"diagnosis_results{extension}",
+                mime=mime,
+            )
+
+def show_analytics_page():
+    from personality_diagnosis_app.utils import analytics_utils, bulk_utils
+    
+    st.markdown('<h2>生年月日の集団における診断結果の分布</h2>', unsafe_allow_html=True)
+    
+    source = st.radio("対象", ("期間", "名簿"), horizontal=True)
+    if source == "期間":
+        col1, col2 = st.columns(2)
+        with col1:
+            start = st.date_input("開始日", datetime.date(1980, 1, 1),
+                                  min_value=datetime.date(1900, 1, 1), max_value=datetime.datetime.now().date())
+        with col2:
+            end = st.date_input("終了日", datetime.date(1989, 12, 31),
+                                min_value=datetime.date(1900, 1, 1), max_value=datetime.datetime.now().date())
+        if end < start:
+            st.error("終了日は開始日以降の日付を選択してください")
+            return
+        total = (end - start).days + 1
+        get_histograms = lambda names: analytics_utils.range_histograms(names, start, end)
+        get_crosstab = lambda row, column: analytics_utils.range_crosstab(row, column, start, end)
+    else:
+        uploaded = st.file_uploader("📄 名簿（CSV）をアップロード", type=["csv"], key="analytics_roster")
+        if uploaded is None:
+            st.info("生年月日の列を含むCSVファイルをアップロードしてください")
+            return
+        columns = bulk_utils.read_columns(uploaded)
+        if not columns:
+            st.error("CSVのヘッダー行を読み込めませんでした")
+            return
+        date_column = st.selectbox("生年月日の列", columns, index=columns.index(bulk_utils.guess_date_column(columns)))
+        data = uploaded.getvalue()
+        ordinals, invalid_rows = analytics_utils.roster_ordinals(data, date_column)
+        if invalid_rows:
+            st.warning(f"生年月日を読み取れなかった{invalid_rows:,}件は集計から除いています")
+        total = len(ordinals)
+        get_histograms = lambda names: analytics_utils.roster_histograms(data, date_column, names)
+        get_crosstab = lambda row, column: analytics_utils.roster_crosstab(data, date_column, row, column)
+    
+    st.caption(f"対象: {total:,}件の生年月日")
+    
+    show_distribution_panel(get_histograms)
+    show_crosstab_panel(get_crosstab)
+
+# 分布のグラフ（診断項目の選択ではこのセクションだけを再実行する）
+@fragments.fragment("distributions")
+def show_distribution_panel(get_histograms):
+    from personality_diagnosis_app.fortune_systems import analytics
+    from personality_diagnosis_app.utils import analytics_utils
+    
+    options = analytics.attribute_names()
+    names = st.multiselect(
+        "診断項目",
+        options,
+        default=[name for name in analytics_utils.DEFAULT_ATTRIBUTES if name in options],
+        format_func=analytics_utils.attribute_title,
+    )
+    if names:
+        analytics_utils.show_distributions(get_histograms(tuple(names)))
+
+# クロス集計（行・列の選択ではこのセクションだけを再実行する）
+@fragments.fragment("crosstab")
+def show_crosstab_panel(get_crosstab):
+    from personality_diagnosis_app.fortune_systems import analytics
+    from personality_diagnosis_app.utils import analytics_utils
+    
+    st.markdown("**クロス集計**")
+    choices = analytics.attribute_names(include_birth_year=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        row = st.selectbox("行", choices, index=choices.index(analytics.BIRTH_YEAR),
+                           format_func=analytics_utils.attribute_title)
+    with col2:
+        default_column = "kyusei_kigaku.honmei_sei" if "kyusei_kigaku.honmei_sei" in choices else choices[-1]
+        column = st.selectbox("列", choices, index=choices.index(default_column),
+                              format_func=analytics_utils.attribute_title)
+    st.dataframe(get_crosstab(row, column), use_container_width=True)
+
+def render_diagnosis(ordinal):
+    html, _ = render_diagnosis_section(ordinal)
+    return html
+
+def render_diagnosis_section(ordinal):
+    # 全占術の診断結果を1つの構造化データにまとめる
+    # 戻り値は (結果HTML, エラーなく診断できたか)
+    # （PDA_RESULT_STORE を指定した場合は、他のプロセスが保存した結果を使う）
+    birth_date = datetime.date.fromordinal(ordinal)
+    results = result_store.load(ordinal)
+    errors = {}
+    if results is None:
+        results = {}
+        for key, diagnose in DIAGNOSERS.items():
+            try:
+                results[key] = diagnose(birth_date)
+            except Exception as e:
+                errors[key] = str(e)
+        if not errors:
+            result_store.save(ordinal, results)
+    
+    with instrumentation.timer("render", "result_section"):
+        section = result_templates.ResultSection(birth_date, results, errors)
+        return result_templates.render_result_section(section), not errors
+
+def run_diagnosis(birth_date):
+    # 結果セクション全体を1回の描画で送信（同じ生年月日の結果は全セッションで共有、エラーを含む結果は共有しない）
+    html = session_memo.result_html(birth_date.toordinal(), render_diagnosis_section, st.session_state)
+    st.markdown(html, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    profiling.run(main) 
\ No newline at end of file
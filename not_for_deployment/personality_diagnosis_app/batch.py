@@ -0,0 +1,227 @@
+"""
+生年月日の一覧を全占術で一括診断するコマンドラインツール
+
+使い方:
+    python -m personality_diagnosis_app.batch [INPUT] [-o OUTPUT] [--format jsonl|csv]
+                                              [--chunk-size N] [--workers N] [--quiet]
+
+INPUTは1行に1件の生年月日を書いたファイル（省略時または「-」で標準入力）。
+結果は入力と同じ順序で出力し、処理件数と処理速度を標準エラー出力に表示する。
+"""
+import argparse
+import collections
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, TextIO
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+from personality_diagnosis_app.fortune_systems import engine
+from personality_diagnosis_app.fortune_systems.records import json_default
+from personality_diagnosis_app.utils.date_utils import parse_date
+
+# 出力形式
+OUTPUT_FORMATS = ("jsonl", "csv")
+
+# 1チャンクあたりの件数
+DEFAULT_CHUNK_SIZE = 1000
+
+class ChunkResult(NamedTuple):
+    """
+    1チャンク分の処理結果
+    """
+    index: int
+    text: str       # 出力形式に変換済みのテキスト
+    rows: int
+    errors: int
+    elapsed: float  # ワーカー内での処理時間（秒）
+
+def _diagnose_line(line: str) -> Dict[str, Any]:
+    """
+    1件の生年月日を診断する
+    日付として解釈できない場合はエラー内容を返す
+    """
+    try:
+        birth_date = parse_date(line)
+        record = {"birth_date": birth_date.isoformat()}
+        record.update(engine.diagnose_all(birth_date))
+        return record
+    except Exception as e:
+        return {"birth_date": line, "error": str(e)}
+
+def _flatten(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    診断結果を「占術キー.項目名」の1階層に展開する（辞書やリストの値はJSON文字列にする）
+    """
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict) and key in engine.SYSTEMS:
+            for name, item in value.items():
+                if isinstance(item, (Mapping, list, tuple)):
+                    item = json.dumps(item, ensure_ascii=False, default=json_default)
+                flat[f"{key}.{name}"] = item
+        else:
+            flat[key] = value
+    return flat
+
+def csv_fields() -> List[str]:
+    """
+    CSV出力の列名を取得する
+    """
+    sample = _diagnose_line("2000-01-01")
+    return list(_flatten(sample)) + ["error"]
+
+def _format_records(records: List[Dict[str, Any]], fmt: str, fields: Optional[List[str]]) -> str:
+    if fmt == "jsonl":
+        return "".join(json.dumps(record, ensure_ascii=False, default=json_default) + "\n" for record in records)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    writer.writerows(_flatten(record) for record in records)
+    return buffer.getvalue()
+
+def diagnose_chunk(index: int, lines: List[str], fmt: str, fields: Optional[List[str]] = None) -> ChunkResult:
+    """
+    1チャンク分の生年月日を診断し、出力形式のテキストに変換する
+    ワーカープロセスとの受け渡しを小さくするため、変換までをワーカー側で行う
+    """
+    start = time.perf_counter()
+    records = [_diagnose_line(line) for line in lines]
+    errors = sum(1 for record in records if "error" in record)
+    text = _format_records(records, fmt, fields)
+    return ChunkResult(index, text, len(records), errors, time.perf_counter() - start)
+
+def _diagnose_chunk_args(args) -> ChunkResult:
+    return diagnose_chunk(*args)
+
+def iter_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """
+    空行を除いた入力をチャンクに分割する
+    """
+    chunk = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_chunks(
+    chunks: Iterable[List[str]],
+    fmt: str,
+    fields: Optional[List[str]],
+    workers: int,
+) -> Iterator[ChunkResult]:
+    """
+    チャンクを順に処理し、入力と同じ順序で結果を返す
+    ワーカーが複数の場合はプロセスプールで並列に処理する
+    処理中のチャンク数をワーカー数の2倍までに抑え、巨大な入力でもメモリ使用量を一定に保つ
+    """
+    tasks = ((index, chunk, fmt, fields) for index, chunk in enumerate(chunks))
+
+    if workers <= 1:
+        engine.warm_up()
+        for task in tasks:
+            yield _diagnose_chunk_args(task)
+        return
+
+    with multiprocessing.Pool(workers, initializer=engine.warm_up) as pool:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(pool.apply_async(_diagnose_chunk_args, (task,)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def run(
+    lines: Iterable[str],
+    output: TextIO,
+    fmt: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    log: Optional[TextIO] = None,
+) -> Dict[str, float]:
+    """
+    生年月日の一覧を一括診断して出力する
+
+    Args:
+        lines: 1行に1件の生年月日
+        output: 出力先
+        fmt: 出力形式（"jsonl" または "csv"）
+        chunk_size: 1チャンクあたりの件数
+        workers: ワーカープロセス数（1の場合は同一プロセスで処理する）
+        log: チャンクごとの処理時間の出力先（Noneの場合は出力しない）
+
+    Returns:
+        処理件数・エラー件数・経過時間・処理速度
+    """
+    fields = None
+    if fmt == "csv":
+        fields = csv_fields()
+        csv.DictWriter(output, fieldnames=fields, lineterminator="\n").writeheader()
+
+    start = time.perf_counter()
+    rows = 0
+    errors = 0
+    for result in run_chunks(iter_chunks(lines, chunk_size), fmt, fields, workers):
+        output.write(result.text)
+        rows += result.rows
+        errors += result.errors
+        if log is not None:
+            rate = result.rows / result.elapsed if result.elapsed else 0.0
+            log.write(f"chunk {result.index}: {result.rows} rows in {result.elapsed:.3f}s ({rate:,.0f} rows/s)\n")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生年月日の一覧を全占術で一括診断する")
+    parser.add_argument("input", nargs="?", default="-", help="1行に1件の生年月日を書いたファイル（省略時は標準入力）")
+    parser.add_argument("-o", "--output", default="-", help="出力先ファイル（省略時は標準出力）")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jsonl", help="出力形式")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="1チャンクあたりの件数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="ワーカープロセス数")
+    parser.add_argument("--quiet", action="store_true", help="チャンクごとの処理時間を表示しない")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        stats = run(
+            input_file, output_file, args.format, args.chunk_size, args.workers,
+            log=None if args.quiet else sys.stderr,
+        )
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    sys.stderr.write(
+        f"{stats['rows']:,} rows ({stats['errors']:,} errors) in {stats['elapsed']:.2f}s "
+        f"with {args.workers} worker(s): {stats['rows_per_second']:,.0f} rows/s\n"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+期間や名簿に含まれる生年月日の診断結果の分布を集計するモジュール
+
+生年月日をベクトル化エンジンで診断項目ごとの整数コードに変換し、
+ヒストグラムはコードの np.bincount、クロス集計は2つのコードを1つの整数に合成した np.bincount で求める。
+生年月日1件ごとの診断やラベル文字列の比較は行わない。
+"""
+import datetime
+from typing import Dict, Iterable, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import vectorized
+
+# 診断項目の代わりに指定できる生年（クロス集計の行・列に使う）
+BIRTH_YEAR = "birth_year"
+
+# 集計結果の件数の型
+COUNT_DTYPE = np.int64
+
+Dates = Union[Iterable[vectorized.DateLike], np.ndarray]
+
+class Histogram(NamedTuple):
+    """
+    1つの診断項目の分布
+    counts[i] は labels[i] に該当する生年月日の件数
+    """
+    attribute: str
+    labels: Tuple[str, ...]
+    counts: np.ndarray
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(zip(self.labels, self.counts.tolist()))
+
+class Crosstab(NamedTuple):
+    """
+    2つの診断項目（または生年）のクロス集計
+    counts[i, j] は row_labels[i] かつ column_labels[j] に該当する生年月日の件数
+    """
+    row: str
+    column: str
+    row_labels: Tuple[str, ...]
+    column_labels: Tuple[str, ...]
+    counts: np.ndarray
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+def range_ordinals(start: datetime.date, end: datetime.date) -> np.ndarray:
+    """
+    期間内（両端を含む）の全日付の序数配列を取得する
+    """
+    if end < start:
+        raise ValueError(f"end ({end}) is before start ({start})")
+    return vectorized.date_range_ordinals(start, end)
+
+def _codes(name: str, ordinals: np.ndarray) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    診断項目（または生年）のラベルと、各生年月日のコードを求める
+    生年は期間内の最小の年を0とするコードにする
+    """
+    if name == BIRTH_YEAR:
+        years = vectorized.split_ordinals(ordinals).year
+        if not len(years):
+            return (), years
+        first = int(years.min())
+        return tuple(str(year) for year in range(first, int(years.max()) + 1)), years - first
+    return vectorized.labels(name), vectorized.encode(ordinals, [name])[name].astype(np.int64)
+
+def histogram(name: str, dates: Dates) -> Histogram:
+    """
+    生年月日の列に対する診断項目の分布を求める
+
+    Args:
+        name: 「占術キー.項目名」
+        dates: 生年月日（datetime.date または序数）の列
+
+    Returns:
+        ラベルごとの件数
+    """
+    labels, codes = _codes(name, vectorized.to_ordinals(dates))
+    return Histogram(name, labels, np.bincount(codes, minlength=len(labels)).astype(COUNT_DTYPE))
+
+def histograms(names: Sequence[str], dates: Dates) -> Dict[str, Histogram]:
+    """
+    複数の診断項目の分布をまとめて求める（生年月日の変換は1回だけ行う）
+    """
+    ordinals = vectorized.to_ordinals(dates)
+    return {name: histogram(name, ordinals) for name in names}
+
+def crosstab(row: str, column: str, dates: Dates) -> Crosstab:
+    """
+    生年月日の列に対する2つの診断項目のクロス集計を求める
+
+    Args:
+        row: 行にする「占術キー.項目名」（または BIRTH_YEAR）
+        column: 列にする「占術キー.項目名」（または BIRTH_YEAR）
+        dates: 生年月日（datetime.date または序数）の列
+
+    Returns:
+        ラベルの組ごとの件数
+    """
+    ordinals = vectorized.to_ordinals(dates)
+    row_labels, row_codes = _codes(row, ordinals)
+    column_labels, column_codes = _codes(column, ordinals)
+    size = len(row_labels) * len(column_labels)
+    counts = np.bincount(row_codes * len(column_labels) + column_codes, minlength=size)
+    return Crosstab(row, column, row_labels, column_labels,
+                    counts.astype(COUNT_DTYPE).reshape(len(row_labels), len(column_labels)))
+
+def range_histograms(names: Sequence[str], start: datetime.date, end: datetime.date) -> Dict[str, Histogram]:
+    """
+    期間内の全日付に対する診断項目の分布を求める
+    """
+    return histograms(names, range_ordinals(start, end))
+
+def range_crosstab(row: str, column: str, start: datetime.date, end: datetime.date) -> Crosstab:
+    """
+    期間内の全日付に対する2つの診断項目のクロス集計を求める
+    """
+    return crosstab(row, column, range_ordinals(start, end))
+
+def attribute_names(include_birth_year: bool = False) -> Sequence[str]:
+    """
+    集計できる診断項目の一覧（有効な占術のもの）
+    """
+    names = vectorized.enabled_names()
+    return [BIRTH_YEAR] + names if include_birth_year else names
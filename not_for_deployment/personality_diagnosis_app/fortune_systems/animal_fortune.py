@@ -1,7 +1,9 @@
 import datetime
 from typing import Dict, Any, List
 
+from . import rules
 from .base import FortuneSystem
+from .records import ANIMAL_LABELS, ANIMAL_TYPE_LABELS, AnimalFortuneRecord, code_of
 from utils.date_utils import get_chinese_zodiac
 
 class AnimalFortune(FortuneSystem):
@@ -25,35 +27,23 @@ class AnimalFortune(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
-        # 動物を算出
-        animal = self._calculate_animal(birth_date)
-        
-        # タイプを算出
-        animal_type = self._calculate_type(birth_date)
-        
-        # 完全な動物タイプの組み合わせ
-        full_animal_type = f"{animal}（{animal_type}タイプ）"
-        
-        # 性格特性を取得
-        personality_traits = self.get_personality_traits(full_animal_type)
-        
-        # 相性を取得
-        compatibility = self._get_compatibility(animal)
-        
-        # 適職を取得
-        career = self._get_career(full_animal_type)
-        
-        # 結果を返す
-        result = {
-            "animal": animal,
-            "type": animal_type,
-            "full_type": full_animal_type,
-            "personality_traits": personality_traits,
-            "compatibility": compatibility,
-            "career": career
-        }
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date) -> AnimalFortuneRecord:
+        """
+        誕生日から動物占いによる診断結果レコードを作成する
         
-        return result
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
+        return AnimalFortuneRecord(
+            self,
+            code_of(ANIMAL_LABELS, self._calculate_animal(birth_date)),
+            code_of(ANIMAL_TYPE_LABELS, self._calculate_type(birth_date)),
+        )
     
     def _calculate_animal(self, birth_date: datetime.date) -> str:
         """
@@ -108,54 +98,12 @@ class AnimalFortune(FortuneSystem):
             相性
         """
         # データファイルから相性情報を取得
-        if "compatibility" in self.data and animal in self.data["compatibility"]:
-            return self.data["compatibility"][animal]
+        compatibility = self._lookup("compatibility", animal)
+        if compatibility is not None:
+            return compatibility
         
         # データがない場合はデフォルト値
-        default_compatibility = {
-            "good": [],
-            "bad": []
-        }
-        
-        # 動物の基本的な相性（簡略化した例）
-        if animal == "ねずみ":
-            default_compatibility["good"] = ["うし", "りゅう", "さる"]
-            default_compatibility["bad"] = ["うま", "うさぎ", "とり"]
-        elif animal == "うし":
-            default_compatibility["good"] = ["ねずみ", "へび", "とり"]
-            default_compatibility["bad"] = ["ひつじ", "うま", "いぬ"]
-        elif animal == "とら":
-            default_compatibility["good"] = ["うま", "いぬ", "ぶた"]
-            default_compatibility["bad"] = ["さる", "へび", "とり"]
-        elif animal == "うさぎ":
-            default_compatibility["good"] = ["ひつじ", "いぬ", "ぶた"]
-            default_compatibility["bad"] = ["ねずみ", "とり", "うま"]
-        elif animal == "りゅう":
-            default_compatibility["good"] = ["ねずみ", "さる", "とり"]
-            default_compatibility["bad"] = ["いぬ", "うし", "りゅう"]
-        elif animal == "へび":
-            default_compatibility["good"] = ["うし", "とり", "さる"]
-            default_compatibility["bad"] = ["とら", "いのしし", "いぬ"]
-        elif animal == "うま":
-            default_compatibility["good"] = ["とら", "ひつじ", "いぬ"]
-            default_compatibility["bad"] = ["ねずみ", "うし", "うさぎ"]
-        elif animal == "ひつじ":
-            default_compatibility["good"] = ["うさぎ", "うま", "ぶた"]
-            default_compatibility["bad"] = ["うし", "りゅう", "いぬ"]
-        elif animal == "さる":
-            default_compatibility["good"] = ["ねずみ", "りゅう", "へび"]
-            default_compatibility["bad"] = ["とら", "へび", "ぶた"]
-        elif animal == "とり":
-            default_compatibility["good"] = ["うし", "へび", "りゅう"]
-            default_compatibility["bad"] = ["ねずみ", "うさぎ", "とら"]
-        elif animal == "いぬ":
-            default_compatibility["good"] = ["とら", "うさぎ", "うま"]
-            default_compatibility["bad"] = ["りゅう", "ひつじ", "へび"]
-        else:  # いのしし（ぶた）
-            default_compatibility["good"] = ["ひつじ", "うさぎ", "とら"]
-            default_compatibility["bad"] = ["へび", "さる", "いのしし"]
-        
-        return default_compatibility
+        return rules.ANIMAL_COMPATIBILITY_TABLE.get(animal)
     
     def _get_career(self, full_animal_type: str) -> List[str]:
         """
@@ -168,14 +116,16 @@ class AnimalFortune(FortuneSystem):
             適職リスト
         """
         # データファイルから適職情報を取得
-        if "career" in self.data and full_animal_type in self.data["career"]:
-            return self.data["career"][full_animal_type]
+        career = self._lookup("career", full_animal_type)
+        if career is not None:
+            return career
         
         # データがない場合は動物のみで一般的な適職を返す
         animal = full_animal_type.split("（")[0]
         
-        if "career_by_animal" in self.data and animal in self.data["career_by_animal"]:
-            return self.data["career_by_animal"][animal]
+        career = self._lookup("career_by_animal", animal)
+        if career is not None:
+            return career
         
         # 全くデータがない場合はデフォルト値
         return ["あなたの特性を活かせる職業が向いています。"]
@@ -184,6 +134,20 @@ class AnimalFortune(FortuneSystem):
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> AnimalFortune:
+    """
+    動物占いのシングルトンインスタンスを取得する
+    
+    Returns:
+        AnimalFortuneインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = AnimalFortune()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     動物占いによる診断を行うファサードメソッド
@@ -194,9 +158,16 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
-    
-    if _instance is None:
-        _instance = AnimalFortune()
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date) -> AnimalFortuneRecord:
+    """
+    動物占いによる診断結果レコードを取得するファサードメソッド
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        birth_date: 生年月日
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date)
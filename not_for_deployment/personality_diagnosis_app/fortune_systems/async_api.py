@@ -0,0 +1,219 @@
+"""
+asyncioから診断を行うための非同期API
+
+同期の診断関数はエグゼキューターで実行し、イベントループを止めないようにする。
+エグゼキューターに渡す関数はモジュールレベルの関数で、結果は通常の辞書やリストに変換して返すため、
+ProcessPoolExecutor に差し替えてもプロセス間で受け渡しできる。
+また、短い時間内に届いた1件ずつの診断要求をまとめて1回のバッチ呼び出しにするマイクロバッチャーを提供する。
+"""
+import asyncio
+import datetime
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from . import engine, vectorized
+from .records import thaw
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# まとめる要求を待つ時間（秒）
+DEFAULT_MAX_DELAY = 0.002
+
+# 1回のバッチ呼び出しでまとめる最大件数
+DEFAULT_MAX_BATCH_SIZE = 1024
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Executor:
+    """
+    診断に使うエグゼキューターを取得する（初回のみスレッドプールを作成）
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="diagnosis")
+
+    return _executor
+
+def set_executor(executor: Executor):
+    """
+    診断に使うエグゼキューターを差し替える
+    計算の重い占術を追加する場合はProcessPoolExecutorを指定する（各エントリーポイントはプロセスプールでも動作する）
+    """
+    global _executor
+    _executor = executor
+
+class MicroBatcher(Generic[T, R]):
+    """
+    同時に届いた1件ずつの要求をまとめてバッチ関数に渡すクラス
+    最初の要求から max_delay 秒経つか、max_batch_size 件たまった時点でまとめて実行する
+
+    Args:
+        batch_fn: 要求の一覧を受け取り、同じ順序で結果の一覧を返す関数
+                  （結果が例外オブジェクトの場合は、その要求だけを失敗させる）
+        max_delay: まとめる要求を待つ時間（秒）
+        max_batch_size: 1回でまとめる最大件数
+        executor: バッチ関数を実行するエグゼキューター（省略時は get_executor()）
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], List[Any]],
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        executor: Optional[Executor] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        1件の要求を登録し、まとめて実行された結果を待つ
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError("MicroBatcher is bound to a different event loop")
+
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = self.loop.create_task(self._run(batch))
+        # 実行中のタスクが回収されないよう参照を保持する
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+
+        items = [item for item, _ in batch]
+        try:
+            results = await self.loop.run_in_executor(self.executor or get_executor(), self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+def classify_batch(dates: List[datetime.date]) -> List[Dict[str, str]]:
+    """
+    複数の生年月日をベクトル化エンジンでまとめて分類する
+    """
+    results = vectorized.diagnose_many(dates)
+    return [
+        {name: values[i] for name, values in results.items()}
+        for i in range(len(dates))
+    ]
+
+def diagnose_all_batch(dates: List[datetime.date]) -> List[Any]:
+    """
+    複数の生年月日を全占術で診断する（同じ生年月日は1回だけ計算する）
+    診断に失敗した生年月日は例外オブジェクトを結果とする
+    結果は読み取り専用のマッピングを通常の辞書に変換したもの（プロセス間で受け渡しできる）
+    """
+    results: Dict[datetime.date, Any] = {}
+    for birth_date in dates:
+        if birth_date not in results:
+            try:
+                results[birth_date] = thaw(engine.diagnose_all(birth_date))
+            except Exception as e:
+                results[birth_date] = e
+    return [results[birth_date] for birth_date in dates]
+
+def diagnose_system(system: str, birth_date: datetime.date) -> Dict[str, Any]:
+    """
+    1つの占術による診断を行い、結果を通常の辞書で返す
+    占術の関数ではなく占術キーを受け取るため、プロセスプールにも渡せる
+    """
+    return thaw(engine.SYSTEMS[system](birth_date))
+
+# バッチ関数 → イベントループごとのマイクロバッチャー
+_batchers: Dict[Tuple[Callable, asyncio.AbstractEventLoop], MicroBatcher] = {}
+
+def get_batcher(batch_fn: Callable[[List[Any]], List[Any]]) -> MicroBatcher:
+    """
+    実行中のイベントループ用のマイクロバッチャーを取得する
+    """
+    loop = asyncio.get_running_loop()
+    key = (batch_fn, loop)
+    batcher = _batchers.get(key)
+    if batcher is None:
+        # 終了したイベントループのバッチャーは破棄する
+        for stale in [k for k in _batchers if k[1].is_closed()]:
+            del _batchers[stale]
+        batcher = _batchers[key] = MicroBatcher(batch_fn)
+    return batcher
+
+async def diagnose(system: str, birth_date: datetime.date) -> Dict[str, Any]:
+    """
+    1つの占術による診断をエグゼキューターで行う
+
+    Args:
+        system: 占術キー
+        birth_date: 生年月日
+
+    Returns:
+        診断結果をDict形式で返す
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), diagnose_system, system, birth_date)
+
+async def diagnose_all(birth_date: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """
+    全占術による診断を行う
+    同時に届いた要求はまとめて1回のエグゼキューター呼び出しで処理する
+
+    Args:
+        birth_date: 生年月日
+
+    Returns:
+        占術キー → 診断結果
+    """
+    return await get_batcher(diagnose_all_batch).submit(birth_date)
+
+async def classify(birth_date: datetime.date) -> Dict[str, str]:
+    """
+    生年月日の分類結果（「占術キー.項目名」 → ラベル）を取得する
+    同時に届いた要求はまとめて1回のベクトル化呼び出しで処理する
+    """
+    return await get_batcher(classify_batch).submit(birth_date)
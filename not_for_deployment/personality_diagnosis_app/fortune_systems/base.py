@@ -2,7 +2,14 @@ from abc import ABC, abstractmethod
 import datetime
 import json
 import os
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Sequence
+
+from . import instrumentation
+from .records import freeze
+
+# 読み込みに失敗した場合やキーがない場合の空データ（読み取り専用）
+EMPTY_DATA: Mapping[str, Any] = MappingProxyType({})
 
 class FortuneSystem(ABC):
     """
@@ -18,24 +25,46 @@ class FortuneSystem(ABC):
             data_file: データファイルのパス
         """
         self.data_file = data_file
+        # 計測で使う占術キー（"shukuyo_data.json" → "shukuyo"）
+        self.system_key = data_file.rsplit("_data", 1)[0]
         self.data = self._load_data()
     
-    def _load_data(self) -> Dict[str, Any]:
+    def _load_data(self) -> Mapping[str, Any]:
         """
         データファイルを読み込む
+        読み込んだデータは変更できない形（読み取り専用のマッピングとタプル）に変換し、
+        診断結果からはコピーせずにそのまま参照する
         
         Returns:
-            データをDict形式で返す
+            データを読み取り専用のマッピングで返す
         """
         try:
             base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             file_path = os.path.join(base_dir, 'data', self.data_file)
             
             with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return freeze(json.load(f))
         except Exception as e:
             print(f"Error loading data file: {e}")
-            return {}
+            instrumentation.count_load_error(self.system_key)
+            return EMPTY_DATA
+    
+    def _lookup(self, table: str, key: str) -> Any:
+        """
+        データファイルの表からキーに対応する値を取得する
+        
+        Args:
+            table: 表の名前（"personality_traits" など）
+            key: キー
+            
+        Returns:
+            キーに対応する値（表やキーがない場合はNone）
+        """
+        values = self.data.get(table)
+        found = values is not None and key in values
+        if instrumentation.enabled:
+            instrumentation.count_lookup(self.system_key, table, found)
+        return values[key] if found else None
     
     @abstractmethod
     def diagnose(self, birth_date: datetime.date) -> Dict[str, Any]:
@@ -51,7 +80,7 @@ class FortuneSystem(ABC):
         """
         pass
     
-    def get_personality_traits(self, key: str) -> Dict[str, Any]:
+    def get_personality_traits(self, key: str) -> Mapping[str, Any]:
         """
         指定されたキーに対応する性格特性を取得する
         
@@ -59,13 +88,12 @@ class FortuneSystem(ABC):
             key: 性格特性を取得するためのキー
             
         Returns:
-            性格特性をDict形式で返す
+            性格特性を読み取り専用のマッピングで返す
         """
-        if 'personality_traits' in self.data and key in self.data['personality_traits']:
-            return self.data['personality_traits'][key]
-        return {}
+        traits = self._lookup('personality_traits', key)
+        return EMPTY_DATA if traits is None else traits
     
-    def get_strengths_and_weaknesses(self, key: str) -> Dict[str, List[str]]:
+    def get_strengths_and_weaknesses(self, key: str) -> Dict[str, Sequence[str]]:
         """
         指定されたキーに対応する強みと弱みを取得する
         
@@ -73,19 +101,16 @@ class FortuneSystem(ABC):
             key: 強みと弱みを取得するためのキー
             
         Returns:
-            強みと弱みをDict形式で返す
+            強みと弱みをDict形式で返す（それぞれタプル）
         """
-        result = {'strengths': [], 'weaknesses': []}
-        
-        if 'strengths' in self.data and key in self.data['strengths']:
-            result['strengths'] = self.data['strengths'][key]
-        
-        if 'weaknesses' in self.data and key in self.data['weaknesses']:
-            result['weaknesses'] = self.data['weaknesses'][key]
-        
-        return result
+        strengths = self._lookup('strengths', key)
+        weaknesses = self._lookup('weaknesses', key)
+        return {
+            'strengths': () if strengths is None else strengths,
+            'weaknesses': () if weaknesses is None else weaknesses,
+        }
     
-    def get_compatibility(self, key: str) -> Dict[str, List[str]]:
+    def get_compatibility(self, key: str) -> Dict[str, Sequence[str]]:
         """
         指定されたキーに対応する相性を取得する
         
@@ -93,14 +118,15 @@ class FortuneSystem(ABC):
             key: 相性を取得するためのキー
             
         Returns:
-            相性をDict形式で返す
+            相性をDict形式で返す（それぞれタプル）
         """
-        result = {'good': [], 'bad': []}
+        result = {'good': (), 'bad': ()}
         
-        if 'compatibility' in self.data and key in self.data['compatibility']:
-            if 'good' in self.data['compatibility'][key]:
-                result['good'] = self.data['compatibility'][key]['good']
-            if 'bad' in self.data['compatibility'][key]:
-                result['bad'] = self.data['compatibility'][key]['bad']
+        compatibility = self._lookup('compatibility', key)
+        if compatibility is not None:
+            if 'good' in compatibility:
+                result['good'] = compatibility['good']
+            if 'bad' in compatibility:
+                result['bad'] = compatibility['bad']
         
         return result 
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+全占術をまとめて実行するためのエントリーポイント
+Streamlit以外（バッチ処理やAPIなど）から診断を行う場合はこのモジュールを使用する
+
+対象は registry で有効になっている占術のみで、各占術のモジュールは最初に使うときに読み込む。
+"""
+import datetime
+from typing import Any, Callable, Dict, Iterator, Mapping
+
+from . import instrumentation, registry
+from .records import DiagnosisRecord
+
+class _LazySystems(Mapping):
+    """
+    占術キー → 占術モジュールの関数のマッピング（表示順）
+    キーの列挙では占術モジュールを読み込まず、関数を取り出したときに初めて読み込む
+    計測が有効な場合は処理時間と例外を記録する関数で包む
+
+    Args:
+        attr: 取り出す関数名（"diagnose" または "record"）
+    """
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self._functions: Dict[str, Callable] = {}
+
+    def __getitem__(self, key: str) -> Callable:
+        function = self._functions.get(key)
+        if function is None:
+            if not registry.is_enabled(key):
+                raise KeyError(key)
+            module = registry.load(key)
+            function = self._functions[key] = instrumentation.instrument(key, getattr(module, self.attr), self.attr)
+        return function
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(registry.enabled_keys())
+
+    def __len__(self) -> int:
+        return len(registry.enabled_keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in registry.enabled_keys()
+
+# 占術キーと診断関数の対応（表示順）
+SYSTEMS: Mapping[str, Callable[[datetime.date], Dict[str, Any]]] = _LazySystems("diagnose")
+
+# 占術キーと診断結果レコードの取得関数の対応（表示順）
+RECORDERS: Mapping[str, Callable[[datetime.date], DiagnosisRecord]] = _LazySystems("record")
+
+def warm_up():
+    """
+    有効な全占術のインスタンスを生成し、データファイルを読み込んでおく
+    """
+    for key in registry.enabled_keys():
+        registry.load(key).get_instance()
+
+def diagnose_all(birth_date: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """
+    有効な全占術による診断を行う
+
+    Args:
+        birth_date: 生年月日
+
+    Returns:
+        占術キー → 診断結果
+    """
+    return {key: diagnose(birth_date) for key, diagnose in SYSTEMS.items()}
+
+def record_all(birth_date: datetime.date) -> Dict[str, DiagnosisRecord]:
+    """
+    有効な全占術による診断結果レコードを取得する
+    レコードは整数コードのみを保持するため、大量にキャッシュする場合はこちらを使う
+
+    Args:
+        birth_date: 生年月日
+
+    Returns:
+        占術キー → 診断結果レコード
+    """
+    return {key: record(birth_date) for key, record in RECORDERS.items()}
@@ -0,0 +1,398 @@
+"""
+占術ごとの処理時間・呼び出し回数・データ参照・キャッシュを計測し、Prometheusのテキスト形式で出力する
+
+計測は次の環境変数のいずれかを設定した場合（または enable() を呼んだ場合）のみ行う。
+    PDA_METRICS_PORT      指定したポートの /metrics で計測値を返すHTTPサーバーを起動する
+    PDA_METRICS_HOST      HTTPサーバーが待ち受けるアドレス（既定は127.0.0.1、外部から取得する場合は0.0.0.0）
+    PDA_METRICS_FILE      指定したファイルに計測値を定期的に書き出す（node_exporterのtextfile collector向け）
+    PDA_METRICS_INTERVAL  ファイルに書き出す間隔（秒、既定は15）
+計測しない場合、各計測点はフラグを1回確認するだけで元の処理をそのまま実行する。
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 処理時間のヒストグラムの区切り（秒）
+DURATION_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+# 描画サイズのヒストグラムの区切り（バイト）
+SIZE_BUCKETS: Tuple[float, ...] = (
+    1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288,
+)
+
+# ファイルに書き出す間隔の既定値（秒）
+DEFAULT_WRITE_INTERVAL = 15.0
+
+# HTTPサーバーが待ち受けるアドレスの既定値（同じホストからのみ取得できる）
+DEFAULT_HTTP_HOST = "127.0.0.1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 計測するかどうか（計測点はこのフラグだけを確認する）
+enabled = False
+
+_lock = threading.Lock()
+
+class Histogram:
+    """
+    区切りごとの件数・合計・件数を保持するヒストグラム
+    """
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+# 計測値（ラベルの組 → 値）
+_durations: Dict[Tuple[str, str], Histogram] = {}      # (metric, system or stage)
+_sizes: Dict[Tuple[str, str], Histogram] = {}          # (metric, stage)
+_errors: Dict[str, int] = {}                            # system
+_lookups: Dict[Tuple[str, str, str], int] = {}          # (system, table, hit/miss)
+_load_errors: Dict[str, int] = {}                       # system
+_deltas: Dict[str, List[int]] = {}                      # scope → [再実行の回数, 差分のバイト数]
+
+# キャッシュ名 → cache_info() を持つ関数
+_caches: Dict[str, Callable] = {}
+
+# ゲージ名 → (説明, 現在の値を返す関数)
+_gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+# カウンター名 → (説明, 現在の値を返す関数)
+_counters: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+_exporter_started = False
+
+def enable():
+    """
+    計測を開始する
+    """
+    global enabled
+    enabled = True
+
+def disable():
+    """
+    計測を停止する（計測済みの値は保持する）
+    """
+    global enabled
+    enabled = False
+
+def reset():
+    """
+    計測済みの値を消去する
+    """
+    with _lock:
+        _durations.clear()
+        _sizes.clear()
+        _errors.clear()
+        _lookups.clear()
+        _load_errors.clear()
+        _deltas.clear()
+
+def observe(metric: str, label: str, seconds: float):
+    """
+    処理時間を記録する
+    """
+    with _lock:
+        histogram = _durations.get((metric, label))
+        if histogram is None:
+            histogram = _durations[(metric, label)] = Histogram()
+        histogram.observe(seconds)
+
+def observe_size(metric: str, label: str, nbytes: int):
+    """
+    描画したHTMLなどのサイズ（バイト）を記録する
+    """
+    with _lock:
+        histogram = _sizes.get((metric, label))
+        if histogram is None:
+            histogram = _sizes[(metric, label)] = Histogram(SIZE_BUCKETS)
+        histogram.observe(nbytes)
+
+def count_error(system: str):
+    """
+    診断中に発生した例外を記録する
+    """
+    with _lock:
+        _errors[system] = _errors.get(system, 0) + 1
+
+def count_lookup(system: str, table: str, hit: bool):
+    """
+    データファイルの参照結果（キーが見つかったか）を記録する
+    """
+    key = (system, table, "hit" if hit else "miss")
+    with _lock:
+        _lookups[key] = _lookups.get(key, 0) + 1
+
+def count_load_error(system: str):
+    """
+    データファイルの読み込み失敗を記録する
+    """
+    with _lock:
+        _load_errors[system] = _load_errors.get(system, 0) + 1
+
+def count_deltas(scope: str, nbytes: int):
+    """
+    Streamlitの再実行（スクリプト全体またはフラグメント）で送信した差分のバイト数を記録する
+    """
+    with _lock:
+        totals = _deltas.get(scope)
+        if totals is None:
+            totals = _deltas[scope] = [0, 0]
+        totals[0] += 1
+        totals[1] += nbytes
+
+def delta_totals() -> Dict[str, Tuple[int, int]]:
+    """
+    再実行の範囲ごとの (再実行の回数, 差分のバイト数の合計)
+    """
+    with _lock:
+        return {scope: (count, nbytes) for scope, (count, nbytes) in _deltas.items()}
+
+def instrument(system: str, fn: Callable[[Any], Any], metric: str = "diagnose") -> Callable[[Any], Any]:
+    """
+    1引数の診断関数を、処理時間と例外を記録する関数で包む
+
+    Args:
+        system: 占術キー
+        fn: 診断関数
+        metric: 処理の種類（"diagnose" や "record"）
+
+    Returns:
+        計測付きの診断関数
+    """
+    @functools.wraps(fn)
+    def wrapper(birth_date):
+        if not enabled:
+            return fn(birth_date)
+        start = time.perf_counter()
+        try:
+            return fn(birth_date)
+        except Exception:
+            count_error(system)
+            raise
+        finally:
+            observe(metric, system, time.perf_counter() - start)
+    return wrapper
+
+class timer:
+    """
+    with文で囲んだ処理の時間を記録する
+    """
+    __slots__ = ("metric", "label", "start")
+
+    def __init__(self, metric: str, label: str):
+        self.metric = metric
+        self.label = label
+        self.start = 0.0
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if enabled and self.start:
+            observe(self.metric, self.label, time.perf_counter() - self.start)
+
+def register_cache(name: str, cached_fn: Callable):
+    """
+    functools.lru_cache で包んだ関数を、キャッシュのヒット率の出力対象に登録する
+    """
+    _caches[name] = cached_fn
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]):
+    """
+    出力時に値を読み取るゲージを登録する
+    """
+    _gauges[name] = (help_text, read)
+
+def register_counter(name: str, help_text: str, read: Callable[[], float]):
+    """
+    出力時に値を読み取るカウンター（増加するだけの値）を登録する
+    """
+    _counters[name] = (help_text, read)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def render() -> str:
+    """
+    計測値をPrometheusのテキスト形式で出力する
+    """
+    with _lock:
+        durations = {key: (list(h.counts), h.total, h.count) for key, h in _durations.items()}
+        sizes = {key: (list(h.counts), h.total, h.count) for key, h in _sizes.items()}
+        errors = dict(_errors)
+        lookups = dict(_lookups)
+        load_errors = dict(_load_errors)
+        deltas = {scope: tuple(totals) for scope, totals in _deltas.items()}
+
+    lines: List[str] = []
+
+    for values, buckets, suffix, help_text in (
+        (durations, DURATION_BUCKETS, "duration_seconds", "Time spent in"),
+        (sizes, SIZE_BUCKETS, "size_bytes", "Size of the output of"),
+    ):
+        metrics: Dict[str, List] = {}
+        for (metric, label), histogram in sorted(values.items()):
+            metrics.setdefault(metric, []).append((label, histogram))
+        for metric, series in metrics.items():
+            name = f"pda_{metric}_{suffix}"
+            label_name = "stage" if metric == "render" else "system"
+            lines.append(f"# HELP {name} {help_text} {metric} per {label_name}.")
+            lines.append(f"# TYPE {name} histogram")
+            for label, (counts, total, count) in series:
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(**{label_name: label, 'le': repr(bound)})} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(**{label_name: label, 'le': '+Inf'})} {count}")
+                lines.append(f"{name}_sum{_labels(**{label_name: label})} {total!r}")
+                lines.append(f"{name}_count{_labels(**{label_name: label})} {count}")
+
+    lines.append("# HELP pda_diagnose_errors_total Exceptions raised while diagnosing, per system.")
+    lines.append("# TYPE pda_diagnose_errors_total counter")
+    for system, count in sorted(errors.items()):
+        lines.append(f"pda_diagnose_errors_total{_labels(system=system)} {count}")
+
+    lines.append("# HELP pda_data_lookups_total Data file lookups by result (miss means the fallback value was used).")
+    lines.append("# TYPE pda_data_lookups_total counter")
+    for (system, table, result), count in sorted(lookups.items()):
+        lines.append(f"pda_data_lookups_total{_labels(system=system, table=table, result=result)} {count}")
+
+    lines.append("# HELP pda_data_load_errors_total Data files that failed to load, per system.")
+    lines.append("# TYPE pda_data_load_errors_total counter")
+    for system, count in sorted(load_errors.items()):
+        lines.append(f"pda_data_load_errors_total{_labels(system=system)} {count}")
+
+    lines.append("# HELP pda_reruns_total Streamlit reruns, per scope (app or fragment).")
+    lines.append("# TYPE pda_reruns_total counter")
+    for scope, (count, _) in sorted(deltas.items()):
+        lines.append(f"pda_reruns_total{_labels(scope=scope)} {count}")
+
+    lines.append("# HELP pda_rerun_delta_bytes_total Delta message bytes sent by reruns, per scope.")
+    lines.append("# TYPE pda_rerun_delta_bytes_total counter")
+    for scope, (_, nbytes) in sorted(deltas.items()):
+        lines.append(f"pda_rerun_delta_bytes_total{_labels(scope=scope)} {nbytes}")
+
+    cache_rows = [(name, cached_fn.cache_info()) for name, cached_fn in sorted(_caches.items())]
+    for metric, kind, help_text, field in (
+        ("pda_cache_hits_total", "counter", "Cache hits.", "hits"),
+        ("pda_cache_misses_total", "counter", "Cache misses.", "misses"),
+        ("pda_cache_entries", "gauge", "Entries currently held by the cache.", "currsize"),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, info in cache_rows:
+            lines.append(f"{metric}{_labels(cache=name)} {getattr(info, field)}")
+
+    for kind, metrics in (("gauge", _gauges), ("counter", _counters)):
+        for name, (help_text, read) in sorted(metrics.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {read()}")
+
+    return "\n".join(lines) + "\n"
+
+def write_file(path: str):
+    """
+    計測値をファイルに書き出す（読み取り側が途中の内容を読まないよう、置き換えで書き込む）
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(temp_path, path)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    GET /metrics で計測値を返すハンドラ
+    """
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_http_server(port: int, host: str = DEFAULT_HTTP_HOST) -> ThreadingHTTPServer:
+    """
+    計測値を返すHTTPサーバーをバックグラウンドのスレッドで起動する
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+def start_file_writer(path: str, interval: float = DEFAULT_WRITE_INTERVAL) -> threading.Thread:
+    """
+    計測値を一定間隔でファイルに書き出すスレッドを起動する
+    """
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_file(path)
+            except OSError as e:
+                print(f"Error writing metrics file: {e}")
+
+    thread = threading.Thread(target=loop, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+def configure_from_env(environ: Optional[Dict[str, str]] = None) -> bool:
+    """
+    環境変数に従って計測と出力を開始する（プロセス内で1回のみ）
+
+    Returns:
+        計測が有効かどうか
+    """
+    global _exporter_started
+
+    environ = os.environ if environ is None else environ
+    port = environ.get("PDA_METRICS_PORT")
+    path = environ.get("PDA_METRICS_FILE")
+    if not port and not path:
+        return enabled
+
+    with _lock:
+        if _exporter_started:
+            return enabled
+        _exporter_started = True
+
+    enable()
+    if port:
+        try:
+            start_http_server(int(port), environ.get("PDA_METRICS_HOST") or DEFAULT_HTTP_HOST)
+        except (OSError, ValueError) as e:
+            # Streamlitの複数プロセスなどでポートが使用中の場合は計測のみ行う
+            print(f"Error starting metrics server: {e}")
+    if path:
+        start_file_writer(path, float(environ.get("PDA_METRICS_INTERVAL") or DEFAULT_WRITE_INTERVAL))
+    return enabled
+
+configure_from_env()
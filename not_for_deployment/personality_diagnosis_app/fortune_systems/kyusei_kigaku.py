@@ -1,19 +1,65 @@
 import datetime
-from typing import Dict, Any, List
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
+from . import rules
 from .base import FortuneSystem
+from .records import KYUSEI_LABELS, KyuseiKigakuRecord, code_of
 from utils.date_utils import get_kyusei
 
+# 年によって変わる診断結果の項目（それ以外は生年月日だけで決まる）
+YEAR_FIELDS = ("yearly_fortune",)
+
+class YearClock:
+    """
+    現在の年を取得する時計
+    年が変わる時刻までは計算済みの年を返し、診断のたびに日時を組み立てない
+    
+    Args:
+        clock: 現在時刻（UNIX時間）を返す関数（テストで差し替える）
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._year = 0
+        self._start = 0.0  # 計算済みの年の開始時刻
+        self._end = 0.0    # 次の年の開始時刻
+    
+    def year(self) -> int:
+        now = self.clock()
+        if not self._start <= now < self._end:
+            # 他のスレッドが範囲の確認を通った直後に古い年を返さないよう、年を先に更新する
+            year = datetime.datetime.fromtimestamp(now).year
+            self._year = year
+            self._start = datetime.datetime(year, 1, 1).timestamp()
+            self._end = datetime.datetime(year + 1, 1, 1).timestamp()
+        return self._year
+
 class KyuseiKigaku(FortuneSystem):
     """
     九星気学による性格診断システム
+    年運以外は生年月日だけで決まり、年運は (本命星, 年) ごとにキャッシュして年が変わったら破棄する
+    
+    Args:
+        clock: 年運を求める年を決める時計（省略時はシステム時刻）
     """
     
-    def __init__(self):
+    def __init__(self, clock: Optional[YearClock] = None):
         """
         初期化メソッド
         """
         super().__init__("kyusei_kigaku_data.json")
+        self.clock = clock or YearClock()
+        self._yearly_fortunes: Dict[Tuple[str, int], str] = {}
+        self._yearly_fortunes_year = 0
+        self._yearly_lock = threading.Lock()
+    
+    def current_year(self) -> int:
+        """
+        年運を求める年（現在の年）を取得する
+        """
+        return self.clock.year()
     
     def diagnose(self, birth_date: datetime.date) -> Dict[str, Any]:
         """
@@ -25,35 +71,30 @@ class KyuseiKigaku(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
-        # 本命星を算出
-        honmei_sei = get_kyusei(birth_date)
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date, year: Optional[int] = None) -> KyuseiKigakuRecord:
+        """
+        誕生日から九星気学による診断結果レコードを作成する
         
-        # 月命星を算出
+        Args:
+            birth_date: 生年月日
+            year: 年運を求める年（省略時は現在の年）
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
+        # 本命星と月命星を算出
+        honmei_sei = get_kyusei(birth_date)
         getsu_mei_sei = self._calculate_getsu_mei_sei(birth_date)
         
-        # 五行を取得
-        gogyo = self._get_gogyo(honmei_sei)
-        
-        # 性格特性を取得
-        personality_traits = self.get_personality_traits(honmei_sei)
-        
-        # 相性を取得
-        compatibility = self._get_compatibility(honmei_sei)
-        
-        # 年運を取得
-        yearly_fortune = self._get_yearly_fortune(honmei_sei, datetime.datetime.now().year)
-        
-        # 結果を返す
-        result = {
-            "honmei_sei": honmei_sei,
-            "getsu_mei_sei": getsu_mei_sei,
-            "gogyo": gogyo,
-            "personality_traits": personality_traits,
-            "compatibility": compatibility,
-            "yearly_fortune": yearly_fortune
-        }
-        
-        return result
+        # 年運は診断した年のものを返す
+        return KyuseiKigakuRecord(
+            self,
+            code_of(KYUSEI_LABELS, honmei_sei),
+            code_of(KYUSEI_LABELS, getsu_mei_sei),
+            year if year is not None else self.current_year(),
+        )
     
     def _calculate_getsu_mei_sei(self, birth_date: datetime.date) -> str:
         """
@@ -109,49 +150,17 @@ class KyuseiKigaku(FortuneSystem):
             相性
         """
         # データファイルから相性情報を取得
-        if "compatibility" in self.data and honmei_sei in self.data["compatibility"]:
-            return self.data["compatibility"][honmei_sei]
+        compatibility = self._lookup("compatibility", honmei_sei)
+        if compatibility is not None:
+            return compatibility
         
         # データがない場合はデフォルト値
-        # 九星の相性マップ（簡略化した例）
-        default_compatibility = {
-            "good": [],
-            "bad": []
-        }
-        
-        if honmei_sei == "一白水星":
-            default_compatibility["good"] = ["六白金星", "八白土星"]
-            default_compatibility["bad"] = ["四緑木星", "九紫火星"]
-        elif honmei_sei == "二黒土星":
-            default_compatibility["good"] = ["三碧木星", "四緑木星"]
-            default_compatibility["bad"] = ["七赤金星", "六白金星"]
-        elif honmei_sei == "三碧木星":
-            default_compatibility["good"] = ["二黒土星", "五黄土星"]
-            default_compatibility["bad"] = ["七赤金星", "一白水星"]
-        elif honmei_sei == "四緑木星":
-            default_compatibility["good"] = ["二黒土星", "五黄土星"]
-            default_compatibility["bad"] = ["九紫火星", "一白水星"]
-        elif honmei_sei == "五黄土星":
-            default_compatibility["good"] = ["三碧木星", "四緑木星"]
-            default_compatibility["bad"] = ["六白金星", "七赤金星"]
-        elif honmei_sei == "六白金星":
-            default_compatibility["good"] = ["一白水星", "九紫火星"]
-            default_compatibility["bad"] = ["二黒土星", "五黄土星"]
-        elif honmei_sei == "七赤金星":
-            default_compatibility["good"] = ["八白土星", "九紫火星"]
-            default_compatibility["bad"] = ["二黒土星", "三碧木星"]
-        elif honmei_sei == "八白土星":
-            default_compatibility["good"] = ["一白水星", "七赤金星"]
-            default_compatibility["bad"] = ["二黒土星", "五黄土星"]
-        elif honmei_sei == "九紫火星":
-            default_compatibility["good"] = ["六白金星", "七赤金星"]
-            default_compatibility["bad"] = ["一白水星", "四緑木星"]
-        
-        return default_compatibility
+        return rules.KYUSEI_COMPATIBILITY_TABLE.get(honmei_sei)
     
     def _get_yearly_fortune(self, honmei_sei: str, year: int) -> str:
         """
         本命星と年から年運を取得する
+        現在の年が変わったらキャッシュを破棄する（過去の年の結果を残し続けない）
         
         Args:
             honmei_sei: 本命星
@@ -160,9 +169,26 @@ class KyuseiKigaku(FortuneSystem):
         Returns:
             年運
         """
+        current_year = self.current_year()
+        key = (honmei_sei, year)
+        with self._yearly_lock:
+            if self._yearly_fortunes_year != current_year:
+                self._yearly_fortunes.clear()
+                self._yearly_fortunes_year = current_year
+            fortune = self._yearly_fortunes.get(key)
+        if fortune is None:
+            fortune = self._find_yearly_fortune(honmei_sei, year)
+            with self._yearly_lock:
+                self._yearly_fortunes[key] = fortune
+        return fortune
+    
+    def _find_yearly_fortune(self, honmei_sei: str, year: int) -> str:
+        """
+        データファイルから本命星と年の年運を探す
+        """
         # データファイルから年運情報を取得
-        if "yearly_fortune" in self.data and honmei_sei in self.data["yearly_fortune"]:
-            fortunes = self.data["yearly_fortune"][honmei_sei]
+        fortunes = self._lookup("yearly_fortune", honmei_sei)
+        if fortunes is not None:
             
             # 年を9で割った余りを使用して年運を取得
             index = (year % 9)
@@ -179,6 +205,20 @@ class KyuseiKigaku(FortuneSystem):
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> KyuseiKigaku:
+    """
+    九星気学のシングルトンインスタンスを取得する
+    
+    Returns:
+        KyuseiKigakuインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = KyuseiKigaku()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     九星気学による診断を行うファサードメソッド
@@ -189,9 +229,44 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date, year: Optional[int] = None) -> KyuseiKigakuRecord:
+    """
+    九星気学による診断結果レコードを取得するファサードメソッド
     
-    if _instance is None:
-        _instance = KyuseiKigaku()
+    Args:
+        birth_date: 生年月日
+        year: 年運を求める年（省略時は現在の年）
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date, year)
+
+def current_year() -> int:
+    """
+    年運を求める年（現在の年）を取得するファサードメソッド
+    """
+    return get_instance().current_year()
+
+def apply_year(result: Dict[str, Any], year: Optional[int] = None) -> Dict[str, Any]:
+    """
+    生年月日だけで決まる診断結果に、指定した年（省略時は現在の年）の年運を加える
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        result: 九星気学の診断結果（YEAR_FIELDS を含まなくてよい）
+        year: 年運を求める年
+        
+    Returns:
+        年運を加えた診断結果（元の辞書は変更しない）
+    """
+    instance = get_instance()
+    year = year if year is not None else instance.current_year()
+    return dict(result, yearly_fortune=instance._get_yearly_fortune(result["honmei_sei"], year))
+
+def without_year(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    診断結果から年によって変わる項目を除く（生年月日だけをキーにしてキャッシュするため）
+    """
+    return {key: value for key, value in result.items() if key not in YEAR_FIELDS}
@@ -2,6 +2,7 @@ import datetime
 from typing import Dict, Any, List
 
 from .base import FortuneSystem
+from .records import GOGYO_LABELS, INYO_LABELS, OnmyoGogyoRecord, code_of
 from utils.date_utils import get_ten_kan
 
 class OnmyoGogyo(FortuneSystem):
@@ -25,35 +26,25 @@ class OnmyoGogyo(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date) -> OnmyoGogyoRecord:
+        """
+        誕生日から陰陽五行による診断結果レコードを作成する
+        
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
         # 天干から陰陽を取得
-        ten_kan = get_ten_kan(birth_date.year)
-        inyo = self._calculate_inyo(ten_kan)
+        inyo = self._calculate_inyo(get_ten_kan(birth_date.year))
         
         # 五行を算出
         gogyo = self._calculate_gogyo(birth_date)
         
-        # 相性の良い五行と悪い五行を算出
-        compatible_gogyo = self._calculate_compatible_gogyo(gogyo)
-        incompatible_gogyo = self._calculate_incompatible_gogyo(gogyo)
-        
-        # 性格特性を取得
-        personality_traits = self.get_personality_traits(gogyo)
-        
-        # 強みと弱みを取得
-        strengths_weaknesses = self.get_strengths_and_weaknesses(gogyo)
-        
-        # 結果を返す
-        result = {
-            "inyo": inyo,
-            "gogyo": gogyo,
-            "compatible_gogyo": compatible_gogyo,
-            "incompatible_gogyo": incompatible_gogyo,
-            "personality_traits": personality_traits,
-            "strengths": strengths_weaknesses["strengths"],
-            "weaknesses": strengths_weaknesses["weaknesses"]
-        }
-        
-        return result
+        return OnmyoGogyoRecord(self, code_of(INYO_LABELS, inyo), code_of(GOGYO_LABELS, gogyo))
     
     def _calculate_inyo(self, ten_kan: str) -> str:
         """
@@ -160,6 +151,20 @@ class OnmyoGogyo(FortuneSystem):
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> OnmyoGogyo:
+    """
+    陰陽五行のシングルトンインスタンスを取得する
+    
+    Returns:
+        OnmyoGogyoインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = OnmyoGogyo()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     陰陽五行による診断を行うファサードメソッド
@@ -170,9 +175,16 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
-    
-    if _instance is None:
-        _instance = OnmyoGogyo()
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date) -> OnmyoGogyoRecord:
+    """
+    陰陽五行による診断結果レコードを取得するファサードメソッド
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        birth_date: 生年月日
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date)
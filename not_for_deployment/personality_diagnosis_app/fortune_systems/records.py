@@ -0,0 +1,392 @@
+"""
+占術ごとの診断結果レコード
+
+診断結果は整数コードだけを保持し、ラベルや解説文はアクセスされた時点で占術のデータから引く。
+レコードは変更できず、解説文などもタプルや読み取り専用のマッピングとして返すため、
+読み込み済みのデータを誤って書き換えることはない。
+既存の呼び出し元向けに、従来と同じキーを持つ辞書を返す to_dict() を提供する。
+読み取り専用のマッピングは pickle で辞書として保存し、読み込み時に読み取り専用に戻すため、
+to_dict() の結果はそのままプロセス間で受け渡しできる。
+"""
+import copyreg
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Sequence, Tuple
+
+# 五行
+GOGYO_LABELS = ("木", "火", "土", "金", "水")
+
+# 陰陽
+INYO_LABELS = ("陽", "陰")
+
+# 九星
+KYUSEI_LABELS = ("一白水星", "二黒土星", "三碧木星", "四緑木星", "五黄土星",
+                 "六白金星", "七赤金星", "八白土星", "九紫火星")
+
+# 12星座
+ZODIAC_LABELS = ("牡羊座", "牡牛座", "双子座", "蟹座", "獅子座", "乙女座",
+                 "天秤座", "蠍座", "射手座", "山羊座", "水瓶座", "魚座")
+
+# 惑星（西洋占星術の惑星配置の並び順）
+PLANET_NAMES = ("水星", "金星", "火星", "木星", "土星")
+
+# 宿曜の28宿
+SHUKUYO_LABELS = ("角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿",
+                  "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿",
+                  "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿")
+
+# 動物占いの動物とタイプ
+ANIMAL_LABELS = ("ねずみ", "うし", "とら", "うさぎ", "たつ", "へび",
+                 "うま", "ひつじ", "さる", "とり", "いぬ", "いのしし")
+ANIMAL_TYPE_LABELS = ("チャーミング", "ワイルド", "ピュア", "クール")
+
+# コードが求まらなかった場合の値
+UNKNOWN_CODE = -1
+UNKNOWN = "不明"
+
+def code_of(labels: Sequence[str], label: str) -> int:
+    """
+    ラベルのコードを取得する（一覧にない場合は UNKNOWN_CODE）
+    """
+    try:
+        return labels.index(label)
+    except ValueError:
+        return UNKNOWN_CODE
+
+def label_of(labels: Sequence[str], code: int) -> str:
+    """
+    コードのラベルを取得する（UNKNOWN_CODE の場合は「不明」）
+    """
+    return labels[code] if code != UNKNOWN_CODE else UNKNOWN
+
+def freeze(value: Any) -> Any:
+    """
+    辞書を読み取り専用のマッピングに、リストをタプルに変換する（入れ子も含む）
+    """
+    kind = type(value)
+    if kind is dict:
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if kind is list:
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value: Any) -> Any:
+    """
+    読み取り専用のマッピングやタプルを、新しい辞書やリストに変換する（入れ子も含む）
+    """
+    kind = type(value)
+    if kind is dict or kind is MappingProxyType:
+        return {key: thaw(item) for key, item in value.items()}
+    if kind is list or kind is tuple:
+        return [thaw(item) for item in value]
+    return value
+
+def _frozen_mapping(items: Dict[Any, Any]) -> Mapping[Any, Any]:
+    return MappingProxyType(items)
+
+def _reduce_frozen_mapping(value: MappingProxyType):
+    return _frozen_mapping, (dict(value),)
+
+# MappingProxyType は標準では pickle できないため、辞書として保存する
+copyreg.pickle(MappingProxyType, _reduce_frozen_mapping)
+
+def json_default(value: Any) -> Any:
+    """
+    json.dumps の default に指定し、読み取り専用のマッピングを出力できるようにする
+    """
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class resolved:
+    """
+    占術のデータから引く項目を定義するデコレーター
+    読み込み済みのデータは変更できない形になっているため、値は複製せずにそのまま返す
+    （データ以外から作られた辞書やリストは読み取り専用に変換する）
+    """
+
+    def __init__(self, fget: Callable[[Any], Any]):
+        self.fget = fget
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, record: Any, owner: type = None) -> Any:
+        if record is None:
+            return self
+        return freeze(self.fget(record))
+
+class DiagnosisRecord:
+    """
+    診断結果レコードの基底クラス
+
+    Args:
+        system: 診断を行った占術のインスタンス（解説文の参照に使う）
+        *codes: CODE_FIELDS の順の整数コード
+    """
+    __slots__ = ("_system",)
+
+    # 整数コードを保持するスロット名
+    CODE_FIELDS: Tuple[str, ...] = ()
+
+    # to_dict() で出力する項目名（表示順）
+    FIELDS: Tuple[str, ...] = ()
+
+    # to_dict() で使う (項目名, 値の取得関数) の一覧（サブクラスの定義時に作成）
+    _DICT_GETTERS: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        getters = []
+        for name in cls.FIELDS:
+            attribute = getattr(cls, name)
+            getters.append((name, attribute.fget))
+        cls._DICT_GETTERS = tuple(getters)
+
+    def __init__(self, system, *codes):
+        object.__setattr__(self, "_system", system)
+        for name, code in zip(self.CODE_FIELDS, codes):
+            object.__setattr__(self, name, code)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def codes(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.CODE_FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and self._system is other._system and self.codes == other.codes
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.codes))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.CODE_FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        従来の診断結果と同じキーを持つ辞書を取得する
+        値は読み込み済みのデータを複製せずに参照する（変更が必要な場合は thaw() で複製する）
+        pickle で保存でき、読み込んだ値も読み取り専用のマッピングになる
+        JSONに変換する場合は json.dumps(..., default=json_default) を使う
+        """
+        return {name: getter(self) for name, getter in self._DICT_GETTERS}
+
+class ShichuuSuimeiRecord(DiagnosisRecord):
+    """
+    四柱推命の診断結果
+    """
+    __slots__ = ("ten_kan_code", "day_shi_code", "juu_ni_un_code", "tsuhen_sei_code")
+    CODE_FIELDS = __slots__
+    FIELDS = ("ten_kan", "juu_ni_shi", "tsuhen_sei", "gogyo", "nishu_gogyo",
+              "personality_traits", "strengths", "weaknesses", "career_advice")
+
+    @property
+    def ten_kan(self) -> str:
+        return self._system.ten_kan[self.ten_kan_code]
+
+    @property
+    def day_juu_ni_shi(self) -> str:
+        return self._system.juu_ni_shi[self.day_shi_code]
+
+    @property
+    def juu_ni_shi(self) -> str:
+        # 従来の診断結果に合わせ、「juu_ni_shi」には十二運を返す
+        return self._system.juu_ni_un[self.juu_ni_un_code]
+
+    @property
+    def tsuhen_sei(self) -> str:
+        return label_of(self._system.tsuhen_sei, self.tsuhen_sei_code)
+
+    @property
+    def gogyo(self) -> str:
+        return self._system._calculate_gogyo(self.ten_kan)
+
+    @property
+    def nishu_gogyo(self) -> str:
+        return self.gogyo
+
+    @property
+    def _key(self) -> str:
+        return self.ten_kan + self.day_juu_ni_shi
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self._key)
+
+    @resolved
+    def strengths(self) -> Tuple[str, ...]:
+        return self._system.get_strengths_and_weaknesses(self._key)["strengths"]
+
+    @resolved
+    def weaknesses(self) -> Tuple[str, ...]:
+        return self._system.get_strengths_and_weaknesses(self._key)["weaknesses"]
+
+    @property
+    def career_advice(self) -> str:
+        return self._system._get_career_advice(self._key)
+
+class ShukuyoRecord(DiagnosisRecord):
+    """
+    宿曜の診断結果
+    """
+    __slots__ = ("shukuyo_code",)
+    CODE_FIELDS = __slots__
+    FIELDS = ("shukuyo", "honmei_kyu", "shugo_son", "personality_traits", "compatibility")
+
+    @property
+    def shukuyo(self) -> str:
+        return label_of(SHUKUYO_LABELS, self.shukuyo_code)
+
+    @property
+    def honmei_kyu(self) -> str:
+        return self._system._get_honmei_kyu(self.shukuyo)
+
+    @property
+    def shugo_son(self) -> str:
+        return self._system._get_shugo_son(self.shukuyo)
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self.shukuyo)
+
+    @resolved
+    def compatibility(self) -> Mapping[str, Tuple[str, ...]]:
+        return self._system.get_compatibility(self.shukuyo)
+
+class OnmyoGogyoRecord(DiagnosisRecord):
+    """
+    陰陽五行の診断結果
+    """
+    __slots__ = ("inyo_code", "gogyo_code")
+    CODE_FIELDS = __slots__
+    FIELDS = ("inyo", "gogyo", "compatible_gogyo", "incompatible_gogyo",
+              "personality_traits", "strengths", "weaknesses")
+
+    @property
+    def inyo(self) -> str:
+        return label_of(INYO_LABELS, self.inyo_code)
+
+    @property
+    def gogyo(self) -> str:
+        return label_of(GOGYO_LABELS, self.gogyo_code)
+
+    @property
+    def compatible_gogyo(self) -> str:
+        return self._system._calculate_compatible_gogyo(self.gogyo)
+
+    @property
+    def incompatible_gogyo(self) -> str:
+        return self._system._calculate_incompatible_gogyo(self.gogyo)
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self.gogyo)
+
+    @resolved
+    def strengths(self) -> Tuple[str, ...]:
+        return self._system.get_strengths_and_weaknesses(self.gogyo)["strengths"]
+
+    @resolved
+    def weaknesses(self) -> Tuple[str, ...]:
+        return self._system.get_strengths_and_weaknesses(self.gogyo)["weaknesses"]
+
+class KyuseiKigakuRecord(DiagnosisRecord):
+    """
+    九星気学の診断結果（年運は診断した年のもの）
+    """
+    __slots__ = ("honmei_sei_code", "getsu_mei_sei_code", "year")
+    CODE_FIELDS = __slots__
+    FIELDS = ("honmei_sei", "getsu_mei_sei", "gogyo", "personality_traits", "compatibility", "yearly_fortune")
+
+    @property
+    def honmei_sei(self) -> str:
+        return label_of(KYUSEI_LABELS, self.honmei_sei_code)
+
+    @property
+    def getsu_mei_sei(self) -> str:
+        return label_of(KYUSEI_LABELS, self.getsu_mei_sei_code)
+
+    @property
+    def gogyo(self) -> str:
+        return self._system._get_gogyo(self.honmei_sei)
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self.honmei_sei)
+
+    @resolved
+    def compatibility(self) -> Mapping[str, Tuple[str, ...]]:
+        return self._system._get_compatibility(self.honmei_sei)
+
+    @property
+    def yearly_fortune(self) -> str:
+        return self._system._get_yearly_fortune(self.honmei_sei, self.year)
+
+class WesternAstrologyRecord(DiagnosisRecord):
+    """
+    西洋占星術の診断結果
+    """
+    __slots__ = ("sun_sign_code", "moon_sign_code", "ascendant_code", "planet_codes")
+    CODE_FIELDS = __slots__
+    FIELDS = ("sun_sign", "moon_sign", "ascendant", "planets", "personality_traits", "chart_data")
+
+    @property
+    def sun_sign(self) -> str:
+        return label_of(ZODIAC_LABELS, self.sun_sign_code)
+
+    @property
+    def moon_sign(self) -> str:
+        return label_of(ZODIAC_LABELS, self.moon_sign_code)
+
+    @property
+    def ascendant(self) -> str:
+        return label_of(ZODIAC_LABELS, self.ascendant_code)
+
+    @property
+    def planets(self) -> Mapping[str, str]:
+        return MappingProxyType({
+            name: label_of(ZODIAC_LABELS, code) for name, code in zip(PLANET_NAMES, self.planet_codes)
+        })
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self.sun_sign)
+
+    @resolved
+    def chart_data(self) -> Mapping[str, float]:
+        return self._system._create_chart_data(self.sun_sign)
+
+class AnimalFortuneRecord(DiagnosisRecord):
+    """
+    動物占いの診断結果
+    """
+    __slots__ = ("animal_code", "type_code")
+    CODE_FIELDS = __slots__
+    FIELDS = ("animal", "type", "full_type", "personality_traits", "compatibility", "career")
+
+    @property
+    def animal(self) -> str:
+        return label_of(ANIMAL_LABELS, self.animal_code)
+
+    @property
+    def type(self) -> str:
+        return label_of(ANIMAL_TYPE_LABELS, self.type_code)
+
+    @property
+    def full_type(self) -> str:
+        return f"{self.animal}（{self.type}タイプ）"
+
+    @resolved
+    def personality_traits(self) -> Mapping[str, Any]:
+        return self._system.get_personality_traits(self.full_type)
+
+    @resolved
+    def compatibility(self) -> Mapping[str, Tuple[str, ...]]:
+        return self._system._get_compatibility(self.animal)
+
+    @resolved
+    def career(self) -> Tuple[str, ...]:
+        return self._system._get_career(self.full_type)
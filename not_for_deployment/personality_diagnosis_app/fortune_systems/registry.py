@@ -0,0 +1,142 @@
+"""
+占術のプラグインレジストリ
+
+各占術は、表示名・実装モジュール・結果カードの描画関数などのメタデータ（SystemEntry）として登録する。
+組み込みの6占術に加えて、エントリーポイント（グループ ENTRY_POINT_GROUP）で配布された占術も登録できる。
+
+有効にする占術は環境変数 PDA_SYSTEMS に占術キーをカンマ区切りで指定する（表示順、省略時は全て）。
+    PDA_SYSTEMS=shukuyo,western_astrology streamlit run personality_diagnosis_app/app.py
+
+実装モジュールは最初に診断するときに読み込むため、無効な占術のモジュールやデータファイルは読み込まれない。
+"""
+import functools
+import importlib
+import os
+from importlib import metadata
+from types import ModuleType
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# プラグインを探すエントリーポイントのグループ
+ENTRY_POINT_GROUP = "personality_diagnosis_app.fortune_systems"
+
+class SystemEntry(NamedTuple):
+    """
+    レジストリに登録する占術の定義
+
+    module は diagnose(birth_date)・record(birth_date)・get_instance() を持つモジュール。
+    renderer は「モジュール:属性」形式で、診断結果（辞書）から結果カードのHTMLを返す関数を指す
+    （None の場合は result_templates.CARD_SPECS の定義で描画する）。
+    """
+    key: str
+    title: str
+    module: str
+    column: int = 0
+    renderer: Optional[str] = None
+
+# 組み込みの占術（表示順）
+BUILTIN_SYSTEMS: Tuple[SystemEntry, ...] = (
+    SystemEntry("shichuu_suimei", "四柱推命", f"{__package__}.shichuu_suimei", 0),
+    SystemEntry("shukuyo", "宿曜", f"{__package__}.shukuyo", 0),
+    SystemEntry("onmyo_gogyo", "陰陽五行", f"{__package__}.onmyo_gogyo", 0),
+    SystemEntry("kyusei_kigaku", "九星気学", f"{__package__}.kyusei_kigaku", 1),
+    SystemEntry("western_astrology", "西洋占星術", f"{__package__}.western_astrology", 1),
+    SystemEntry("animal_fortune", "動物占い", f"{__package__}.animal_fortune", 1),
+)
+
+def _plugin_entries() -> List[SystemEntry]:
+    """
+    エントリーポイントで登録された占術を取得する
+    読み込めないプラグインは無視する（アプリ全体を止めない）
+    """
+    entries = []
+    try:
+        try:
+            points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            # Python 3.9以前は group 引数がない
+            points = metadata.entry_points().get(ENTRY_POINT_GROUP, ())
+    except Exception as e:
+        print(f"Error reading fortune system plugins: {e}")
+        return entries
+    for point in points:
+        try:
+            entry = point.load()
+        except Exception as e:
+            print(f"Error loading fortune system plugin {point.name}: {e}")
+            continue
+        entries.append(entry if isinstance(entry, SystemEntry) else SystemEntry(*entry))
+    return entries
+
+@functools.lru_cache(maxsize=None)
+def available() -> Dict[str, SystemEntry]:
+    """
+    登録されている全ての占術（組み込み → プラグインの順、同じキーはプラグインで上書き）
+    """
+    entries = {entry.key: entry for entry in BUILTIN_SYSTEMS}
+    for entry in _plugin_entries():
+        entries[entry.key] = entry
+    return entries
+
+@functools.lru_cache(maxsize=None)
+def enabled() -> Tuple[SystemEntry, ...]:
+    """
+    有効な占術（表示順）を取得する
+
+    Returns:
+        PDA_SYSTEMS で指定された占術（未指定の場合は登録されている全ての占術）
+    """
+    entries = available()
+    config = os.environ.get("PDA_SYSTEMS", "").strip()
+    if not config:
+        return tuple(entries.values())
+
+    keys = [key.strip() for key in config.split(",") if key.strip()]
+    unknown = [key for key in keys if key not in entries]
+    if unknown:
+        raise ValueError(f"Unknown fortune systems in PDA_SYSTEMS: {', '.join(unknown)} "
+                         f"(available: {', '.join(entries)})")
+    return tuple(entries[key] for key in dict.fromkeys(keys))
+
+def enabled_keys() -> Tuple[str, ...]:
+    return tuple(entry.key for entry in enabled())
+
+def is_enabled(key: str) -> bool:
+    return key in enabled_keys()
+
+def get(key: str) -> SystemEntry:
+    """
+    有効な占術の定義を取得する（無効な場合は KeyError）
+    """
+    for entry in enabled():
+        if entry.key == key:
+            return entry
+    raise KeyError(f"Fortune system is not enabled: {key}")
+
+_modules: Dict[str, ModuleType] = {}
+
+def load(key: str) -> ModuleType:
+    """
+    占術の実装モジュールを読み込む（最初に呼び出したときだけ import する）
+    """
+    module = _modules.get(key)
+    if module is None:
+        # import 自体がスレッドセーフなので、同時に呼ばれても同じモジュールが入る
+        module = _modules[key] = importlib.import_module(get(key).module)
+    return module
+
+def loaded_keys() -> Tuple[str, ...]:
+    """
+    実装モジュールを読み込み済みの占術キー
+    """
+    return tuple(_modules)
+
+@functools.lru_cache(maxsize=None)
+def renderer(key: str):
+    """
+    占術の結果カードの描画関数を取得する（CARD_SPECS で描画する場合は None）
+    """
+    path = get(key).renderer
+    if path is None:
+        return None
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
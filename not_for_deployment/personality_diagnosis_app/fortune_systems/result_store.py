@@ -0,0 +1,329 @@
+"""
+複数のプロセス・再起動をまたいで診断結果を共有するSQLiteキャッシュ
+
+環境変数 PDA_RESULT_STORE にデータベースファイルのパスを指定した場合のみ有効になる。
+    PDA_RESULT_STORE         データベースファイルのパス（全レプリカから参照できる場所）
+    PDA_RESULT_STORE_MAX_MB  保存する結果の合計サイズの上限（MB、既定は256）
+
+診断結果は生年月日の序数とバンドルのバージョン（データファイルと占術ロジックのハッシュ）をキーに、
+zlibで圧縮したJSONとして保存する（共通部分の多い結果を小さくするため、プリセット辞書を使う）。データや占術ロジックを更新すると新しいバージョンのキーで保存し直す。
+WALモードで開くため、読み込みは書き込み中でも待たされない。読み込み時の最終参照時刻の更新はまとめて行い、
+読み込みのたびに書き込みロックを取らないようにする。
+九星気学の年運は年によって変わるため保存せず、読み込み時に現在の年のものを加える。
+"""
+import datetime
+import functools
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from . import engine, instrumentation, registry
+from .records import json_default
+
+# 保存する結果の合計サイズの上限の既定値（バイト）
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 上限を超えた場合に、この割合まで古い結果を削除する
+EVICT_TO_RATIO = 0.9
+
+# 最終参照時刻の更新をまとめる件数と間隔（秒）
+TOUCH_BATCH_SIZE = 256
+TOUCH_INTERVAL = 5.0
+
+# 書き込みロックを待つ時間（ミリ秒、超えた場合は保存を諦めて計算結果をそのまま返す）
+WRITE_TIMEOUT_MS = 50
+
+# 上限を確認する間隔（書き込み件数）
+EVICT_CHECK_INTERVAL = 512
+
+# 圧縮のプリセット辞書を作る標本の件数と間隔（日）
+ZDICT_SAMPLES = 64
+ZDICT_STEP_DAYS = 397
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ordinal INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (ordinal, version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+def _bundle_hash() -> str:
+    """
+    データファイルと占術ロジックのソースのハッシュ
+    """
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = sorted(
+        glob.glob(os.path.join(app_dir, "data", "*.json"))
+        + glob.glob(os.path.join(app_dir, "fortune_systems", "*.py"))
+        + [os.path.join(app_dir, "utils", "date_utils.py")]
+    )
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.relpath(path, app_dir).encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+BUNDLE_HASH = _bundle_hash()
+
+@functools.lru_cache(maxsize=None)
+def bundle_version() -> str:
+    """
+    キャッシュのキーに使うバージョン
+    保存するのは生年月日だけで決まる部分なので、年が変わっても同じバージョンを使い続ける
+    有効な占術によって保存する結果（と圧縮の辞書）が変わるため、有効な占術もバージョンに含める
+    """
+    systems = hashlib.sha256(",".join(registry.enabled_keys()).encode("utf-8")).hexdigest()[:8]
+    return f"{BUNDLE_HASH}-{systems}"
+
+def without_year(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    全占術の診断結果から年によって変わる項目を除く
+    """
+    if "kyusei_kigaku" not in results:
+        return results
+    kyusei_kigaku = registry.load("kyusei_kigaku")
+    return dict(results, kyusei_kigaku=kyusei_kigaku.without_year(results["kyusei_kigaku"]))
+
+def apply_year(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    生年月日だけで決まる診断結果に、現在の年の年運を加える
+    """
+    if "kyusei_kigaku" not in results:
+        return results
+    kyusei_kigaku = registry.load("kyusei_kigaku")
+    return dict(results, kyusei_kigaku=kyusei_kigaku.apply_year(results["kyusei_kigaku"]))
+
+def _to_json(results: Dict[str, Dict[str, Any]]) -> bytes:
+    return json.dumps(without_year(results), ensure_ascii=False, separators=(",", ":"),
+                      default=json_default).encode("utf-8")
+
+@functools.lru_cache(maxsize=4)
+def _zdict(version: str) -> bytes:
+    """
+    圧縮のプリセット辞書を作成する
+    バージョンが同じなら全レプリカで同じ辞書になるよう、決まった生年月日の診断結果（年運を除く）から作る
+    """
+    start = datetime.date(1900, 1, 1)
+    samples = b"".join(
+        _to_json(engine.diagnose_all(start + datetime.timedelta(days=i * ZDICT_STEP_DAYS)))
+        for i in range(ZDICT_SAMPLES)
+    )
+    return samples[-32768:]
+
+def encode(results: Dict[str, Dict[str, Any]], version: str) -> bytes:
+    """
+    診断結果を圧縮したJSONに変換する
+    """
+    compressor = zlib.compressobj(6, zdict=_zdict(version))
+    return compressor.compress(_to_json(results)) + compressor.flush()
+
+def decode(payload: bytes, version: str) -> Dict[str, Dict[str, Any]]:
+    """
+    圧縮したJSONを診断結果に戻す（年運は含まない）
+    """
+    decompressor = zlib.decompressobj(zdict=_zdict(version))
+    return json.loads(decompressor.decompress(payload))
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class ResultStore:
+    """
+    SQLiteに保存する診断結果のキャッシュ
+    接続はスレッドごとに作成する（sqlite3の接続はスレッド間で共有できないため）
+
+    Args:
+        path: データベースファイルのパス
+        max_bytes: 保存する結果の合計サイズの上限
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.write_skips = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._touched: Dict[Tuple[int, str], int] = {}
+        self._last_touch_flush = time.monotonic()
+        self._writes = 0
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=WRITE_TIMEOUT_MS / 1000, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, ordinal: int, version: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        保存済みの診断結果（年運を除く）を取得する（ない場合はNone）
+        """
+        version = version or bundle_version()
+        row = self._connect().execute(
+            "SELECT payload FROM results WHERE ordinal = ? AND version = ?", (ordinal, version)
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[(ordinal, version)] = int(time.time())
+            flush = (len(self._touched) >= TOUCH_BATCH_SIZE
+                     or time.monotonic() - self._last_touch_flush >= TOUCH_INTERVAL)
+
+        if flush:
+            self._flush_touches()
+        return decode(row[0], version)
+
+    def put(self, ordinal: int, results: Dict[str, Dict[str, Any]], version: Optional[str] = None) -> bool:
+        """
+        診断結果を保存する
+        書き込みロックを待ちきれなかった場合は保存せずにFalseを返す
+        """
+        version = version or bundle_version()
+        payload = encode(results, version)
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO results (ordinal, version, payload, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (ordinal, version, payload, len(payload), int(time.time())),
+            )
+        except sqlite3.OperationalError:
+            with self._lock:
+                self.write_skips += 1
+            return False
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % EVICT_CHECK_INTERVAL == 0
+        if check:
+            self.evict()
+        return True
+
+    def _flush_touches(self):
+        """
+        まとめておいた最終参照時刻を1回の書き込みで反映する
+        """
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._last_touch_flush = time.monotonic()
+        if not touched:
+            return
+        try:
+            self._connect().executemany(
+                "UPDATE results SET last_access = ? WHERE ordinal = ? AND version = ?",
+                [(accessed, ordinal, version) for (ordinal, version), accessed in touched.items()],
+            )
+        except sqlite3.OperationalError:
+            # 書き込み中の場合は反映を諦める（LRUの精度が少し下がるだけ）
+            pass
+
+    def total_bytes(self) -> int:
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        合計サイズが上限を超えている場合に、最終参照時刻の古い順に削除する
+        更新前のバージョンの結果は参照されなくなるため、この順序で先に削除される
+
+        Returns:
+            削除した件数
+        """
+        self._flush_touches()
+        connection = self._connect()
+        try:
+            total = self.total_bytes()
+            if total <= self.max_bytes:
+                return 0
+            excess = total - int(self.max_bytes * EVICT_TO_RATIO)
+            victims: List[Tuple[int, str]] = []
+            for ordinal, version, size in connection.execute(
+                "SELECT ordinal, version, size FROM results ORDER BY last_access"
+            ):
+                if excess <= 0:
+                    break
+                victims.append((ordinal, version))
+                excess -= size
+            connection.executemany("DELETE FROM results WHERE ordinal = ? AND version = ?", victims)
+        except sqlite3.OperationalError:
+            return 0
+        return len(victims)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self.count())
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> Optional[ResultStore]:
+    """
+    環境変数で指定されたキャッシュを取得する（指定がない場合はNone）
+    """
+    global _store
+
+    path = os.environ.get("PDA_RESULT_STORE")
+    if not path:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                max_mb = float(os.environ.get("PDA_RESULT_STORE_MAX_MB") or DEFAULT_MAX_BYTES / 2**20)
+                _store = ResultStore(path, int(max_mb * 2**20))
+                instrumentation.register_cache("result_store", _store)
+    return _store
+
+def load(ordinal: int) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    保存済みの全占術の診断結果に現在の年の年運を加えて返す（キャッシュが無効か、保存されていない場合はNone）
+    """
+    store = get_store()
+    results = store.get(ordinal) if store is not None else None
+    return apply_year(results) if results is not None else None
+
+def save(ordinal: int, results: Dict[str, Dict[str, Any]]):
+    """
+    全占術の診断結果を保存する（キャッシュが無効な場合は何もしない）
+    """
+    store = get_store()
+    if store is not None:
+        store.put(ordinal, results)
+
+def diagnose_all(birth_date: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """
+    全占術による診断を行う（保存済みの結果があればそれを返す）
+
+    Args:
+        birth_date: 生年月日
+
+    Returns:
+        占術キー → 診断結果
+    """
+    ordinal = birth_date.toordinal()
+    results = load(ordinal)
+    if results is None:
+        results = engine.diagnose_all(birth_date)
+        save(ordinal, results)
+    return results
@@ -0,0 +1,171 @@
+"""
+診断結果から生年月日を逆引きするための転置インデックス
+
+ベクトル化エンジンで期間内の全日付を一度だけ整数コードに変換し、診断項目ごとに
+「コード → 該当する生年月日の序数（昇順）」の対応を作っておく。
+複数の条件による検索は、該当件数の少ない条件から順に序数の配列を積集合で絞り込むだけで済む。
+
+例: 日柱の天干が「甲」で十二運が「帝旺」の日、1980年代の「鬼宿」の日
+    query({"shichuu_suimei.ten_kan": "甲", "shichuu_suimei.juu_ni_shi": "帝旺"})
+    query({"shukuyo.shukuyo": "鬼宿"}, start=datetime.date(1980, 1, 1), end=datetime.date(1989, 12, 31))
+"""
+import datetime
+import functools
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from . import vectorized
+
+# 既定のインデックスの期間（終了日は今年の大晦日）
+RANGE_START = datetime.date(1900, 1, 1)
+
+# 序数の型（datetime.date.max の序数も収まる）
+ORDINAL_DTYPE = np.int32
+
+# 条件の値（1つのラベル、または「いずれか」を表すラベルの列）
+Criterion = Union[str, Sequence[str]]
+
+def default_range_end() -> datetime.date:
+    return datetime.date(datetime.date.today().year, 12, 31)
+
+class ReverseIndex:
+    """
+    期間内の全日付に対する、診断項目ごとの転置インデックス
+    項目ごとに序数を (コード, 序数) の順に並べた配列と、コードごとの開始位置を持つ
+
+    Args:
+        start: 開始日
+        end: 終了日（この日を含む）
+        names: 対象の診断項目（省略時は全項目）
+    """
+
+    def __init__(self, start: datetime.date, end: datetime.date, names: Optional[Sequence[str]] = None):
+        if end < start:
+            raise ValueError(f"end ({end}) is before start ({start})")
+        self.start = start
+        self.end = end
+        ordinals = vectorized.date_range_ordinals(start, end)
+        self.size = len(ordinals)
+        self._ordinals: Dict[str, np.ndarray] = {}
+        self._offsets: Dict[str, np.ndarray] = {}
+
+        for name, codes in vectorized.encode(ordinals, names).items():
+            labels = vectorized.labels(name)
+            # 序数は昇順なので、安定ソートすればコードごとの序数も昇順のまま並ぶ
+            order = np.argsort(codes, kind="stable")
+            counts = np.bincount(codes, minlength=len(labels))
+            self._ordinals[name] = ordinals[order].astype(ORDINAL_DTYPE)
+            self._offsets[name] = np.concatenate(([0], np.cumsum(counts)))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._ordinals)
+
+    def covers(self, start: datetime.date, end: datetime.date) -> bool:
+        return self.start <= start and end <= self.end
+
+    def postings(self, name: str, label: str) -> np.ndarray:
+        """
+        診断項目がラベルに一致する生年月日の序数（昇順）を取得する
+
+        Args:
+            name: 「占術キー.項目名」
+            label: 診断結果のラベル
+
+        Returns:
+            序数の配列（インデックス内部の配列の読み取り専用ビュー）
+        """
+        if name not in self._ordinals:
+            raise KeyError(f"Unknown attribute: {name} (available: {', '.join(self.names)})")
+        labels = vectorized.labels(name)
+        if label not in labels:
+            raise ValueError(f"Unknown label for {name}: {label} (available: {', '.join(labels)})")
+        code = labels.index(label)
+        offsets = self._offsets[name]
+        view = self._ordinals[name][offsets[code]:offsets[code + 1]]
+        view.flags.writeable = False
+        return view
+
+    def _matches(self, name: str, criterion: Criterion) -> np.ndarray:
+        if isinstance(criterion, str):
+            return self.postings(name, criterion)
+        # 「いずれか」の条件はラベルごとの配列の和集合（ラベルが異なれば日付は重複しない）
+        return np.sort(np.concatenate([self.postings(name, label) for label in criterion]))
+
+    def query(self, criteria: Mapping[str, Criterion], start: Optional[datetime.date] = None,
+              end: Optional[datetime.date] = None) -> np.ndarray:
+        """
+        全ての条件に一致する生年月日の序数を検索する
+
+        Args:
+            criteria: 「占術キー.項目名」 → ラベル（またはいずれかに一致すればよいラベルの列）
+            start: 検索期間の開始日（省略時はインデックスの開始日）
+            end: 検索期間の終了日（省略時はインデックスの終了日）
+
+        Returns:
+            一致した序数の配列（昇順）
+        """
+        low = (start or self.start).toordinal()
+        high = (end or self.end).toordinal()
+        if not criteria:
+            return np.arange(max(low, self.start.toordinal()), min(high, self.end.toordinal()) + 1,
+                             dtype=ORDINAL_DTYPE)
+
+        # 期間で切り出してから、件数の少ない条件から順に積集合をとる
+        candidates = []
+        for name, criterion in criteria.items():
+            matches = self._matches(name, criterion)
+            candidates.append(matches[np.searchsorted(matches, low):np.searchsorted(matches, high, side="right")])
+        candidates.sort(key=len)
+
+        result = candidates[0]
+        for matches in candidates[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, matches, assume_unique=True)
+        return result
+
+    def count(self, criteria: Mapping[str, Criterion], start: Optional[datetime.date] = None,
+              end: Optional[datetime.date] = None) -> int:
+        return len(self.query(criteria, start, end))
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._ordinals.values()) + sum(a.nbytes for a in self._offsets.values())
+
+@functools.lru_cache(maxsize=4)
+def build(start: datetime.date, end: datetime.date) -> ReverseIndex:
+    """
+    期間の転置インデックスを作成する（同じ期間なら作成済みのものを返す）
+    """
+    return ReverseIndex(start, end)
+
+def get_index(start: Optional[datetime.date] = None, end: Optional[datetime.date] = None) -> ReverseIndex:
+    """
+    検索期間を含む転置インデックスを取得する
+    既定の期間（1900年から今年まで）に収まる場合は共通のインデックスを使う
+    """
+    index = build(RANGE_START, default_range_end())
+    start = start or index.start
+    end = end or index.end
+    if index.covers(start, end):
+        return index
+    return build(min(start, index.start), max(end, index.end))
+
+def query(criteria: Mapping[str, Criterion], start: Optional[datetime.date] = None,
+          end: Optional[datetime.date] = None) -> np.ndarray:
+    """
+    全ての条件に一致する生年月日の序数を検索する（ReverseIndex.query を参照）
+    """
+    return get_index(start, end).query(criteria, start, end)
+
+def query_dates(criteria: Mapping[str, Criterion], start: Optional[datetime.date] = None,
+                end: Optional[datetime.date] = None) -> List[datetime.date]:
+    """
+    全ての条件に一致する生年月日を検索する
+    """
+    return [datetime.date.fromordinal(int(o)) for o in query(criteria, start, end)]
+
+def count(criteria: Mapping[str, Criterion], start: Optional[datetime.date] = None,
+          end: Optional[datetime.date] = None) -> int:
+    return len(query(criteria, start, end))
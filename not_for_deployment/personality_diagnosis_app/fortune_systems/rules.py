@@ -0,0 +1,179 @@
+"""
+データファイルに値がない場合の既定値などを定義する宣言的なルール表
+
+各表はラベル → 値の辞書として定義し、読み込み時に一度だけ検証して
+ラベルのコード順に並べたタプル（整数コードで引く表）に変換する。
+診断のたびに辞書を作り直したり、if/elif を順にたどったりしないで済む。
+
+検証では、全てのラベル（28宿・12動物・9星・12か月）が揃っていること、
+表に一覧にないラベルが含まれていないこと、相性の相手が既知のラベルであることを確認する。
+"""
+from typing import Any, Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+from .records import ANIMAL_LABELS, KYUSEI_LABELS, SHUKUYO_LABELS, UNKNOWN, freeze
+
+# 月（1〜12）
+MONTHS = tuple(range(1, 13))
+
+# 相性のルール（相性の良い相手, 悪い相手）
+Compatibility = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+# 九星気学の相性（データファイルにない場合の既定値）
+KYUSEI_COMPATIBILITY: Dict[str, Compatibility] = {
+    "一白水星": (("六白金星", "八白土星"), ("四緑木星", "九紫火星")),
+    "二黒土星": (("三碧木星", "四緑木星"), ("七赤金星", "六白金星")),
+    "三碧木星": (("二黒土星", "五黄土星"), ("七赤金星", "一白水星")),
+    "四緑木星": (("二黒土星", "五黄土星"), ("九紫火星", "一白水星")),
+    "五黄土星": (("三碧木星", "四緑木星"), ("六白金星", "七赤金星")),
+    "六白金星": (("一白水星", "九紫火星"), ("二黒土星", "五黄土星")),
+    "七赤金星": (("八白土星", "九紫火星"), ("二黒土星", "三碧木星")),
+    "八白土星": (("一白水星", "七赤金星"), ("二黒土星", "五黄土星")),
+    "九紫火星": (("六白金星", "七赤金星"), ("一白水星", "四緑木星")),
+}
+
+# 動物占いの相性（データファイルにない場合の既定値）
+ANIMAL_COMPATIBILITY: Dict[str, Compatibility] = {
+    "ねずみ": (("うし", "たつ", "さる"), ("うま", "うさぎ", "とり")),
+    "うし": (("ねずみ", "へび", "とり"), ("ひつじ", "うま", "いぬ")),
+    "とら": (("うま", "いぬ", "いのしし"), ("さる", "へび", "とり")),
+    "うさぎ": (("ひつじ", "いぬ", "いのしし"), ("ねずみ", "とり", "うま")),
+    "たつ": (("ねずみ", "さる", "とり"), ("いぬ", "うし", "たつ")),
+    "へび": (("うし", "とり", "さる"), ("とら", "いのしし", "いぬ")),
+    "うま": (("とら", "ひつじ", "いぬ"), ("ねずみ", "うし", "うさぎ")),
+    "ひつじ": (("うさぎ", "うま", "いのしし"), ("うし", "たつ", "いぬ")),
+    "さる": (("ねずみ", "たつ", "へび"), ("とら", "へび", "いのしし")),
+    "とり": (("うし", "へび", "たつ"), ("ねずみ", "うさぎ", "とら")),
+    "いぬ": (("とら", "うさぎ", "うま"), ("たつ", "ひつじ", "へび")),
+    "いのしし": (("ひつじ", "うさぎ", "とら"), ("へび", "さる", "いのしし")),
+}
+
+# 宿曜の本命宮（データファイルにない場合の既定値）
+SHUKUYO_HONMEI_KYU: Dict[str, str] = {
+    "角宿": "東方木命", "亢宿": "東方木命", "底宿": "東方木命",
+    "房宿": "南方火命", "心宿": "南方火命", "尾宿": "南方火命", "箕宿": "南方火命",
+    "斗宿": "中央土命", "牛宿": "中央土命", "女宿": "中央土命",
+    "虚宿": "西方金命", "危宿": "西方金命", "室宿": "西方金命", "壁宿": "西方金命",
+    "奎宿": "北方水命", "婁宿": "北方水命", "胃宿": "北方水命",
+    "昴宿": "東方木命", "畢宿": "東方木命", "觜宿": "東方木命", "参宿": "東方木命",
+    "井宿": "南方火命", "鬼宿": "南方火命", "柳宿": "南方火命",
+    "星宿": "中央土命", "張宿": "中央土命", "翼宿": "中央土命", "軫宿": "中央土命",
+}
+
+# 宿曜の守護尊（データファイルにない場合の既定値）
+SHUKUYO_SHUGO_SON: Dict[str, str] = {
+    "角宿": "不動明王", "亢宿": "釈迦如来", "底宿": "文殊菩薩",
+    "房宿": "普賢菩薩", "心宿": "観音菩薩", "尾宿": "勢至菩薩", "箕宿": "虚空蔵菩薩",
+    "斗宿": "地蔵菩薩", "牛宿": "弥勒菩薩", "女宿": "薬師如来",
+    "虚宿": "阿弥陀如来", "危宿": "如意輪観音", "室宿": "大日如来", "壁宿": "降三世明王",
+    "奎宿": "阿閦如来", "婁宿": "大日如来", "胃宿": "宝生如来",
+    "昴宿": "阿弥陀如来", "畢宿": "不空成就如来", "觜宿": "弥勒菩薩", "参宿": "虚空蔵菩薩",
+    "井宿": "文殊菩薩", "鬼宿": "普賢菩薩", "柳宿": "観音菩薩",
+    "星宿": "勢至菩薩", "張宿": "地蔵菩薩", "翼宿": "釈迦如来", "軫宿": "不動明王",
+}
+
+# 旧暦の月ごとの1日の宿（2日以降は宿の並び順に1つずつ進み、28日周期で繰り返す）
+SHUKUYO_MONTH_START: Dict[int, str] = {
+    1: "角宿", 2: "井宿", 3: "斗宿", 4: "奎宿",
+    5: "角宿", 6: "井宿", 7: "斗宿", 8: "奎宿",
+    9: "角宿", 10: "井宿", 11: "斗宿", 12: "奎宿",
+}
+
+class RuleTable(NamedTuple):
+    """
+    ラベルのコード順に値を並べたルール表
+    """
+    name: str
+    labels: Tuple[Any, ...]
+    values: Tuple[Any, ...]    # values[code] がラベル labels[code] の値
+    codes: Mapping[Any, int]   # ラベル → コード
+    default: Any               # 表にないラベルの値
+
+    def get(self, label: Any) -> Any:
+        """
+        ラベルの値を取得する（表にないラベルの場合は既定値）
+        """
+        code = self.codes.get(label)
+        return self.values[code] if code is not None else self.default
+
+def check_table(name: str, labels: Sequence[Any], rules: Mapping[Any, Any]) -> List[str]:
+    """
+    ルール表が全てのラベルを過不足なく定義していることを確認する
+
+    Returns:
+        問題点の一覧（問題がない場合は空）
+    """
+    problems = []
+    missing = [label for label in labels if label not in rules]
+    unknown = [label for label in rules if label not in labels]
+    if missing:
+        problems.append(f"{name}: missing {', '.join(map(str, missing))}")
+    if unknown:
+        problems.append(f"{name}: unknown {', '.join(map(str, unknown))}")
+    return problems
+
+def check_compatibility(name: str, labels: Sequence[str], rules: Mapping[str, Compatibility]) -> List[str]:
+    """
+    相性のルール表を確認する（全ラベルの定義に加え、相性の相手が既知のラベルであること）
+    """
+    problems = check_table(name, labels, rules)
+    for label, (good, bad) in rules.items():
+        unknown = [other for other in good + bad if other not in labels]
+        if unknown:
+            problems.append(f"{name}[{label}]: unknown partner {', '.join(unknown)}")
+    return problems
+
+def validate() -> List[str]:
+    """
+    全てのルール表を検証する
+
+    Returns:
+        問題点の一覧（問題がない場合は空）
+    """
+    problems = []
+    problems += check_compatibility("KYUSEI_COMPATIBILITY", KYUSEI_LABELS, KYUSEI_COMPATIBILITY)
+    problems += check_compatibility("ANIMAL_COMPATIBILITY", ANIMAL_LABELS, ANIMAL_COMPATIBILITY)
+    problems += check_table("SHUKUYO_HONMEI_KYU", SHUKUYO_LABELS, SHUKUYO_HONMEI_KYU)
+    problems += check_table("SHUKUYO_SHUGO_SON", SHUKUYO_LABELS, SHUKUYO_SHUGO_SON)
+    problems += check_table("SHUKUYO_MONTH_START", MONTHS, SHUKUYO_MONTH_START)
+    starts = [label for label in SHUKUYO_MONTH_START.values() if label not in SHUKUYO_LABELS]
+    if starts:
+        problems.append(f"SHUKUYO_MONTH_START: unknown {', '.join(starts)}")
+    return problems
+
+def compile_table(name: str, labels: Sequence[Any], rules: Mapping[Any, Any], default: Any = UNKNOWN) -> RuleTable:
+    """
+    ラベル → 値の辞書を、コード順に並べたルール表に変換する
+    """
+    return RuleTable(name, tuple(labels), tuple(rules[label] for label in labels),
+                     {label: code for code, label in enumerate(labels)}, default)
+
+def _compatibility_values(rules: Mapping[str, Compatibility]) -> Dict[str, Mapping[str, Tuple[str, ...]]]:
+    # データファイルと同じ形（{"good": [...], "bad": [...]}）の読み取り専用のマッピングにしておく
+    return {label: freeze({"good": good, "bad": bad}) for label, (good, bad) in rules.items()}
+
+def _compile_shukuyo_days() -> Tuple[Tuple[int, ...], ...]:
+    """
+    旧暦の月と日（0〜27）から宿のコードを引く表を作る
+    行 0 は月が範囲外の場合に使う（1月と同じ）
+    """
+    rows = []
+    for month in (1,) + MONTHS:
+        start = SHUKUYO_LABELS.index(SHUKUYO_MONTH_START[month])
+        rows.append(tuple((start + day) % len(SHUKUYO_LABELS) for day in range(len(SHUKUYO_LABELS))))
+    return tuple(rows)
+
+_problems = validate()
+if _problems:
+    raise ValueError("Invalid rule tables:\n" + "\n".join(_problems))
+
+KYUSEI_COMPATIBILITY_TABLE = compile_table(
+    "kyusei_kigaku.compatibility", KYUSEI_LABELS, _compatibility_values(KYUSEI_COMPATIBILITY),
+    freeze({"good": (), "bad": ()}))
+ANIMAL_COMPATIBILITY_TABLE = compile_table(
+    "animal_fortune.compatibility", ANIMAL_LABELS, _compatibility_values(ANIMAL_COMPATIBILITY),
+    freeze({"good": (), "bad": ()}))
+SHUKUYO_HONMEI_KYU_TABLE = compile_table("shukuyo.honmei_kyu", SHUKUYO_LABELS, SHUKUYO_HONMEI_KYU)
+SHUKUYO_SHUGO_SON_TABLE = compile_table("shukuyo.shugo_son", SHUKUYO_LABELS, SHUKUYO_SHUGO_SON)
+
+# SHUKUYO_DAYS[月][(日 - 1) % 28] が宿のコード
+SHUKUYO_DAYS = _compile_shukuyo_days()
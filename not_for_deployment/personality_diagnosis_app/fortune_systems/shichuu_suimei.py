@@ -3,6 +3,7 @@ import math
 from typing import Dict, Any, Tuple
 
 from .base import FortuneSystem
+from .records import ShichuuSuimeiRecord, code_of
 from utils.date_utils import get_ten_kan, get_juu_ni_shi
 
 class ShichuuSuimei(FortuneSystem):
@@ -68,53 +69,36 @@ class ShichuuSuimei(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
-        # 日柱天干を算出
-        day_ten_kan = self._calculate_day_ten_kan(birth_date)
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date) -> ShichuuSuimeiRecord:
+        """
+        誕生日から四柱推命による診断結果レコードを作成する
         
-        # 日柱地支を算出
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
+        # 日柱天干と日柱地支を算出
+        day_ten_kan = self._calculate_day_ten_kan(birth_date)
         day_juu_ni_shi = self._calculate_day_juu_ni_shi(birth_date)
         
         # 日柱十二運を算出
         juu_ni_un = self._calculate_juu_ni_un(day_ten_kan, day_juu_ni_shi)
         
-        # 月柱地支を算出
-        month_juu_ni_shi = self._get_month_juu_ni_shi(birth_date)
-        
-        # 月干の蔵干を算出
-        zougan = self._get_hidden_kan(month_juu_ni_shi, birth_date.day)
-        
-        # 宿命星を算出
+        # 月干の蔵干から宿命星を算出
+        zougan = self._get_hidden_kan(self._get_month_juu_ni_shi(birth_date), birth_date.day)
         tsuhen_sei = self._calculate_tsuhen_sei(day_ten_kan, zougan)
         
-        # 五行の算出
-        gogyo = self._calculate_gogyo(day_ten_kan)
-        
-        # 日主の五行の算出
-        nishu_gogyo = self._calculate_nishu_gogyo(birth_date)
-        
-        # 基本的な性格特性を取得
-        personality_traits = self.get_personality_traits(day_ten_kan + day_juu_ni_shi)
-        
-        # 強みと弱みを取得
-        strengths_weaknesses = self.get_strengths_and_weaknesses(day_ten_kan + day_juu_ni_shi)
-        
-        # キャリアアドバイスを取得
-        career_advice = self._get_career_advice(day_ten_kan + day_juu_ni_shi)
-        
-        # 結果を返す
-        result = {
-            "ten_kan": day_ten_kan,
-            "juu_ni_shi": juu_ni_un,  # ユーザーリクエストに応じて十二運を返す
-            "tsuhen_sei": tsuhen_sei,
-            "gogyo": gogyo,
-            "nishu_gogyo": nishu_gogyo,
-            "personality_traits": personality_traits,
-            "strengths": strengths_weaknesses["strengths"],
-            "weaknesses": strengths_weaknesses["weaknesses"],
-            "career_advice": career_advice
-        }
-        
-        return result
+        return ShichuuSuimeiRecord(
+            self,
+            self.ten_kan.index(day_ten_kan),
+            self.juu_ni_shi.index(day_juu_ni_shi),
+            self.juu_ni_un.index(juu_ni_un),
+            code_of(self.tsuhen_sei, tsuhen_sei),
+        )
     
     def _calculate_day_ten_kan(self, birth_date: datetime.date) -> str:
         """
@@ -294,8 +278,9 @@ class ShichuuSuimei(FortuneSystem):
         Returns:
             キャリアアドバイス
         """
-        if "career_advice" in self.data and key in self.data["career_advice"]:
-            return self.data["career_advice"][key]
+        career_advice = self._lookup("career_advice", key)
+        if career_advice is not None:
+            return career_advice
         
         return "あなたの個性を活かせる職業を選ぶことが大切です。"
 
@@ -303,6 +288,20 @@ class ShichuuSuimei(FortuneSystem):
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> ShichuuSuimei:
+    """
+    四柱推命のシングルトンインスタンスを取得する
+    
+    Returns:
+        ShichuuSuimeiインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = ShichuuSuimei()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     四柱推命による診断を行うファサードメソッド
@@ -313,9 +312,16 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
-    
-    if _instance is None:
-        _instance = ShichuuSuimei()
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date) -> ShichuuSuimeiRecord:
+    """
+    四柱推命による診断結果レコードを取得するファサードメソッド
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        birth_date: 生年月日
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date)
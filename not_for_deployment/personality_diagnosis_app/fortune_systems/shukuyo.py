@@ -1,7 +1,9 @@
 import datetime
 from typing import Dict, Any
 
+from . import rules
 from .base import FortuneSystem
+from .records import SHUKUYO_LABELS, ShukuyoRecord
 from utils.date_utils import get_lunar_date
 
 class Shukuyo(FortuneSystem):
@@ -25,31 +27,19 @@ class Shukuyo(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
-        # 宿曜を算出
-        shukuyo_name = self._calculate_shukuyo(birth_date)
-        
-        # 本命宮を取得
-        honmei_kyu = self._get_honmei_kyu(shukuyo_name)
-        
-        # 守護尊を取得
-        shugo_son = self._get_shugo_son(shukuyo_name)
-        
-        # 性格特性を取得
-        personality_traits = self.get_personality_traits(shukuyo_name)
-        
-        # 相性を取得
-        compatibility = self.get_compatibility(shukuyo_name)
-        
-        # 結果を返す
-        result = {
-            "shukuyo": shukuyo_name,
-            "honmei_kyu": honmei_kyu,
-            "shugo_son": shugo_son,
-            "personality_traits": personality_traits,
-            "compatibility": compatibility
-        }
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date) -> ShukuyoRecord:
+        """
+        誕生日から宿曜による診断結果レコードを作成する
         
-        return result
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
+        return ShukuyoRecord(self, self._calculate_shukuyo_code(birth_date))
     
     def _calculate_shukuyo(self, birth_date: datetime.date) -> str:
         """
@@ -61,60 +51,33 @@ class Shukuyo(FortuneSystem):
         Returns:
             宿曜名
         """
+        return SHUKUYO_LABELS[self._calculate_shukuyo_code(birth_date)]
+    
+    def _calculate_shukuyo_code(self, birth_date: datetime.date) -> int:
+        """
+        生年月日から宿曜のコードを算出する
+        
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            宿曜のコード
+        """
         # 旧暦（太陰暦）の日付を取得
         lunar_date = get_lunar_date(birth_date)
         
         # 宿曜マップ（簡略化）
         # 実際の宿曜計算は旧暦をベースに複雑な計算を行いますが、
-        # ここでは例として簡略化したマッピングを使用します
-        shukuyo_map = {
-            1: ["角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", 
-                "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", 
-                "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿"],
-            2: ["井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", 
-                "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", 
-                "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿"],
-            3: ["斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", 
-                "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", 
-                "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿"],
-            4: ["奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", 
-                "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", 
-                "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿"],
-            5: ["角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", 
-                "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", 
-                "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿"],
-            6: ["井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", 
-                "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", 
-                "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿"],
-            7: ["斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", 
-                "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", 
-                "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿"],
-            8: ["奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", 
-                "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", 
-                "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿"],
-            9: ["角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", 
-                "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", 
-                "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿"],
-            10: ["井宿", "鬼宿", "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", 
-                 "底宿", "房宿", "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", 
-                 "危宿", "室宿", "壁宿", "奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿"],
-            11: ["斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿", "奎宿", "婁宿", 
-                 "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", "柳宿", "星宿", 
-                 "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", "心宿", "尾宿", "箕宿"],
-            12: ["奎宿", "婁宿", "胃宿", "昴宿", "畢宿", "觜宿", "参宿", "井宿", "鬼宿", 
-                 "柳宿", "星宿", "張宿", "翼宿", "軫宿", "角宿", "亢宿", "底宿", "房宿", 
-                 "心宿", "尾宿", "箕宿", "斗宿", "牛宿", "女宿", "虚宿", "危宿", "室宿", "壁宿"]
-        }
-        
-        # 旧暦の日付から宿曜を算出
+        # ここでは例として月ごとの起点の宿から日数分進める簡略化したマッピングを使用します
         month = lunar_date["month"]
         day = lunar_date["day"]
         
         # 日付が配列の範囲内に収まるように調整
         day_index = (day - 1) % 28
         
-        # 宿曜を返す
-        return shukuyo_map.get(month, shukuyo_map[1])[day_index]
+        # 月が範囲外の場合は1月の並びを使う
+        row = rules.SHUKUYO_DAYS[month if 1 <= month <= 12 else 0]
+        return row[day_index]
     
     def _get_honmei_kyu(self, shukuyo_name: str) -> str:
         """
@@ -126,22 +89,12 @@ class Shukuyo(FortuneSystem):
         Returns:
             本命宮
         """
-        if "honmei_kyu" in self.data and shukuyo_name in self.data["honmei_kyu"]:
-            return self.data["honmei_kyu"][shukuyo_name]
+        honmei_kyu = self._lookup("honmei_kyu", shukuyo_name)
+        if honmei_kyu is not None:
+            return honmei_kyu
         
         # 該当がない場合のデフォルト値
-        honmei_kyu_map = {
-            "角宿": "東方木命", "亢宿": "東方木命", "底宿": "東方木命", 
-            "房宿": "南方火命", "心宿": "南方火命", "尾宿": "南方火命", "箕宿": "南方火命", 
-            "斗宿": "中央土命", "牛宿": "中央土命", "女宿": "中央土命", 
-            "虚宿": "西方金命", "危宿": "西方金命", "室宿": "西方金命", "壁宿": "西方金命", 
-            "奎宿": "北方水命", "婁宿": "北方水命", "胃宿": "北方水命", 
-            "昴宿": "東方木命", "畢宿": "東方木命", "觜宿": "東方木命", "参宿": "東方木命", 
-            "井宿": "南方火命", "鬼宿": "南方火命", "柳宿": "南方火命", 
-            "星宿": "中央土命", "張宿": "中央土命", "翼宿": "中央土命", "軫宿": "中央土命"
-        }
-        
-        return honmei_kyu_map.get(shukuyo_name, "不明")
+        return rules.SHUKUYO_HONMEI_KYU_TABLE.get(shukuyo_name)
     
     def _get_shugo_son(self, shukuyo_name: str) -> str:
         """
@@ -153,27 +106,31 @@ class Shukuyo(FortuneSystem):
         Returns:
             守護尊
         """
-        if "shugo_son" in self.data and shukuyo_name in self.data["shugo_son"]:
-            return self.data["shugo_son"][shukuyo_name]
+        shugo_son = self._lookup("shugo_son", shukuyo_name)
+        if shugo_son is not None:
+            return shugo_son
         
         # 該当がない場合のデフォルト値
-        shugo_son_map = {
-            "角宿": "不動明王", "亢宿": "釈迦如来", "底宿": "文殊菩薩", 
-            "房宿": "普賢菩薩", "心宿": "観音菩薩", "尾宿": "勢至菩薩", "箕宿": "虚空蔵菩薩", 
-            "斗宿": "地蔵菩薩", "牛宿": "弥勒菩薩", "女宿": "薬師如来", 
-            "虚宿": "阿弥陀如来", "危宿": "如意輪観音", "室宿": "大日如来", "壁宿": "降三世明王", 
-            "奎宿": "阿閦如来", "婁宿": "大日如来", "胃宿": "宝生如来", 
-            "昴宿": "阿弥陀如来", "畢宿": "不空成就如来", "觜宿": "弥勒菩薩", "参宿": "虚空蔵菩薩", 
-            "井宿": "文殊菩薩", "鬼宿": "普賢菩薩", "柳宿": "観音菩薩", 
-            "星宿": "勢至菩薩", "張宿": "地蔵菩薩", "翼宿": "釈迦如来", "軫宿": "不動明王"
-        }
-        
-        return shugo_son_map.get(shukuyo_name, "不明")
+        return rules.SHUKUYO_SHUGO_SON_TABLE.get(shukuyo_name)
 
 
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> Shukuyo:
+    """
+    宿曜のシングルトンインスタンスを取得する
+    
+    Returns:
+        Shukuyoインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = Shukuyo()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     宿曜による診断を行うファサードメソッド
@@ -184,9 +141,16 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
-    
-    if _instance is None:
-        _instance = Shukuyo()
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date) -> ShukuyoRecord:
+    """
+    宿曜による診断結果レコードを取得するファサードメソッド
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        birth_date: 生年月日
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date)
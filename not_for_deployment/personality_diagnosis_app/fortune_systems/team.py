@@ -0,0 +1,156 @@
+"""
+チーム全員の相性をまとめて算出するモジュール
+
+各占術の「相性の良い相手・悪い相手」のリストを、ラベル同士の小さな整数隣接行列
+（良い: +1、悪い: -1、どちらでもない: 0）に一度だけ変換しておき、
+N人分の相性行列はNumPyの配列参照だけで組み立てる。
+"""
+import functools
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import instrumentation, registry, vectorized
+
+# 相性スコア
+GOOD = 1
+BAD = -1
+
+# 相性行列の型（全占術の合計でも範囲に収まる）
+SCORE_DTYPE = np.int8
+
+class CompatibilityTable(NamedTuple):
+    """
+    占術ごとの相性隣接行列
+    matrix[i, j] はラベル i の人から見たラベル j の人との相性
+    """
+    attribute: str
+    labels: Tuple[str, ...]
+    matrix: np.ndarray
+
+def _adjacency(labels: Sequence[str], lists: Dict[str, Dict[str, List[str]]]) -> np.ndarray:
+    """
+    ラベルごとの good/bad リストを隣接行列に変換する
+    ラベル一覧にない相手（データ上の表記ゆれなど）は無視する
+    """
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=SCORE_DTYPE)
+    for label, compatibility in lists.items():
+        row = index[label]
+        for other in compatibility.get("good", []):
+            if other in index:
+                matrix[row, index[other]] += GOOD
+        for other in compatibility.get("bad", []):
+            if other in index:
+                matrix[row, index[other]] += BAD
+    return np.clip(matrix, BAD, GOOD)
+
+def _kyusei_lists(labels: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+    system = registry.load("kyusei_kigaku").get_instance()
+    return {label: system._get_compatibility(label) for label in labels}
+
+def _animal_lists(labels: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+    system = registry.load("animal_fortune").get_instance()
+    return {label: system._get_compatibility(label) for label in labels}
+
+def _onmyo_lists(labels: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+    system = registry.load("onmyo_gogyo").get_instance()
+    return {
+        label: {
+            "good": [system._calculate_compatible_gogyo(label)],
+            "bad": [system._calculate_incompatible_gogyo(label)],
+        }
+        for label in labels
+    }
+
+def _shukuyo_lists(labels: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+    system = registry.load("shukuyo").get_instance()
+    return {label: system.get_compatibility(label) for label in labels}
+
+# 占術キー → (相性を判定する診断項目, good/bad リストの取得関数)
+TEAM_SYSTEMS = {
+    "kyusei_kigaku": ("kyusei_kigaku.honmei_sei", _kyusei_lists),
+    "animal_fortune": ("animal_fortune.animal", _animal_lists),
+    "onmyo_gogyo": ("onmyo_gogyo.gogyo", _onmyo_lists),
+    "shukuyo": ("shukuyo.shukuyo", _shukuyo_lists),
+}
+
+def enabled_systems() -> List[str]:
+    """
+    相性データを持つ占術のうち、registry で有効になっているもの
+    """
+    return [system for system in TEAM_SYSTEMS if registry.is_enabled(system)]
+
+@functools.lru_cache(maxsize=None)
+def compatibility_table(system: str) -> CompatibilityTable:
+    """
+    占術の相性隣接行列を取得する（初回のみ作成）
+
+    Args:
+        system: 占術キー
+
+    Returns:
+        相性隣接行列
+    """
+    attribute, list_builder = TEAM_SYSTEMS[system]
+    labels = vectorized.labels(attribute)
+    return CompatibilityTable(attribute, labels, _adjacency(labels, list_builder(labels)))
+
+instrumentation.register_cache("team.compatibility_table", compatibility_table)
+
+def pairwise_scores(table: CompatibilityTable, codes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    整数コードの配列から N×N の相性行列を組み立てる
+    まず列方向に引いた K×N（K はラベル数）の表を作り、続けて行単位で引くことで
+    N×N の添字配列を作らず、行ごとの連続コピーだけで済ませる
+    """
+    columns = np.ascontiguousarray(table.matrix[:, codes])
+    return np.take(columns, codes, axis=0, out=out)
+
+def team_compatibility(
+    dates: Union[Iterable[vectorized.DateLike], np.ndarray],
+    systems: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    チーム全員の占術ごとの相性行列を算出する
+
+    Args:
+        dates: メンバーの生年月日（datetime.date または序数）の列
+        systems: 対象の占術キー（省略時は相性データを持つ有効な全占術）
+
+    Returns:
+        占術キー → N×N の相性行列（matrix[a, b] はメンバー a から見た b との相性）
+    """
+    systems = list(systems or enabled_systems())
+    tables = {system: compatibility_table(system) for system in systems}
+    codes = vectorized.encode(dates, [table.attribute for table in tables.values()])
+    return {system: pairwise_scores(table, codes[table.attribute]) for system, table in tables.items()}
+
+def total_compatibility(
+    dates: Union[Iterable[vectorized.DateLike], np.ndarray],
+    systems: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """
+    チーム全員の相性を全占術で合計した N×N 行列を算出する
+    占術ごとの行列を保持しないため、大人数でもメモリは N×N 2枚分（合計と作業領域）で済む
+
+    Args:
+        dates: メンバーの生年月日（datetime.date または序数）の列
+        systems: 対象の占術キー（省略時は相性データを持つ有効な全占術）
+
+    Returns:
+        N×N の合計相性行列（対象の占術がない場合はすべて0）
+    """
+    systems = list(systems or enabled_systems())
+    if not systems:
+        # PDA_SYSTEMS で相性データを持つ占術を全て除外した場合など
+        count = len(vectorized.to_ordinals(dates))
+        return np.zeros((count, count), dtype=SCORE_DTYPE)
+    tables = [compatibility_table(system) for system in systems]
+    codes = vectorized.encode(dates, [table.attribute for table in tables])
+
+    total = pairwise_scores(tables[0], codes[tables[0].attribute])
+    buffer = np.empty_like(total)
+    for table in tables[1:]:
+        total += pairwise_scores(table, codes[table.attribute], out=buffer)
+    return total
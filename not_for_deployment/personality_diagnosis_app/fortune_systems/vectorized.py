@@ -0,0 +1,265 @@
+"""
+複数の生年月日をまとめて診断するためのベクトル化エンジン
+
+各占術の診断結果は、生年月日から求まる小さな整数キー（年の剰余、月日など）だけで決まる。
+そこで各占術の計算メソッドを一度だけ呼び出してキー → 結果の対応表を作り、
+以降はNumPyの配列参照だけで大量の生年月日を整数コードに変換する。
+対象は registry で有効になっている占術のみで、無効な占術のモジュールは読み込まない。
+"""
+import datetime
+import functools
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.date_utils import get_kyusei, get_ten_kan, get_western_zodiac
+from . import registry
+from .records import ANIMAL_LABELS, ANIMAL_TYPE_LABELS, GOGYO_LABELS, INYO_LABELS, KYUSEI_LABELS, SHUKUYO_LABELS, ZODIAC_LABELS
+
+# 四柱推命の日柱計算の基準日（1900年1月31日は「甲子」）
+SHICHUU_BASE_ORDINAL = datetime.date(1900, 1, 31).toordinal()
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# 対応表を作るための標本期間（9年・10年・12年周期の最小公倍数をまかなう期間）
+_SAMPLE_START = datetime.date(2000, 1, 1)
+_SAMPLE_END = datetime.date(2179, 12, 31)
+
+# 整数コードの型（ラベル数は最大でも28）
+CODE_DTYPE = np.int8
+
+DateLike = Union[datetime.date, int]
+
+class DateParts(NamedTuple):
+    """
+    生年月日の配列を構成要素に分解したもの
+    """
+    ordinal: np.ndarray
+    year: np.ndarray
+    month: np.ndarray
+    day: np.ndarray
+
+class Attribute(NamedTuple):
+    """
+    ベクトル化できる診断項目の定義
+    """
+    system: str                                # 占術キー
+    name: str                                  # 診断結果のキー
+    labels: Tuple[str, ...]                    # 既知のラベル（コードの並び順）
+    key_size: int                              # キーの取りうる値の数
+    key: Callable[[DateParts], np.ndarray]     # 生年月日 → キー
+    scalar: Callable[[datetime.date], str]     # 1件分の計算（対応表の作成に使う）
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.system}.{self.name}"
+
+def to_ordinals(dates: Union[Iterable[DateLike], np.ndarray]) -> np.ndarray:
+    """
+    生年月日の列を序数（datetime.date.toordinal）の配列に変換する
+    """
+    if isinstance(dates, np.ndarray) and dates.dtype.kind in "iu":
+        return dates.astype(np.int64, copy=False)
+    return np.fromiter(
+        (d if isinstance(d, (int, np.integer)) else d.toordinal() for d in dates),
+        dtype=np.int64,
+    )
+
+def date_range_ordinals(start: datetime.date, end: datetime.date) -> np.ndarray:
+    """
+    開始日から終了日まで（両端を含む）の序数配列を取得する
+    """
+    return np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+
+def split_ordinals(ordinals: np.ndarray) -> DateParts:
+    """
+    序数の配列を年・月・日の配列に分解する
+    """
+    days = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    year = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+    return DateParts(ordinals, year, month, day)
+
+def _day_band(day: np.ndarray) -> np.ndarray:
+    """
+    蔵干の選択に使う日の区分（1〜7日、8〜14日、15日以降）
+    """
+    return (day > 7).astype(np.int64) + (day > 14).astype(np.int64)
+
+def _shichuu_days(parts: DateParts) -> np.ndarray:
+    return parts.ordinal - SHICHUU_BASE_ORDINAL
+
+def _shichuu_suimei_attributes(shichuu) -> Tuple[Attribute, ...]:
+    def shichuu_juu_ni_un(d: datetime.date) -> str:
+        return shichuu._calculate_juu_ni_un(shichuu._calculate_day_ten_kan(d), shichuu._calculate_day_juu_ni_shi(d))
+
+    def shichuu_tsuhen_sei(d: datetime.date) -> str:
+        hidden_kan = shichuu._get_hidden_kan(shichuu._get_month_juu_ni_shi(d), d.day)
+        return shichuu._calculate_tsuhen_sei(shichuu._calculate_day_ten_kan(d), hidden_kan)
+
+    return (
+        Attribute("shichuu_suimei", "ten_kan", tuple(shichuu.ten_kan), 10,
+                  lambda p: _shichuu_days(p) % 10, shichuu._calculate_day_ten_kan),
+        Attribute("shichuu_suimei", "day_juu_ni_shi", tuple(shichuu.juu_ni_shi), 12,
+                  lambda p: _shichuu_days(p) % 12, shichuu._calculate_day_juu_ni_shi),
+        Attribute("shichuu_suimei", "juu_ni_shi", tuple(shichuu.juu_ni_un), 120,
+                  lambda p: (_shichuu_days(p) % 10) * 12 + _shichuu_days(p) % 12, shichuu_juu_ni_un),
+        Attribute("shichuu_suimei", "tsuhen_sei", tuple(shichuu.tsuhen_sei) + ("不明",), 10 * 13 * 3,
+                  lambda p: (_shichuu_days(p) % 10) * 39 + p.month * 3 + _day_band(p.day), shichuu_tsuhen_sei),
+        Attribute("shichuu_suimei", "gogyo", GOGYO_LABELS, 10,
+                  lambda p: _shichuu_days(p) % 10, lambda d: shichuu._calculate_gogyo(shichuu._calculate_day_ten_kan(d))),
+    )
+
+def _shukuyo_attributes(shuku) -> Tuple[Attribute, ...]:
+    return (
+        Attribute("shukuyo", "shukuyo", SHUKUYO_LABELS, 13 * 32,
+                  lambda p: p.month * 32 + p.day, shuku._calculate_shukuyo),
+    )
+
+def _onmyo_gogyo_attributes(onmyo) -> Tuple[Attribute, ...]:
+    return (
+        Attribute("onmyo_gogyo", "inyo", INYO_LABELS, 10,
+                  lambda p: p.year % 10, lambda d: onmyo._calculate_inyo(get_ten_kan(d.year))),
+        Attribute("onmyo_gogyo", "gogyo", GOGYO_LABELS, 13 * 5,
+                  lambda p: p.month * 5 + p.day % 5, onmyo._calculate_gogyo),
+    )
+
+def _kyusei_kigaku_attributes(kyusei) -> Tuple[Attribute, ...]:
+    return (
+        Attribute("kyusei_kigaku", "honmei_sei", KYUSEI_LABELS, 9,
+                  lambda p: p.year % 9, get_kyusei),
+        Attribute("kyusei_kigaku", "getsu_mei_sei", KYUSEI_LABELS, 13,
+                  lambda p: p.month, kyusei._calculate_getsu_mei_sei),
+    )
+
+def _western_astrology_attributes(western) -> Tuple[Attribute, ...]:
+    return (
+        Attribute("western_astrology", "sun_sign", ZODIAC_LABELS, 13 * 32,
+                  lambda p: p.month * 32 + p.day, lambda d: get_western_zodiac(d.month, d.day)),
+        Attribute("western_astrology", "moon_sign", ZODIAC_LABELS, 12,
+                  lambda p: (p.year + p.month + p.day) % 12, western._calculate_moon_sign),
+        Attribute("western_astrology", "ascendant", ZODIAC_LABELS, 12,
+                  lambda p: (p.month + p.day) % 12, western._calculate_ascendant),
+    )
+
+def _animal_fortune_attributes(animal) -> Tuple[Attribute, ...]:
+    return (
+        Attribute("animal_fortune", "animal", ANIMAL_LABELS, 12,
+                  lambda p: p.year % 12, animal._calculate_animal),
+        Attribute("animal_fortune", "type", ANIMAL_TYPE_LABELS, 4,
+                  lambda p: ((p.month - 1) * 30 + p.day) % 4, animal._calculate_type),
+    )
+
+# 占術キー → 占術のインスタンスから診断項目を作成する関数
+ATTRIBUTE_BUILDERS: Dict[str, Callable[[object], Tuple[Attribute, ...]]] = {
+    "shichuu_suimei": _shichuu_suimei_attributes,
+    "shukuyo": _shukuyo_attributes,
+    "onmyo_gogyo": _onmyo_gogyo_attributes,
+    "kyusei_kigaku": _kyusei_kigaku_attributes,
+    "western_astrology": _western_astrology_attributes,
+    "animal_fortune": _animal_fortune_attributes,
+}
+
+def _build_attributes() -> Tuple[Attribute, ...]:
+    """
+    有効な占術のベクトル化できる診断項目の一覧を作成する（表示順）
+    """
+    built = []
+    for key in registry.enabled_keys():
+        builder = ATTRIBUTE_BUILDERS.get(key)
+        if builder is not None:
+            built.extend(builder(registry.load(key).get_instance()))
+    return tuple(built)
+
+@functools.lru_cache(maxsize=None)
+def attributes() -> Dict[str, Attribute]:
+    """
+    有効な占術のベクトル化できる診断項目を「占術キー.項目名」で引ける形で取得する
+    """
+    return {attribute.qualified_name: attribute for attribute in _build_attributes()}
+
+def enabled_names() -> List[str]:
+    """
+    registry で有効になっている占術の診断項目（「占術キー.項目名」）の一覧
+    """
+    return list(attributes())
+
+@functools.lru_cache(maxsize=None)
+def _sample_parts() -> Tuple[List[datetime.date], DateParts]:
+    sample = date_range_ordinals(_SAMPLE_START, _SAMPLE_END)
+    return [datetime.date.fromordinal(int(o)) for o in sample], split_ordinals(sample)
+
+@functools.lru_cache(maxsize=None)
+def compile_attribute(name: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    診断項目のキー → コードの対応表を作成する
+    キーごとに標本期間内の最初と最後の日付で1件ずつ計算し、結果が一致することを確認する
+
+    Args:
+        name: 「占術キー.項目名」
+
+    Returns:
+        (ラベル, 対応表) のタプル
+        対応表で一度も現れなかったキーは -1 になる
+    """
+    attribute = attributes()[name]
+    dates, parts = _sample_parts()
+
+    labels = list(attribute.labels)
+    index = {label: i for i, label in enumerate(labels)}
+    table = np.full(attribute.key_size, -1, dtype=CODE_DTYPE)
+
+    keys = attribute.key(parts)
+    unique_keys, first = np.unique(keys, return_index=True)
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last
+
+    for key, i, j in zip(unique_keys.tolist(), first.tolist(), last.tolist()):
+        value = attribute.scalar(dates[i])
+        if attribute.scalar(dates[j]) != value:
+            raise ValueError(f"{name}: key {key} maps to multiple values")
+        if value not in index:
+            index[value] = len(labels)
+            labels.append(value)
+        table[key] = index[value]
+
+    return tuple(labels), table
+
+def encode(dates: Union[Iterable[DateLike], np.ndarray], names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    生年月日の列を診断項目ごとの整数コード配列に変換する
+
+    Args:
+        dates: 生年月日（datetime.date または序数）の列
+        names: 対象の診断項目（省略時は全項目）
+
+    Returns:
+        「占術キー.項目名」 → コード配列
+    """
+    parts = split_ordinals(to_ordinals(dates))
+    defined = attributes()
+    codes = {}
+    for name in names or defined:
+        _, table = compile_attribute(name)
+        codes[name] = table[defined[name].key(parts)]
+    return codes
+
+def labels(name: str) -> Tuple[str, ...]:
+    """
+    診断項目のラベル一覧（コードの並び順）を取得する
+    """
+    return compile_attribute(name)[0]
+
+def decode(name: str, codes: np.ndarray) -> np.ndarray:
+    """
+    整数コード配列をラベルの配列に変換する
+    """
+    return np.asarray(labels(name), dtype=object)[codes]
+
+def diagnose_many(dates: Union[Iterable[DateLike], np.ndarray], names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    複数の生年月日をまとめて診断し、診断項目ごとのラベル配列を返す
+    """
+    return {name: decode(name, codes) for name, codes in encode(dates, names).items()}
@@ -1,8 +1,10 @@
 import datetime
 import math
+import zlib
 from typing import Dict, Any
 
 from .base import FortuneSystem
+from .records import PLANET_NAMES, ZODIAC_LABELS, WesternAstrologyRecord, code_of
 from utils.date_utils import get_western_zodiac
 
 class WesternAstrology(FortuneSystem):
@@ -26,37 +28,36 @@ class WesternAstrology(FortuneSystem):
         Returns:
             診断結果をDict形式で返す
         """
+        return self.record(birth_date).to_dict()
+    
+    def record(self, birth_date: datetime.date) -> WesternAstrologyRecord:
+        """
+        誕生日から西洋占星術による診断結果レコードを作成する
+        
+        Args:
+            birth_date: 生年月日
+            
+        Returns:
+            整数コードを保持する診断結果レコード
+        """
         # 太陽星座（サンサイン）を取得
         sun_sign = get_western_zodiac(birth_date.month, birth_date.day)
         
-        # 月星座（ムーンサイン）を算出
+        # 月星座（ムーンサイン）とアセンダント（上昇宮）を算出
         # 注: 実際には出生時刻と場所が必要です
         moon_sign = self._calculate_moon_sign(birth_date)
-        
-        # アセンダント（上昇宮）を算出
-        # 注: 実際には出生時刻と場所が必要です
         ascendant = self._calculate_ascendant(birth_date)
         
         # 惑星の配置を算出
         planets = self._calculate_planets(birth_date)
         
-        # 性格特性を取得
-        personality_traits = self.get_personality_traits(sun_sign)
-        
-        # ホロスコープチャートデータを作成
-        chart_data = self._create_chart_data(sun_sign)
-        
-        # 結果を返す
-        result = {
-            "sun_sign": sun_sign,
-            "moon_sign": moon_sign,
-            "ascendant": ascendant,
-            "planets": planets,
-            "personality_traits": personality_traits,
-            "chart_data": chart_data
-        }
-        
-        return result
+        return WesternAstrologyRecord(
+            self,
+            code_of(ZODIAC_LABELS, sun_sign),
+            code_of(ZODIAC_LABELS, moon_sign),
+            code_of(ZODIAC_LABELS, ascendant),
+            tuple(code_of(ZODIAC_LABELS, planets[name]) for name in PLANET_NAMES),
+        )
     
     def _calculate_moon_sign(self, birth_date: datetime.date) -> str:
         """
@@ -147,26 +148,57 @@ class WesternAstrology(FortuneSystem):
             チャートデータ
         """
         # データファイルからチャートデータを取得
-        if "chart_data" in self.data and sun_sign in self.data["chart_data"]:
-            return self.data["chart_data"][sun_sign]
+        chart_data = self._lookup("chart_data", sun_sign)
+        if chart_data is not None:
+            return chart_data
         
         # データがない場合はデフォルト値を生成
         # 実際のアプリケーションでは、より正確なデータを使用する必要があります
-        default_data = {
-            "知性": round(5 + 2 * math.sin(hash(sun_sign) % 10), 1),
-            "感受性": round(5 + 2 * math.cos(hash(sun_sign) % 10), 1),
-            "行動力": round(5 + 2 * math.sin(hash(sun_sign + "1") % 10), 1),
-            "社交性": round(5 + 2 * math.cos(hash(sun_sign + "2") % 10), 1),
-            "感情表現": round(5 + 2 * math.sin(hash(sun_sign + "3") % 10), 1),
-            "粘り強さ": round(5 + 2 * math.cos(hash(sun_sign + "4") % 10), 1)
-        }
-        
-        return default_data
+        return default_chart_data(sun_sign)
 
+def _stable_hash(text: str) -> int:
+    """
+    文字列から固定の整数を求める（組み込みの hash() はプロセスごとに値が変わるため使わない）
+    """
+    return zlib.crc32(text.encode("utf-8"))
+
+def default_chart_data(sun_sign: str) -> Dict[str, float]:
+    """
+    データファイルにない星座のチャートデータをサンサインから決定的に作成する
+    同じサンサインはプロセスや再起動をまたいでも同じ値になる
+    
+    Args:
+        sun_sign: サンサイン（太陽星座）
+        
+    Returns:
+        チャートデータ
+    """
+    return {
+        "知性": round(5 + 2 * math.sin(_stable_hash(sun_sign) % 10), 1),
+        "感受性": round(5 + 2 * math.cos(_stable_hash(sun_sign) % 10), 1),
+        "行動力": round(5 + 2 * math.sin(_stable_hash(sun_sign + "1") % 10), 1),
+        "社交性": round(5 + 2 * math.cos(_stable_hash(sun_sign + "2") % 10), 1),
+        "感情表現": round(5 + 2 * math.sin(_stable_hash(sun_sign + "3") % 10), 1),
+        "粘り強さ": round(5 + 2 * math.cos(_stable_hash(sun_sign + "4") % 10), 1)
+    }
 
 # シングルトンインスタンスを作成
 _instance = None
 
+def get_instance() -> WesternAstrology:
+    """
+    西洋占星術のシングルトンインスタンスを取得する
+    
+    Returns:
+        WesternAstrologyインスタンス
+    """
+    global _instance
+    
+    if _instance is None:
+        _instance = WesternAstrology()
+    
+    return _instance
+
 def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     """
     西洋占星術による診断を行うファサードメソッド
@@ -177,9 +209,16 @@ def diagnose(birth_date: datetime.date) -> Dict[str, Any]:
     Returns:
         診断結果をDict形式で返す
     """
-    global _instance
-    
-    if _instance is None:
-        _instance = WesternAstrology()
+    return get_instance().diagnose(birth_date)
+
+def record(birth_date: datetime.date) -> WesternAstrologyRecord:
+    """
+    西洋占星術による診断結果レコードを取得するファサードメソッド
     
-    return _instance.diagnose(birth_date) 
\ No newline at end of file
+    Args:
+        birth_date: 生年月日
+        
+    Returns:
+        整数コードを保持する診断結果レコード
+    """
+    return get_instance().record(birth_date)
@@ -0,0 +1,295 @@
+"""
+診断結果をJSONで返す軽量HTTPサーバー
+
+使い方:
+    python -m personality_diagnosis_app.server serve [--host HOST] [--port PORT]
+    python -m personality_diagnosis_app.server loadtest [--url URL] [--requests N] [--concurrency N] [--batch N]
+
+エンドポイント:
+    GET  /healthz                     稼働確認とキャッシュの統計
+    GET  /diagnose?date=1990-01-02    1件の診断
+    POST /diagnose/batch              複数件の診断（本文: {"dates": ["1990-01-02", ...]}）
+
+HTTP/1.1のkeep-aliveに対応し、診断結果はプロセス内で共有するキャッシュにJSON文字列のまま保持する。
+"""
+import argparse
+import datetime
+import functools
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+from personality_diagnosis_app.fortune_systems import engine, instrumentation, registry, result_store
+from personality_diagnosis_app.fortune_systems.records import json_default
+from personality_diagnosis_app.utils.date_utils import parse_date
+
+# キャッシュする診断結果の件数（約4万件で100年分の生年月日をまかなえる）
+RESULT_CACHE_SIZE = 65536
+
+# 1回のバッチで受け付ける最大件数
+MAX_BATCH_SIZE = 10000
+
+# リクエスト本文の最大サイズ
+MAX_BODY_BYTES = 1024 * 1024
+
+@functools.lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _diagnose_json(ordinal: int, year: int) -> str:
+    """
+    1件の診断結果をJSON文字列で取得する
+    同じ生年月日の結果はスレッド間で共有するキャッシュから返す
+    （PDA_RESULT_STORE を指定した場合は、他のプロセスと共有するSQLiteキャッシュも使う）
+    九星気学の年運は年で変わるため、年もキャッシュのキーに含める（前年の結果は参照されずに追い出される）
+    """
+    birth_date = datetime.date.fromordinal(ordinal)
+    record = {"birth_date": birth_date.isoformat()}
+    record.update(result_store.diagnose_all(birth_date))
+    return json.dumps(record, ensure_ascii=False, default=json_default)
+
+instrumentation.register_cache("server.diagnose_json", _diagnose_json)
+
+def diagnose_json(ordinal: int) -> str:
+    """
+    1件の診断結果を現在の年の年運でJSON文字列として取得する
+    """
+    # 九星気学が無効な場合は年で変わる項目がないため、年をキーに含めない
+    year = registry.load("kyusei_kigaku").current_year() if registry.is_enabled("kyusei_kigaku") else 0
+    return _diagnose_json(ordinal, year)
+
+def diagnose_text(text: Any) -> str:
+    """
+    文字列の生年月日を診断してJSON文字列を返す
+    日付として解釈できない場合はエラー内容を返す
+    """
+    try:
+        return diagnose_json(parse_date(str(text)).toordinal())
+    except ValueError as e:
+        return json.dumps({"birth_date": text, "error": str(e)}, ensure_ascii=False)
+
+class DiagnosisHandler(BaseHTTPRequestHandler):
+    """
+    診断APIのリクエストハンドラ
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "PersonalityDiagnosis/1.0"
+    # keep-alive接続でヘッダーと本文の送信が遅延ACKと噛み合って待たされないようにする
+    disable_nagle_algorithm = True
+    access_log = False
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/healthz":
+            info = _diagnose_json.cache_info()
+            self._send_json(200, json.dumps({
+                "status": "ok",
+                "cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize},
+            }))
+        elif url.path == "/diagnose":
+            dates = urllib.parse.parse_qs(url.query).get("date")
+            if not dates:
+                self._send_error(400, "Missing query parameter: date")
+                return
+            try:
+                ordinal = parse_date(dates[0]).toordinal()
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            self._send_json(200, diagnose_json(ordinal))
+        else:
+            self._send_error(404, f"Not found: {url.path}")
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/diagnose/batch":
+            self._discard_body()
+            self._send_error(404, f"Not found: {url.path}")
+            return
+
+        length = self._content_length()
+        if length is None:
+            # 本文の終わりが分からないため、接続を閉じる
+            self.close_connection = True
+            self._send_error(400, "Invalid Content-Length")
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_error(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            return
+
+        try:
+            dates = json.loads(self.rfile.read(length))["dates"]
+            if not isinstance(dates, list):
+                raise TypeError("dates must be a list")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_error(400, f"Invalid request body: {e}")
+            return
+
+        if len(dates) > MAX_BATCH_SIZE:
+            self._send_error(413, f"Batch size exceeds {MAX_BATCH_SIZE}")
+            return
+
+        # キャッシュ済みのJSON文字列をそのまま連結して応答を組み立てる
+        self._send_json(200, '{"results":[' + ",".join(diagnose_text(text) for text in dates) + "]}")
+
+    def _content_length(self) -> Optional[int]:
+        """
+        Content-Length ヘッダーの値を取得する（ない場合は0、0以上の整数でない場合はNone）
+        """
+        value = (self.headers.get("Content-Length") or "0").strip()
+        if not (value.isascii() and value.isdigit()):
+            return None
+        return int(value)
+
+    def _discard_body(self):
+        """
+        使わないリクエスト本文を読み捨てる
+        読み切れない場合は、残りが次のリクエストとして解釈されないよう接続を閉じる
+        """
+        length = self._content_length()
+        if length is None or length > MAX_BODY_BYTES:
+            self.close_connection = True
+        elif length and len(self.rfile.read(length)) < length:
+            self.close_connection = True
+
+    def _send_json(self, status: int, body: str):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, json.dumps({"error": message}, ensure_ascii=False))
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+def create_server(host: str = "127.0.0.1", port: int = 8000, access_log: bool = False) -> ThreadingHTTPServer:
+    """
+    診断APIサーバーを作成する（リクエストごとにスレッドで処理する）
+    """
+    engine.warm_up()
+    handler = type("Handler", (DiagnosisHandler,), {"access_log": access_log})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def serve(host: str = "127.0.0.1", port: int = 8000, access_log: bool = False):
+    """
+    診断APIサーバーを起動する
+    """
+    server = create_server(host, port, access_log)
+    sys.stderr.write(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * ratio), len(sorted_values) - 1)]
+
+def load_test(url: str, requests: int = 10000, concurrency: int = 16, batch: int = 0) -> Dict[str, float]:
+    """
+    診断APIに負荷をかけて応答時間と処理速度を計測する
+    各スレッドは1本のkeep-alive接続を使い回す
+
+    Args:
+        url: サーバーのURL
+        requests: 総リクエスト数
+        concurrency: 同時接続数
+        batch: 1リクエストあたりの件数（0の場合は GET /diagnose を使う）
+
+    Returns:
+        処理件数・エラー件数・応答時間の分位点（ミリ秒）・処理速度
+    """
+    target = urllib.parse.urlsplit(url)
+    base = datetime.date(1950, 1, 1).toordinal()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(worker_index: int):
+        nonlocal errors
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80)
+        local_latencies = []
+        local_errors = 0
+        for i in range(worker_index, requests, concurrency):
+            if batch:
+                dates = [datetime.date.fromordinal(base + (i * batch + j) % 36500).isoformat() for j in range(batch)]
+                body = json.dumps({"dates": dates})
+                start = time.perf_counter()
+                connection.request("POST", "/diagnose/batch", body, {"Content-Type": "application/json"})
+            else:
+                date = datetime.date.fromordinal(base + i % 36500).isoformat()
+                start = time.perf_counter()
+                connection.request("GET", f"/diagnose?date={date}")
+            response = connection.getresponse()
+            response.read()
+            local_latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                local_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "diagnoses_per_second": len(latencies) * max(batch, 1) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="診断結果をJSONで返すHTTPサーバー")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="サーバーを起動する")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--access-log", action="store_true", help="リクエストごとのログを出力する")
+
+    load_parser = subparsers.add_parser("loadtest", help="起動中のサーバーに負荷をかける")
+    load_parser.add_argument("--url", default="http://127.0.0.1:8000")
+    load_parser.add_argument("--requests", type=int, default=10000, help="総リクエスト数")
+    load_parser.add_argument("--concurrency", type=int, default=16, help="同時接続数")
+    load_parser.add_argument("--batch", type=int, default=0, help="1リクエストあたりの件数（0の場合は1件ずつGETする）")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "loadtest":
+        print(json.dumps(load_test(args.url, args.requests, args.concurrency, args.batch), indent=2))
+    elif args.command == "serve":
+        serve(args.host, args.port, args.access_log)
+    else:
+        serve()
+
+if __name__ == "__main__":
+    main()
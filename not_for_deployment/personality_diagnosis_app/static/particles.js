@@ -0,0 +1,172 @@
+/*
+ * 軽量パーティクルアニメーション
+ * particles.js (https://github.com/VincentGarreau/particles.js) の設定形式のうち、
+ * 本アプリで使用しているサブセット（円形パーティクル・ライン接続・grab/push）を
+ * 外部CDNに依存せずに描画する。
+ */
+(function (global) {
+    "use strict";
+
+    function hexToRgb(hex) {
+        var value = hex.replace("#", "");
+        if (value.length === 3) {
+            value = value.replace(/(.)/g, "$1$1");
+        }
+        var num = parseInt(value, 16);
+        return { r: (num >> 16) & 255, g: (num >> 8) & 255, b: num & 255 };
+    }
+
+    function pick(value) {
+        return Array.isArray(value) ? value[Math.floor(Math.random() * value.length)] : value;
+    }
+
+    function ParticleField(container, params) {
+        var p = params.particles;
+        var events = params.interactivity.events;
+        var modes = params.interactivity.modes;
+        var ratio = params.retina_detect && global.devicePixelRatio > 1 ? global.devicePixelRatio : 1;
+
+        var canvas = document.createElement("canvas");
+        canvas.style.width = "100%";
+        canvas.style.height = "100%";
+        container.appendChild(canvas);
+        var ctx = canvas.getContext("2d");
+
+        var particles = [];
+        var mouse = null;
+        var width = 0;
+        var height = 0;
+
+        function createParticle(x, y) {
+            var size = (p.size.random ? Math.random() : 1) * p.size.value * ratio;
+            var opacity = (p.opacity.random ? Math.random() : 1) * p.opacity.value;
+            var speed = p.move.speed * ratio;
+            return {
+                x: x !== undefined ? x : Math.random() * width,
+                y: y !== undefined ? y : Math.random() * height,
+                vx: (Math.random() - 0.5) * speed,
+                vy: (Math.random() - 0.5) * speed,
+                size: size,
+                sizeStep: (p.size.anim.speed / 100) * ratio * (Math.random() < 0.5 ? -1 : 1),
+                opacity: opacity,
+                opacityStep: (p.opacity.anim.speed / 100) * (Math.random() < 0.5 ? -1 : 1),
+                color: hexToRgb(pick(p.color.value))
+            };
+        }
+
+        function particleCount() {
+            var count = p.number.value;
+            if (p.number.density.enable) {
+                var area = (canvas.width * canvas.height) / 1000 / (ratio * ratio);
+                count = Math.round((area * p.number.value) / p.number.density.value_area);
+            }
+            return count;
+        }
+
+        function resize() {
+            width = canvas.width = container.offsetWidth * ratio;
+            height = canvas.height = container.offsetHeight * ratio;
+            var count = particleCount();
+            while (particles.length < count) {
+                particles.push(createParticle());
+            }
+            particles.length = count;
+        }
+
+        function animate(q) {
+            if (p.size.anim.enable) {
+                q.size += q.sizeStep;
+                if (q.size <= p.size.anim.size_min * ratio || q.size >= p.size.value * ratio) {
+                    q.sizeStep = -q.sizeStep;
+                }
+            }
+            if (p.opacity.anim.enable) {
+                q.opacity += q.opacityStep;
+                if (q.opacity <= p.opacity.anim.opacity_min || q.opacity >= p.opacity.value) {
+                    q.opacityStep = -q.opacityStep;
+                }
+            }
+            if (p.move.enable) {
+                q.x += q.vx;
+                q.y += q.vy;
+                if (q.x < -q.size) { q.x = width + q.size; }
+                if (q.x > width + q.size) { q.x = -q.size; }
+                if (q.y < -q.size) { q.y = height + q.size; }
+                if (q.y > height + q.size) { q.y = -q.size; }
+            }
+        }
+
+        function line(a, b, opacity) {
+            var c = hexToRgb(p.line_linked.color);
+            ctx.strokeStyle = "rgba(" + c.r + "," + c.g + "," + c.b + "," + opacity + ")";
+            ctx.lineWidth = p.line_linked.width;
+            ctx.beginPath();
+            ctx.moveTo(a.x, a.y);
+            ctx.lineTo(b.x, b.y);
+            ctx.stroke();
+        }
+
+        function draw() {
+            ctx.clearRect(0, 0, width, height);
+            var linkDistance = p.line_linked.distance * ratio;
+            var grabDistance = modes.grab.distance * ratio;
+
+            for (var i = 0; i < particles.length; i++) {
+                var a = particles[i];
+                animate(a);
+
+                ctx.fillStyle = "rgba(" + a.color.r + "," + a.color.g + "," + a.color.b + "," + Math.max(a.opacity, 0) + ")";
+                ctx.beginPath();
+                ctx.arc(a.x, a.y, Math.max(a.size, 0), 0, Math.PI * 2);
+                ctx.fill();
+
+                if (p.line_linked.enable) {
+                    for (var j = i + 1; j < particles.length; j++) {
+                        var b = particles[j];
+                        var d = Math.hypot(a.x - b.x, a.y - b.y);
+                        if (d < linkDistance) {
+                            line(a, b, p.line_linked.opacity * (1 - d / linkDistance));
+                        }
+                    }
+                }
+
+                if (mouse && events.onhover.enable && events.onhover.mode === "grab") {
+                    var dm = Math.hypot(a.x - mouse.x, a.y - mouse.y);
+                    if (dm < grabDistance) {
+                        line(a, mouse, modes.grab.line_linked.opacity * (1 - dm / grabDistance));
+                    }
+                }
+            }
+            global.requestAnimationFrame(draw);
+        }
+
+        var target = params.interactivity.detect_on === "window" ? global : canvas;
+        target.addEventListener("mousemove", function (e) {
+            mouse = { x: e.clientX * ratio, y: e.clientY * ratio };
+        });
+        target.addEventListener("mouseleave", function () {
+            mouse = null;
+        });
+        target.addEventListener("click", function (e) {
+            if (events.onclick.enable && events.onclick.mode === "push") {
+                for (var k = 0; k < modes.push.particles_nb; k++) {
+                    particles.push(createParticle(e.clientX * ratio, e.clientY * ratio));
+                }
+            }
+        });
+        if (events.resize) {
+            global.addEventListener("resize", resize);
+        }
+
+        resize();
+        global.requestAnimationFrame(draw);
+    }
+
+    global.particlesJS = function (tagId, params) {
+        var container = document.getElementById(tagId);
+        if (container && !container.dataset.particlesReady) {
+            container.dataset.particlesReady = "true";
+            new ParticleField(container, params);
+        }
+    };
+})(window);
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
@@ -0,0 +1,40 @@
+import asyncio
+import datetime
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from personality_diagnosis_app.fortune_systems import async_api, engine
+
+BIRTH_DATES = [datetime.date(1990, 5, 17), datetime.date(1985, 3, 4), datetime.date(1990, 5, 17)]
+
+@pytest.fixture
+def process_pool():
+    previous = async_api._executor
+    with ProcessPoolExecutor(2) as executor:
+        async_api.set_executor(executor)
+        try:
+            yield executor
+        finally:
+            async_api.set_executor(previous)
+
+def _gather(coroutine_fn, *args_list):
+    async def run():
+        return await asyncio.gather(*(coroutine_fn(*args) for args in args_list))
+    return asyncio.run(run())
+
+def test_diagnose_in_process_pool(process_pool):
+    for system in engine.SYSTEMS:
+        results = _gather(async_api.diagnose, *[(system, birth_date) for birth_date in BIRTH_DATES])
+        assert results == [async_api.diagnose_system(system, birth_date) for birth_date in BIRTH_DATES]
+        pickle.dumps(results)
+
+def test_diagnose_all_in_process_pool(process_pool):
+    results = _gather(async_api.diagnose_all, *[(birth_date,) for birth_date in BIRTH_DATES])
+    assert results == async_api.diagnose_all_batch(BIRTH_DATES)
+    assert list(results[0]) == list(engine.SYSTEMS)
+
+def test_classify_in_process_pool(process_pool):
+    results = _gather(async_api.classify, *[(birth_date,) for birth_date in BIRTH_DATES])
+    assert results == async_api.classify_batch(BIRTH_DATES)
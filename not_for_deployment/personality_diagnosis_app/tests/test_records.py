@@ -0,0 +1,14 @@
+import datetime
+import pickle
+from types import MappingProxyType
+
+from personality_diagnosis_app.fortune_systems import engine
+
+def test_diagnose_all_results_round_trip_through_pickle():
+    results = engine.diagnose_all(datetime.date(1990, 5, 17))
+    restored = pickle.loads(pickle.dumps(results))
+    assert restored == results
+    for key, result in results.items():
+        for name, value in result.items():
+            assert type(restored[key][name]) is type(value)
+    assert isinstance(restored["western_astrology"]["chart_data"], MappingProxyType)
@@ -0,0 +1,259 @@
+"""
+占術エンジンと結果描画のベンチマーク
+
+使い方:
+    python personality_diagnosis_app/tools/benchmark.py [--save PATH] [--compare PATH] [--threshold 0.2]
+                                                        [--filter NAME] [--quick]
+
+--save で結果をベースラインとしてJSONに保存し、--compare でベースラインと比較する。
+比較時に threshold（既定は20%）を超えて悪化した項目があれば終了コード1で終了する。
+両方を指定した場合は、保存前のベースラインと比較してから今回の結果を保存する。
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+from personality_diagnosis_app.fortune_systems import (
+    animal_fortune, engine, kyusei_kigaku, onmyo_gogyo, shichuu_suimei, shukuyo, team, vectorized, western_astrology
+)
+
+# ベースラインの既定の保存先
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# 悪化とみなす変化率の既定値
+DEFAULT_THRESHOLD = 0.2
+
+# 全期間スループットの対象期間
+RANGE_START = datetime.date(1900, 1, 1)
+
+# 占術キー → 占術クラス
+SYSTEM_CLASSES = {
+    "shichuu_suimei": shichuu_suimei.ShichuuSuimei,
+    "shukuyo": shukuyo.Shukuyo,
+    "onmyo_gogyo": onmyo_gogyo.OnmyoGogyo,
+    "kyusei_kigaku": kyusei_kigaku.KyuseiKigaku,
+    "western_astrology": western_astrology.WesternAstrology,
+    "animal_fortune": animal_fortune.AnimalFortune,
+}
+
+class Benchmark(NamedTuple):
+    """
+    ベンチマーク項目
+    """
+    name: str
+    unit: str
+    higher_is_better: bool
+    run: Callable[[bool], float]  # quick を受け取り計測値を返す
+
+def _timings(fn: Callable[[], None], repeat: int) -> List[float]:
+    """
+    関数を repeat 回実行し、1回ごとの経過時間（秒）を返す
+    """
+    gc.collect()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def _sample_dates(count: int) -> List[datetime.date]:
+    step = max((datetime.date.today() - RANGE_START).days // count, 1)
+    return [RANGE_START + datetime.timedelta(days=i * step) for i in range(count)]
+
+def _diagnose_latency(system: str) -> Callable[[bool], float]:
+    """
+    1件あたりの診断時間の中央値（マイクロ秒）
+    """
+    def run(quick: bool) -> float:
+        diagnose = engine.SYSTEMS[system]
+        dates = iter(_sample_dates(500 if quick else 5000))
+        diagnose(RANGE_START)
+        return statistics.median(_timings(lambda: diagnose(next(dates)), 500 if quick else 5000)) * 1e6
+    return run
+
+def _cold_start(system: str) -> Callable[[bool], float]:
+    """
+    データファイルの読み込み時間の中央値（ミリ秒）
+    """
+    def run(quick: bool) -> float:
+        instance = SYSTEM_CLASSES[system]()
+        return statistics.median(_timings(instance._load_data, 5 if quick else 30)) * 1e3
+    return run
+
+def _range_ordinals(quick: bool):
+    end = datetime.date(1910, 1, 1) if quick else datetime.date.today()
+    return vectorized.date_range_ordinals(RANGE_START, end)
+
+def _range_throughput(quick: bool) -> float:
+    """
+    全占術の診断を1900年から今日まで1日ずつ行った場合の処理速度（件/秒）
+    """
+    ordinals = _range_ordinals(quick)
+    dates = [datetime.date.fromordinal(int(o)) for o in ordinals]
+    elapsed = _timings(lambda: [engine.diagnose_all(d) for d in dates], 1)[0]
+    return len(dates) / elapsed
+
+def _record_throughput(quick: bool) -> float:
+    """
+    全占術の診断結果レコードを1900年から今日まで作成した場合の処理速度（件/秒）
+    """
+    ordinals = _range_ordinals(quick)
+    dates = [datetime.date.fromordinal(int(o)) for o in ordinals]
+    elapsed = _timings(lambda: [engine.record_all(d) for d in dates], 1)[0]
+    return len(dates) / elapsed
+
+def _vectorized_throughput(quick: bool) -> float:
+    """
+    ベクトル化エンジンで1900年から今日までを分類した場合の処理速度（件/秒）
+    """
+    ordinals = _range_ordinals(quick)
+    vectorized.diagnose_many(ordinals[:1])
+    elapsed = min(_timings(lambda: vectorized.diagnose_many(ordinals), 3 if quick else 10))
+    return len(ordinals) / elapsed
+
+def _team_matrix(quick: bool) -> float:
+    """
+    N人分の全占術合計の相性行列を作成する時間（ミリ秒）
+    """
+    ordinals = _range_ordinals(False)[:: 10 if quick else 5][:1000 if quick else 5000]
+    team.total_compatibility(ordinals[:2])
+    return min(_timings(lambda: team.total_compatibility(ordinals), 3)) * 1e3
+
+_RENDER_DIAGNOSIS_SCRIPT = """
+import sys
+sys.path[:0] = [{root!r}, {app_dir!r}]
+import datetime
+import streamlit as st
+from personality_diagnosis_app import app
+# 共有キャッシュを通さず、診断と描画を毎回行う
+st.markdown(app.render_diagnosis(datetime.date(1990, 5, 17).toordinal()), unsafe_allow_html=True)
+"""
+
+def _render_diagnosis(quick: bool) -> float:
+    """
+    Streamlitの AppTest 上で診断結果を描画した時間の中央値（ミリ秒）
+    """
+    from streamlit.testing.v1 import AppTest
+
+    script = _RENDER_DIAGNOSIS_SCRIPT.format(root=os.path.dirname(app_dir), app_dir=app_dir)
+    AppTest.from_string(script, default_timeout=60).run()
+
+    def run_once():
+        at = AppTest.from_string(script, default_timeout=60).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    return statistics.median(_timings(run_once, 3 if quick else 10)) * 1e3
+
+def benchmarks() -> List[Benchmark]:
+    """
+    ベンチマーク項目の一覧を取得する
+    """
+    items = []
+    for system in engine.SYSTEMS:
+        items.append(Benchmark(f"diagnose.{system}", "us", False, _diagnose_latency(system)))
+    for system in SYSTEM_CLASSES:
+        items.append(Benchmark(f"load_data.{system}", "ms", False, _cold_start(system)))
+    items += [
+        Benchmark("range.diagnose_all", "dates/s", True, _range_throughput),
+        Benchmark("range.record_all", "dates/s", True, _record_throughput),
+        Benchmark("range.vectorized", "dates/s", True, _vectorized_throughput),
+    ]
+    # 相性データを持つ占術が全て無効な場合は計測しない
+    if team.enabled_systems():
+        items.append(Benchmark("team.total_compatibility", "ms", False, _team_matrix))
+    items.append(Benchmark("app.render_diagnosis", "ms", False, _render_diagnosis))
+    return items
+
+def run_benchmarks(name_filter: Optional[str] = None, quick: bool = False, log=sys.stderr) -> Dict[str, Dict]:
+    """
+    ベンチマークを実行する
+
+    Args:
+        name_filter: 項目名に含まれる文字列（指定した場合はその項目のみ実行）
+        quick: 計測回数と対象期間を減らして短時間で実行する
+        log: 進捗の出力先
+
+    Returns:
+        項目名 → {"value": 計測値, "unit": 単位, "higher_is_better": 値が大きいほど良いか}
+    """
+    results = {}
+    for item in benchmarks():
+        if name_filter and name_filter not in item.name:
+            continue
+        value = item.run(quick)
+        results[item.name] = {"value": value, "unit": item.unit, "higher_is_better": item.higher_is_better}
+        if log is not None:
+            log.write(f"{item.name:<36} {value:>14,.2f} {item.unit}\n")
+    return results
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    ベースラインと比較し、threshold を超えて悪化した項目の説明を返す
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["value"]
+        after = result["value"]
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = -change if result["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append(f"{name}: {before:,.2f} -> {after:,.2f} {result['unit']} ({change:+.1%})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="占術エンジンと結果描画のベンチマーク")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="結果をベースラインとして保存する")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="ベースラインと比較する")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="悪化とみなす変化率（0.2 = 20%%）")
+    parser.add_argument("--filter", dest="name_filter", help="項目名に含まれる文字列")
+    parser.add_argument("--quick", action="store_true", help="計測回数と対象期間を減らす")
+    args = parser.parse_args(argv)
+
+    # --save と --compare に同じファイルを指定した場合に今回の結果と比較しないよう、先にベースラインを読み込む
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.name_filter, args.quick)
+
+    status = 0
+    if baseline is not None:
+        if baseline.get("quick") != args.quick:
+            print("Warning: baseline and current run use different --quick settings", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"No regressions beyond {args.threshold:.0%}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                       "quick": args.quick, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
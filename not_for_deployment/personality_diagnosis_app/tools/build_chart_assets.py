@@ -0,0 +1,32 @@
+"""
+12星座のレーダーチャートを事前描画して静的アセットとして保存する
+
+使い方:
+    python personality_diagnosis_app/tools/build_chart_assets.py [--output DIR] [--format png|svg ...]
+"""
+import argparse
+import os
+import sys
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+from personality_diagnosis_app.utils import chart_assets
+
+def main():
+    parser = argparse.ArgumentParser(description="12星座のレーダーチャートを事前描画する")
+    parser.add_argument("--output", default=chart_assets.CHART_ASSET_DIR, help="保存先ディレクトリ")
+    parser.add_argument(
+        "--format", dest="formats", action="append", choices=chart_assets.CHART_FORMATS,
+        help="出力形式（複数指定可、省略時はPNGとSVGの両方）"
+    )
+    args = parser.parse_args()
+
+    written = chart_assets.build_chart_assets(args.output, args.formats or chart_assets.CHART_FORMATS)
+    for path in written:
+        print(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+アプリで表示する文字だけを含む Noto Sans JP のサブセット（WOFF2）を作成して静的アセットとして保存する
+
+使い方:
+    python personality_diagnosis_app/tools/build_font_subset.py --source NotoSansCJKjp-Regular.otf
+
+元のフォントは Noto Sans JP または Noto Sans CJK（SC などの他地域版も可）のOTF/TTFを指定する。
+Noto Sans CJK の場合は日本語の字形（locl 機能の JAN）を既定の字形として組み込むため、
+ページの言語設定に関係なく日本語の字形で表示される。
+対象の文字はアプリのソース・静的アセット・データファイルに含まれる文字と、かな・英数字・記号。
+データファイルに新しい文字を追加した場合は作り直すこと（サブセットにない文字は代替フォントで表示される）。
+WOFF2の出力には fonttools と brotli が必要（アプリの実行には不要）。
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Dict, Iterable, Set
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+from personality_diagnosis_app.utils import static_assets
+
+# 常に含める文字の範囲（英数字・記号・かな・全角英数字）
+BASE_RANGES = (
+    (0x0020, 0x007E),  # ASCII
+    (0x00A0, 0x00FF),  # ラテン1補助（©など）
+    (0x2010, 0x2027),  # ダッシュ・引用符・三点リーダーなど
+    (0x3000, 0x303F),  # CJKの記号・句読点
+    (0x3040, 0x309F),  # ひらがな
+    (0x30A0, 0x30FF),  # カタカナ
+    (0xFF01, 0xFF5E),  # 全角英数字・記号
+)
+
+# 文字を集めるファイル（アプリのディレクトリからの相対パス）
+TEXT_SOURCES = ("*.py", "utils/*.py", "fortune_systems/*.py", "static/*.html", "data/*.json")
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+def collect_codepoints() -> Set[int]:
+    """
+    サブセットに含める文字のコードポイントを集める
+    """
+    codepoints = {cp for start, end in BASE_RANGES for cp in range(start, end + 1)}
+    for pattern in TEXT_SOURCES:
+        for path in sorted(glob.glob(os.path.join(app_dir, pattern))):
+            with open(path, encoding="utf-8") as f:
+                if path.endswith(".json"):
+                    texts = _strings(json.load(f))
+                else:
+                    texts = [f.read()]
+                for text in texts:
+                    codepoints.update(ord(ch) for ch in text if ord(ch) > 0x7F)
+    return codepoints
+
+def japanese_substitutions(font) -> Dict[str, str]:
+    """
+    locl 機能のうち日本語（JAN）向けの字形の置き換え（元の字形名 → 日本語の字形名）を取得する
+    """
+    if "GSUB" not in font:
+        return {}
+    table = font["GSUB"].table
+    feature_indices = set()
+    for script in table.ScriptList.ScriptRecord:
+        for lang in script.Script.LangSysRecord:
+            if lang.LangSysTag == "JAN ":
+                feature_indices.update(lang.LangSys.FeatureIndex)
+
+    substitutions = {}
+    for index in sorted(feature_indices):
+        record = table.FeatureList.FeatureRecord[index]
+        if record.FeatureTag != "locl":
+            continue
+        for lookup_index in record.Feature.LookupListIndex:
+            lookup = table.LookupList.Lookup[lookup_index]
+            for subtable in lookup.SubTable:
+                if lookup.LookupType == 7:
+                    subtable = subtable.ExtSubTable
+                mapping = getattr(subtable, "mapping", None)
+                if mapping:
+                    substitutions.update(mapping)
+    return substitutions
+
+def build_font_subset(source: str, output: str) -> int:
+    """
+    サブセットを作成して保存する
+
+    Args:
+        source: 元のフォントファイル
+        output: 出力するWOFF2ファイル
+
+    Returns:
+        サブセットに含めた文字数
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(source)
+    substitutions = japanese_substitutions(font)
+    if substitutions:
+        for cmap in font["cmap"].tables:
+            if cmap.isUnicode():
+                cmap.cmap = {cp: substitutions.get(glyph, glyph) for cp, glyph in cmap.cmap.items()}
+
+    codepoints = sorted(cp for cp in collect_codepoints() if cp in font.getBestCmap())
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["kern", "palt", "vert", "vrt2"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    font.flavor = "woff2"
+    font.save(output)
+    return len(codepoints)
+
+def main():
+    parser = argparse.ArgumentParser(description="アプリで表示する文字だけを含むフォントのサブセットを作成する")
+    parser.add_argument("--source", required=True, help="元のフォント（Noto Sans JP または Noto Sans CJK のOTF/TTF）")
+    parser.add_argument("--output", default=os.path.join(static_assets.STATIC_DIR, static_assets.FONT_FILE),
+                        help="出力するWOFF2ファイル")
+    args = parser.parse_args()
+
+    count = build_font_subset(args.source, args.output)
+    print(f"{args.output}: {count} characters, {os.path.getsize(args.output) / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
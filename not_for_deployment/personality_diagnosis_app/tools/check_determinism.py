@@ -0,0 +1,132 @@
+"""
+診断結果がプロセスをまたいで同じになることを確認する
+
+使い方:
+    python personality_diagnosis_app/tools/check_determinism.py [--runs 3] [--start 1900-01-01] [--end YYYY-MM-DD]
+
+PYTHONHASHSEED を変えた新しいインタープリターで全期間の diagnose_all を実行し、年ごとのダイジェストを比較する。
+一致しない年があれば、その年を日ごとに比較して最初に異なる生年月日と占術を表示し、終了コード1で終了する。
+キャッシュ（サーバーの結果キャッシュや共有キャッシュ）を複数のプロセスで共有する前提を確認するためのもの。
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+RANGE_START = datetime.date(1900, 1, 1)
+
+# 比較に使うハッシュシード（"0" はハッシュのランダム化を無効にする）
+HASH_SEEDS = ("0", "1", "12345", "random")
+
+def _digest(value) -> str:
+    from personality_diagnosis_app.fortune_systems.records import json_default
+
+    text = json.dumps(value, ensure_ascii=False, sort_keys=True, default=json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compute_digests(start: datetime.date, end: datetime.date, per_day: bool = False) -> Dict[str, str]:
+    """
+    期間内の全占術の診断結果のダイジェストを求める
+
+    Args:
+        start: 開始日
+        end: 終了日（この日を含む）
+        per_day: 日ごとのダイジェストを返す（省略時は年ごと）
+
+    Returns:
+        年（または "日付/占術キー"） → ダイジェスト
+    """
+    from personality_diagnosis_app.fortune_systems import engine, western_astrology
+    from personality_diagnosis_app.fortune_systems.records import ZODIAC_LABELS
+
+    digests = {}
+    year_hashes: Dict[int, "hashlib._Hash"] = {}
+    day = start
+    while day <= end:
+        results = engine.diagnose_all(day)
+        if per_day:
+            for key, result in results.items():
+                digests[f"{day.isoformat()}/{key}"] = _digest(result)
+        else:
+            year_hash = year_hashes.setdefault(day.year, hashlib.sha256())
+            year_hash.update(_digest(results).encode("ascii"))
+        day += datetime.timedelta(days=1)
+
+    digests.update({str(year): h.hexdigest() for year, h in year_hashes.items()})
+    # データファイルにチャートデータがない場合の既定値も比較する
+    digests["default_chart_data"] = _digest({sign: western_astrology.default_chart_data(sign) for sign in ZODIAC_LABELS})
+    return digests
+
+def run_child(seed: str, start: datetime.date, end: datetime.date, per_day: bool = False) -> Dict[str, str]:
+    """
+    新しいインタープリターでダイジェストを求める
+    """
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    args = [sys.executable, os.path.abspath(__file__), "--child", "--start", start.isoformat(), "--end", end.isoformat()]
+    if per_day:
+        args.append("--per-day")
+    output = subprocess.run(args, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def _differences(runs: List[Dict[str, str]]) -> List[str]:
+    keys = sorted(set().union(*runs))
+    return [key for key in keys if len({run.get(key) for run in runs}) > 1]
+
+def check(runs: int, start: datetime.date, end: datetime.date, log=sys.stderr) -> List[str]:
+    """
+    PYTHONHASHSEED を変えて複数回実行し、結果が異なる項目を返す
+    """
+    seeds = [HASH_SEEDS[i % len(HASH_SEEDS)] for i in range(runs)]
+    results = []
+    for seed in seeds:
+        log.write(f"PYTHONHASHSEED={seed}: {start} .. {end}\n")
+        results.append(run_child(seed, start, end))
+
+    differences = _differences(results)
+    years = [key for key in differences if key.isdigit()]
+    if years:
+        # 最初に異なる年だけを日ごとに比較して原因を絞り込む
+        year = int(years[0])
+        year_start = max(start, datetime.date(year, 1, 1))
+        year_end = min(end, datetime.date(year, 12, 31))
+        log.write(f"Narrowing down {year} per day\n")
+        details = _differences([run_child(seed, year_start, year_end, per_day=True) for seed in seeds[:2]])
+        differences = [key for key in differences if not key.isdigit()] + details[:20] + [f"years: {', '.join(years)}"]
+    return differences
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="診断結果がプロセスをまたいで同じになることを確認する")
+    parser.add_argument("--runs", type=int, default=3, help="実行するインタープリターの数")
+    parser.add_argument("--start", default=RANGE_START.isoformat(), help="開始日")
+    parser.add_argument("--end", default=datetime.date.today().isoformat(), help="終了日")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--per-day", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    start = datetime.date.fromisoformat(args.start)
+    end = datetime.date.fromisoformat(args.end)
+
+    if args.child:
+        print(json.dumps(compute_digests(start, end, args.per_day)))
+        return 0
+
+    differences = check(max(args.runs, 2), start, end)
+    if differences:
+        print("Results differ between interpreter runs:")
+        for key in differences:
+            print(f"  {key}")
+        return 1
+    print(f"Results are identical across {max(args.runs, 2)} interpreter runs ({start} .. {end})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
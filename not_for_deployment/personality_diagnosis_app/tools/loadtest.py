@@ -0,0 +1,230 @@
+"""
+Streamlitアプリの同時セッション負荷試験
+
+使い方:
+    python personality_diagnosis_app/tools/loadtest.py [--sessions 50] [--concurrency 4] [--skip-animation] [--json]
+
+1セッションは「ページを開く → 生年月日を選ぶ → 診断を開始を押す → 再実行」の流れを
+streamlit.testing の AppTest で実行する。再実行ごとの応答時間の分位点・処理速度・メモリの増加量を表示する。
+AppTest は1プロセスで同時に1つしか実行できないため、セッションは同時実行数と同じ数のワーカープロセスで実行する。
+--skip-animation を指定すると分析アニメーションの待ち時間（time.sleep）を省き、描画と診断だけを計測する。
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+# 各セッションで実行するスクリプト
+_APP_SCRIPT = """
+import sys
+sys.path[:0] = [{root!r}, {app_dir!r}]
+from personality_diagnosis_app import app
+app.main()
+"""
+
+# 1セッション内の操作（計測の区切り）
+STEPS = ("open", "select_date", "click", "rerun")
+
+START_BUTTON_LABEL = "診断を開始"
+
+class SessionResult(NamedTuple):
+    """
+    1セッション分の結果
+    """
+    latencies: Dict[str, float]  # 操作 → 応答時間（秒）
+    ok: bool
+    error: str
+
+def rss_bytes() -> int:
+    """
+    現在のプロセスの常駐メモリ量（バイト）
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # /proc がない環境では最大常駐メモリ量で代用する
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+def _skip_animation():
+    """
+    分析アニメーションの待ち時間を省く（アプリの time モジュールだけを差し替える）
+    """
+    from personality_diagnosis_app import app
+
+    class _NoSleepTime:
+        def __getattr__(self, name):
+            return getattr(time, name)
+
+        @staticmethod
+        def sleep(seconds):
+            pass
+
+    app.time = _NoSleepTime()
+
+def run_session(seed: int, skip_animation: bool = False, timeout: float = 60) -> SessionResult:
+    """
+    1セッション分の操作を実行し、操作ごとの応答時間を計測する
+    """
+    from streamlit.testing.v1 import AppTest
+
+    if skip_animation:
+        _skip_animation()
+
+    rng = random.Random(seed)
+    birth_date = datetime.date(1940, 1, 1) + datetime.timedelta(days=rng.randrange(365 * 80))
+    script = _APP_SCRIPT.format(root=os.path.dirname(app_dir), app_dir=app_dir)
+    latencies = {}
+
+    def timed(step: str, action):
+        start = time.perf_counter()
+        action()
+        latencies[step] = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{step}: {at.exception[0].value}")
+
+    try:
+        at = AppTest.from_string(script, default_timeout=timeout)
+        timed("open", at.run)
+        timed("select_date", lambda: at.date_input[0].set_value(birth_date).run())
+        button = next(b for b in at.button if b.label == START_BUTTON_LABEL)
+        timed("click", lambda: button.click().run())
+        timed("rerun", at.run)
+        if not any("result-header" in m.value for m in at.markdown):
+            return SessionResult(latencies, False, "result section was not rendered")
+        return SessionResult(latencies, True, "")
+    except Exception as e:
+        return SessionResult(latencies, False, str(e))
+
+class WorkerResult(NamedTuple):
+    """
+    1ワーカープロセス分の結果
+    """
+    sessions: List[SessionResult]
+    started: float     # 計測開始時刻（time.monotonic）
+    finished: float
+    rss_before: int    # 最初のセッションを実行した後の常駐メモリ量（バイト）
+    rss_after: int
+
+def run_worker(seeds: List[int], skip_animation: bool = False) -> WorkerResult:
+    """
+    ワーカープロセス内でセッションを順に実行する
+    最初の1セッションはモジュールの読み込みを含むため計測から除く
+    """
+    run_session(-1, skip_animation)
+    rss_before = rss_bytes()
+    started = time.monotonic()
+    sessions = [run_session(seed, skip_animation) for seed in seeds]
+    return WorkerResult(sessions, started, time.monotonic(), rss_before, rss_bytes())
+
+def _run_worker_args(args) -> tuple:
+    # AppTest の実行中に sys.modules["__main__"] が差し替わり、このモジュールのクラスは
+    # 名前で pickle できなくなるため、親プロセスにはタプルで返す
+    result = run_worker(*args)
+    return ([tuple(session) for session in result.sessions],) + tuple(result)[1:]
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * ratio), len(sorted_values) - 1)]
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values) * 1000 if values else 0.0,
+        "p50_ms": _percentile(values, 0.50) * 1000,
+        "p95_ms": _percentile(values, 0.95) * 1000,
+        "p99_ms": _percentile(values, 0.99) * 1000,
+    }
+
+def load_test(
+    sessions: int = 50,
+    concurrency: int = 4,
+    skip_animation: bool = False,
+) -> Dict[str, object]:
+    """
+    複数のセッションを同時に実行して応答時間と処理速度を計測する
+    AppTest は同じプロセス内で同時に実行できないため、同時実行数と同じ数のワーカープロセスにセッションを振り分ける
+
+    Args:
+        sessions: 総セッション数
+        concurrency: 同時に実行するセッション数（ワーカープロセス数）
+        skip_animation: 分析アニメーションの待ち時間を省く
+
+    Returns:
+        操作ごとの応答時間の分位点（ミリ秒）・処理速度・ワーカーごとのメモリの増加量
+    """
+    concurrency = max(min(concurrency, sessions), 1)
+    tasks = [(list(range(worker, sessions, concurrency)), skip_animation) for worker in range(concurrency)]
+    with ProcessPoolExecutor(concurrency) as executor:
+        workers = [
+            WorkerResult([SessionResult(*session) for session in values[0]], *values[1:])
+            for values in executor.map(_run_worker_args, tasks)
+        ]
+
+    results = [session for worker in workers for session in worker.sessions]
+    elapsed = max(w.finished for w in workers) - min(w.started for w in workers)
+    reruns = [value for result in results for value in result.latencies.values()]
+    failures = [result.error for result in results if not result.ok]
+    growth = [w.rss_after - w.rss_before for w in workers]
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "skip_animation": skip_animation,
+        "failures": len(failures),
+        "first_failure": failures[0] if failures else "",
+        "elapsed": elapsed,
+        "sessions_per_second": len(results) / elapsed if elapsed else 0.0,
+        "reruns_per_second": len(reruns) / elapsed if elapsed else 0.0,
+        "rerun": _summarize(reruns),
+        "steps": {step: _summarize([r.latencies[step] for r in results if step in r.latencies]) for step in STEPS},
+        "worker_rss_mb": [w.rss_after / 2**20 for w in workers],
+        "rss_growth_mb": sum(growth) / 2**20,
+        "rss_growth_per_session_kb": sum(growth) / 1024 / len(results) if results else 0.0,
+    }
+
+def _print_report(report: Dict[str, object]):
+    print(f"{report['sessions']} sessions, concurrency {report['concurrency']}, "
+          f"{report['failures']} failures, {report['elapsed']:.2f}s")
+    if report["failures"]:
+        print(f"  first failure: {report['first_failure']}")
+    print(f"  throughput: {report['sessions_per_second']:.2f} sessions/s, {report['reruns_per_second']:.2f} reruns/s")
+    print(f"  {'step':<12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    rows = dict(report["steps"], all=report["rerun"])
+    for step, summary in rows.items():
+        print(f"  {step:<12} {summary['p50_ms']:>10.1f} {summary['p95_ms']:>10.1f} {summary['p99_ms']:>10.1f}")
+    worker_rss = ", ".join(f"{mb:.1f}" for mb in report["worker_rss_mb"])
+    print(f"  memory: workers {worker_rss} MB, growth {report['rss_growth_mb']:+.1f} MB "
+          f"({report['rss_growth_per_session_kb']:+.1f} KB/session)")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Streamlitアプリの同時セッション負荷試験")
+    parser.add_argument("--sessions", type=int, default=50, help="総セッション数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時に実行するセッション数（ワーカープロセス数）")
+    parser.add_argument("--skip-animation", action="store_true", help="分析アニメーションの待ち時間を省く")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args(argv)
+
+    report = load_test(args.sessions, args.concurrency, args.skip_animation)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+    return 1 if report["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+操作ごとにStreamlitが送信する差分（delta）のバイト数を計測する
+
+使い方:
+    python personality_diagnosis_app/tools/rerun_deltas.py [--json]
+
+「ページを開く → 診断を開始を押す → 生年月日を選び直す → 分布分析ページに移る → 診断項目を選ぶ → クロス集計の列を選ぶ」
+の流れを streamlit.testing の AppTest で実行し、操作ごとに次の2つを表示する。
+    全体    スクリプト全体を再実行した場合に送信する差分のバイト数（フラグメントを使わない場合）
+    部分    操作したウィジェットを含むフラグメントだけを再実行した場合に送信する差分のバイト数
+AppTest は操作のたびにスクリプト全体を再実行するため、部分再実行の量は
+全体の再実行のうちそのフラグメントが送信した差分のバイト数で求める。
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+# 計測するアプリのスクリプト
+_APP_SCRIPT = """
+import sys
+sys.path[:0] = [{root!r}, {app_dir!r}]
+from personality_diagnosis_app import app
+app.main()
+"""
+
+BIRTH_DATE = datetime.date(1990, 5, 17)
+
+class Interaction(NamedTuple):
+    """
+    計測する1つの操作
+    """
+    name: str
+    scope: str                      # 操作後に再実行される範囲（fragments.APP_SCOPE またはフラグメント名）
+    action: Callable[[object], object]  # AppTest を受け取り、操作して再実行する
+
+def _widget(widgets, label: str):
+    return next(widget for widget in widgets if widget.label == label)
+
+def interactions() -> List[Interaction]:
+    """
+    計測する操作の一覧（実行順）
+    """
+    from personality_diagnosis_app import app
+    from personality_diagnosis_app.tools import loadtest
+    from personality_diagnosis_app.utils import fragments
+
+    return [
+        Interaction("open", fragments.APP_SCOPE, lambda at: at.run()),
+        # 診断を開始は結果セクションを表示するため、st.rerun() で全体を再実行する
+        Interaction("click", fragments.APP_SCOPE,
+                    lambda at: _widget(at.button, loadtest.START_BUTTON_LABEL).click().run()),
+        # 結果を表示した状態で日付を変更する（結果カードは再送信しない）
+        Interaction("select_date", "input", lambda at: at.date_input[0].set_value(BIRTH_DATE).run()),
+        Interaction("open_analytics", fragments.APP_SCOPE,
+                    lambda at: at.sidebar.radio[0].set_value(app.ANALYTICS_PAGE).run()),
+        Interaction("select_attributes", "distributions",
+                    lambda at: _widget(at.multiselect, "診断項目").select("shukuyo.shukuyo").run()),
+        Interaction("select_crosstab", "crosstab",
+                    lambda at: _widget(at.selectbox, "列").set_value("animal_fortune.animal").run()),
+    ]
+
+def measure(timeout: float = 60) -> Dict[str, Dict[str, object]]:
+    """
+    操作ごとの差分のバイト数を計測する
+
+    Returns:
+        操作 → {"scope": 再実行される範囲, "full_bytes": 全体の再実行, "partial_bytes": 部分再実行}
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from personality_diagnosis_app.fortune_systems import instrumentation
+    from personality_diagnosis_app.tools import loadtest
+    from personality_diagnosis_app.utils import fragments
+
+    # 分析アニメーションの待ち時間は送信量に関係しないため省く
+    loadtest._skip_animation()
+    instrumentation.enable()
+    script = _APP_SCRIPT.format(root=os.path.dirname(app_dir), app_dir=app_dir)
+    at = AppTest.from_string(script, default_timeout=timeout)
+
+    report = {}
+    for interaction in interactions():
+        instrumentation.reset()
+        interaction.action(at)
+        if at.exception:
+            raise RuntimeError(f"{interaction.name}: {at.exception[0].value}")
+        totals = instrumentation.delta_totals()
+        full_bytes = totals.get(fragments.APP_SCOPE, (0, 0))[1]
+        report[interaction.name] = {
+            "scope": interaction.scope,
+            "full_bytes": full_bytes,
+            "partial_bytes": totals.get(interaction.scope, (0, 0))[1],
+        }
+    return report
+
+def _print_report(report: Dict[str, Dict[str, object]]):
+    print(f"{'interaction':<18} {'scope':<14} {'full bytes':>12} {'partial bytes':>14} {'saved':>7}")
+    for name, row in report.items():
+        full, partial = row["full_bytes"], row["partial_bytes"]
+        saved = 1 - partial / full if full else 0.0
+        print(f"{name:<18} {row['scope']:<14} {full:>12,} {partial:>14,} {saved:>7.0%}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="操作ごとにStreamlitが送信する差分のバイト数を計測する")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args(argv)
+
+    from personality_diagnosis_app.utils import fragments
+
+    if not fragments.supported():
+        print("This Streamlit version has no fragments; every interaction reruns the whole script.",
+              file=sys.stderr)
+    report = measure()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
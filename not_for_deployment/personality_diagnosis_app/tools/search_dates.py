@@ -0,0 +1,76 @@
+"""
+診断結果の条件から生年月日を逆引きする
+
+使い方:
+    python personality_diagnosis_app/tools/search_dates.py --where shichuu_suimei.ten_kan=甲 --where shichuu_suimei.juu_ni_shi=帝旺
+    python personality_diagnosis_app/tools/search_dates.py --where shukuyo.shukuyo=鬼宿 --start 1980-01-01 --end 1989-12-31 --count
+    python personality_diagnosis_app/tools/search_dates.py --list
+
+条件は「占術キー.項目名=ラベル」で指定し、複数指定した場合は全てに一致する日を出力する。
+ラベルをカンマで区切ると、いずれかに一致する日を対象にする（例: --where animal_fortune.animal=狼,猿）。
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# personality_diagnosis_appディレクトリをパスに追加
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(app_dir))
+sys.path.insert(0, app_dir)
+
+def parse_criteria(values: List[str]) -> Dict[str, object]:
+    """
+    「占術キー.項目名=ラベル[,ラベル...]」の列を検索条件に変換する
+    """
+    criteria = {}
+    for value in values:
+        name, sep, labels = value.partition("=")
+        if not sep or not labels:
+            raise ValueError(f"Invalid condition: {value} (expected <system>.<name>=<label>)")
+        labels = labels.split(",")
+        criteria[name.strip()] = labels[0] if len(labels) == 1 else labels
+    return criteria
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from personality_diagnosis_app.fortune_systems import reverse_index, vectorized
+
+    parser = argparse.ArgumentParser(description="診断結果の条件から生年月日を逆引きする")
+    parser.add_argument("--where", action="append", default=[], help="条件（占術キー.項目名=ラベル）")
+    parser.add_argument("--start", help="検索期間の開始日")
+    parser.add_argument("--end", help="検索期間の終了日")
+    parser.add_argument("--count", action="store_true", help="件数だけを出力する")
+    parser.add_argument("--limit", type=int, default=0, help="出力する件数の上限（0は無制限）")
+    parser.add_argument("--list", action="store_true", help="指定できる診断項目とラベルの一覧を出力する")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in vectorized.attributes():
+            print(f"{name}: {', '.join(vectorized.labels(name))}")
+        return 0
+
+    try:
+        criteria = parse_criteria(args.where)
+        start = datetime.date.fromisoformat(args.start) if args.start else None
+        end = datetime.date.fromisoformat(args.end) if args.end else None
+        index = reverse_index.get_index(start, end)
+        begin = time.perf_counter()
+        ordinals = index.query(criteria, start, end)
+        elapsed = time.perf_counter() - begin
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    if args.count:
+        print(len(ordinals))
+    else:
+        for ordinal in ordinals[:args.limit or None].tolist():
+            print(datetime.date.fromordinal(ordinal).isoformat())
+    print(f"{len(ordinals)} dates matched in {elapsed * 1000:.2f} ms "
+          f"(index {index.start} .. {index.end}, {index.nbytes() / 2**20:.1f} MB)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
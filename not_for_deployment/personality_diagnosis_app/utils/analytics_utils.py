@@ -0,0 +1,125 @@
+import datetime
+import io
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from personality_diagnosis_app.fortune_systems import analytics
+from . import bulk_utils
+
+# 集計結果のキャッシュ件数（期間・名簿と診断項目の組ごと）
+CACHE_ENTRIES = 64
+
+# 分析ページで最初に選択しておく診断項目
+DEFAULT_ATTRIBUTES = (
+    "kyusei_kigaku.honmei_sei",
+    "shukuyo.shukuyo",
+    "western_astrology.sun_sign",
+    "animal_fortune.type",
+)
+
+# 診断項目の表示名
+ATTRIBUTE_TITLES = {
+    analytics.BIRTH_YEAR: "生年",
+    "shichuu_suimei.ten_kan": "四柱推命：日柱天干",
+    "shichuu_suimei.day_juu_ni_shi": "四柱推命：日柱十二支",
+    "shichuu_suimei.juu_ni_shi": "四柱推命：日柱十二運",
+    "shichuu_suimei.tsuhen_sei": "四柱推命：月干の蔵干宿命星",
+    "shichuu_suimei.gogyo": "四柱推命：五行",
+    "shukuyo.shukuyo": "宿曜",
+    "onmyo_gogyo.inyo": "陰陽五行：陰陽",
+    "onmyo_gogyo.gogyo": "陰陽五行：五行",
+    "kyusei_kigaku.honmei_sei": "九星気学：本命星",
+    "kyusei_kigaku.getsu_mei_sei": "九星気学：月命星",
+    "western_astrology.sun_sign": "西洋占星術：太陽星座",
+    "western_astrology.moon_sign": "西洋占星術：月星座",
+    "western_astrology.ascendant": "西洋占星術：アセンダント",
+    "animal_fortune.animal": "動物占い：動物",
+    "animal_fortune.type": "動物占い：タイプ",
+}
+
+def attribute_title(name: str) -> str:
+    return ATTRIBUTE_TITLES.get(name, name)
+
+def _histogram_frame(histogram: analytics.Histogram) -> pd.DataFrame:
+    return pd.DataFrame({"件数": histogram.counts}, index=pd.Index(histogram.labels, name=attribute_title(histogram.attribute)))
+
+def _crosstab_frame(table: analytics.Crosstab) -> pd.DataFrame:
+    return pd.DataFrame(
+        table.counts,
+        index=pd.Index(table.row_labels, name=attribute_title(table.row)),
+        columns=pd.Index(table.column_labels, name=attribute_title(table.column)),
+    )
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def range_histograms(names: Tuple[str, ...], start: datetime.date, end: datetime.date) -> Dict[str, pd.DataFrame]:
+    """
+    期間内の全日付に対する診断項目の分布（期間と診断項目の組ごとにキャッシュする）
+    """
+    return {name: _histogram_frame(h) for name, h in analytics.range_histograms(names, start, end).items()}
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def range_crosstab(row: str, column: str, start: datetime.date, end: datetime.date) -> pd.DataFrame:
+    """
+    期間内の全日付に対する2つの診断項目のクロス集計（期間と診断項目の組ごとにキャッシュする）
+    """
+    return _crosstab_frame(analytics.range_crosstab(row, column, start, end))
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def roster_ordinals(data: bytes, date_column: str) -> Tuple[np.ndarray, int]:
+    """
+    名簿CSVの生年月日の列を序数の配列に変換する（ファイルの内容と列の組ごとにキャッシュする）
+
+    Returns:
+        (生年月日の序数, 日付として解釈できなかった行数) のタプル
+    """
+    ordinals = []
+    invalid_rows = 0
+    for chunk in bulk_utils.iter_roster_chunks(io.BytesIO(data)):
+        chunk_ordinals, valid = bulk_utils.parse_birth_dates(chunk[date_column])
+        ordinals.append(chunk_ordinals)
+        invalid_rows += int((~valid).sum())
+    return (np.concatenate(ordinals) if ordinals else np.empty(0, dtype=np.int64)), invalid_rows
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def roster_histograms(data: bytes, date_column: str, names: Tuple[str, ...]) -> Dict[str, pd.DataFrame]:
+    """
+    名簿の生年月日に対する診断項目の分布（ファイルの内容・列・診断項目の組ごとにキャッシュする）
+    """
+    ordinals, _ = roster_ordinals(data, date_column)
+    return {name: _histogram_frame(h) for name, h in analytics.histograms(names, ordinals).items()}
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def roster_crosstab(data: bytes, date_column: str, row: str, column: str) -> pd.DataFrame:
+    """
+    名簿の生年月日に対する2つの診断項目のクロス集計（ファイルの内容・列・診断項目の組ごとにキャッシュする）
+    """
+    ordinals, _ = roster_ordinals(data, date_column)
+    return _crosstab_frame(analytics.crosstab(row, column, ordinals))
+
+def _bar_chart(frame: pd.DataFrame):
+    """
+    ラベルの並び順（コードの順）を保ったまま棒グラフを表示する
+    """
+    import altair as alt
+
+    label = frame.index.name
+    data = frame.reset_index()
+    chart = alt.Chart(data).mark_bar().encode(
+        x=alt.X(f"{label}:N", sort=None, title=None),
+        y=alt.Y("件数:Q"),
+        tooltip=[label, "件数"],
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+def show_distributions(histograms: Dict[str, pd.DataFrame]):
+    """
+    診断項目ごとの分布を棒グラフで表示する（2列に並べる）
+    """
+    columns = st.columns(2)
+    for i, (name, frame) in enumerate(histograms.items()):
+        with columns[i % 2]:
+            st.markdown(f"**{attribute_title(name)}**")
+            _bar_chart(frame)
@@ -0,0 +1,245 @@
+import codecs
+import importlib.util
+import os
+import tempfile
+import time
+from typing import IO, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from personality_diagnosis_app.fortune_systems import vectorized
+from .date_utils import parse_date
+
+# 1回に読み込む行数
+DEFAULT_CHUNK_SIZE = 5000
+
+# 名簿CSVの文字コードの候補（Excelで保存した日本語のCSVは cp932 のことが多いため、UTF-8で読めない場合に使う）
+ROSTER_ENCODINGS = ("utf-8-sig", "cp932")
+
+# 文字コードの判定で一度に読み込むバイト数
+_DETECT_BLOCK_SIZE = 1024 * 1024
+
+# 生年月日の列として優先的に選ぶ列名
+DATE_COLUMN_CANDIDATES = ("生年月日", "誕生日", "birth_date", "birthdate", "birthday", "date_of_birth")
+
+# 出力形式 → (拡張子, MIMEタイプ)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+# 出力ファイルの保存先と名前の接頭辞
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "pda_exports")
+EXPORT_PREFIX = "roster_"
+
+# 出力ファイルを残す時間（秒）。セッションの終了は検知できないため、これより古いものは次の出力時などに削除する
+EXPORT_MAX_AGE = float(os.environ.get("PDA_EXPORT_MAX_AGE") or 3600)
+
+class ExportResult(NamedTuple):
+    """
+    一括診断の出力結果
+    """
+    path: str
+    fmt: str
+    rows: int
+    invalid_rows: int
+
+def available_formats() -> Sequence[str]:
+    """
+    利用できる出力形式を取得する（Parquetはpyarrowがある場合のみ）
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        return ("csv",)
+    return tuple(EXPORT_FORMATS)
+
+def guess_date_column(columns: Sequence[str]) -> Optional[str]:
+    """
+    列名から生年月日の列を推測する
+    """
+    lowered = {str(column).strip().lower(): column for column in columns}
+    for candidate in DATE_COLUMN_CANDIDATES:
+        if candidate in lowered:
+            return lowered[candidate]
+    return columns[0] if len(columns) else None
+
+def detect_encoding(source: IO) -> str:
+    """
+    名簿CSVの文字コードを判定する（ROSTER_ENCODINGS のうち、ファイル全体を読み込めた最初のもの）
+    どれでも読み込めない場合は最後の候補を返す
+    """
+    for encoding in ROSTER_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        source.seek(0)
+        try:
+            while True:
+                block = source.read(_DETECT_BLOCK_SIZE)
+                decoder.decode(block, final=not block)
+                if not block:
+                    break
+        except UnicodeDecodeError:
+            continue
+        finally:
+            source.seek(0)
+        return encoding
+    return ROSTER_ENCODINGS[-1]
+
+def read_columns(source: IO) -> Sequence[str]:
+    """
+    CSVのヘッダー行だけを読み込んで列名を取得する
+    空のファイルやCSVとして読み込めないファイルの場合は空のリストを返す
+    """
+    encoding = detect_encoding(source)
+    try:
+        columns = list(pd.read_csv(source, nrows=0, encoding=encoding).columns)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError):
+        columns = []
+    source.seek(0)
+    return columns
+
+def iter_roster_chunks(source: IO, chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    名簿CSVを一定行数ずつ読み込む（文字コードは detect_encoding で判定する）
+    社員番号の先頭の0などが失われないよう、全列を文字列として読み込む
+    """
+    encoding = detect_encoding(source)
+    with pd.read_csv(source, dtype=str, chunksize=chunksize, encoding=encoding) as reader:
+        for chunk in reader:
+            yield chunk
+
+def parse_birth_dates(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生年月日の列を序数の配列に変換する
+
+    Returns:
+        (日付として解釈できた行の序数, 行ごとに解釈できたかどうか) のタプル
+    """
+    # 一括診断のCLIやAPIと同じ parse_date で解釈する（表記が行ごとに混在していてもよい）
+    # 名簿の生年月日は重複が多いため、異なる文字列ごとに1回だけ解釈する
+    codes, uniques = pd.factorize(values)
+    unique_ordinals = np.zeros(len(uniques), dtype=np.int64)
+    unique_valid = np.zeros(len(uniques), dtype=bool)
+    for i, text in enumerate(uniques):
+        try:
+            unique_ordinals[i] = parse_date(str(text)).toordinal()
+            unique_valid[i] = True
+        except ValueError:
+            pass
+    # 欠損値（コード -1）は解釈できなかった行として扱う
+    valid = (codes >= 0) & unique_valid[codes]
+    return unique_ordinals[codes[valid]], valid
+
+def diagnose_frame(frame: pd.DataFrame, date_column: str) -> pd.DataFrame:
+    """
+    名簿の各行に全占術の診断結果の列を追加する
+    日付として解釈できない行の診断結果は空欄にする
+    """
+    return _diagnose_parsed(frame, *parse_birth_dates(frame[date_column]))
+
+def _diagnose_parsed(frame: pd.DataFrame, ordinals: np.ndarray, valid: np.ndarray) -> pd.DataFrame:
+    # 有効な占術の項目のみを出力する
+    results = vectorized.diagnose_many(ordinals, vectorized.enabled_names())
+
+    output = frame.copy()
+    for name, values in results.items():
+        column = np.full(len(frame), None, dtype=object)
+        column[valid] = values
+        output[name] = column
+    return output
+
+def export_roster(
+    chunks: Iterable[pd.DataFrame],
+    date_column: str,
+    fmt: str = "csv",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ExportResult:
+    """
+    名簿をチャンク単位で診断し、結果を一時ファイル（EXPORT_DIR）に順次書き出す
+    全件の結果をメモリ上に保持しないため、大きな名簿でもメモリ使用量は一定に保たれる
+    書き出す前に、EXPORT_MAX_AGE より古い出力ファイルを削除する
+
+    Args:
+        chunks: 名簿のチャンク
+        date_column: 生年月日の列名
+        fmt: 出力形式（"csv" または "parquet"）
+        on_progress: チャンクを処理するたびに (処理済み行数, 日付不正の行数) で呼ばれる関数
+
+    Returns:
+        出力結果
+    """
+    suffix, _ = EXPORT_FORMATS[fmt]
+    sweep_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    handle = tempfile.NamedTemporaryFile(prefix=EXPORT_PREFIX, suffix=suffix, dir=EXPORT_DIR, delete=False)
+
+    rows = 0
+    invalid_rows = 0
+    writer = None
+    try:
+        with handle:
+            if fmt == "csv":
+                # Excelで文字化けしないようBOMを付ける（チャンクごとに付かないよう先頭で一度だけ）
+                handle.write(codecs.BOM_UTF8)
+
+            for chunk in chunks:
+                ordinals, valid = parse_birth_dates(chunk[date_column])
+                diagnosed = _diagnose_parsed(chunk, ordinals, valid)
+
+                if fmt == "csv":
+                    diagnosed.to_csv(handle, header=(rows == 0), index=False, encoding="utf-8")
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(diagnosed.astype("string"), preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(handle, table.schema)
+                    writer.write_table(table)
+
+                rows += len(diagnosed)
+                invalid_rows += int((~valid).sum())
+                if on_progress:
+                    on_progress(rows, invalid_rows)
+
+            if writer is not None:
+                writer.close()
+    except Exception:
+        os.unlink(handle.name)
+        raise
+
+    return ExportResult(handle.name, fmt, rows, invalid_rows)
+
+def discard_export(export: ExportResult):
+    """
+    不要になった出力ファイルを削除する
+    """
+    try:
+        os.unlink(export.path)
+    except FileNotFoundError:
+        pass
+
+def sweep_exports(max_age: float = EXPORT_MAX_AGE) -> int:
+    """
+    終了したセッションが残した古い出力ファイルを削除する
+    export_roster が書き出した名前の通常のファイル以外は削除しない
+
+    Returns:
+        削除したファイル数
+    """
+    suffixes = tuple(suffix for suffix, _ in EXPORT_FORMATS.values())
+    deadline = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(EXPORT_DIR))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not (entry.name.startswith(EXPORT_PREFIX) and entry.name.endswith(suffixes)):
+            continue
+        try:
+            if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < deadline:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
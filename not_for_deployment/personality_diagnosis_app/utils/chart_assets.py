@@ -0,0 +1,176 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from personality_diagnosis_app.fortune_systems import registry
+from . import display_utils, svg_chart
+
+# チャートのデータを持つ占術（無効な場合はチャートを表示しない）
+CHART_SYSTEM = "western_astrology"
+
+# 事前描画したチャートの保存先（静的アセットとして配信される）
+CHART_ASSET_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "charts"
+)
+
+# 出力形式
+CHART_FORMATS = ("png", "svg")
+
+# 太陽星座とファイル名の対応
+SIGN_SLUGS: Dict[str, str] = {
+    "牡羊座": "aries",
+    "牡牛座": "taurus",
+    "双子座": "gemini",
+    "蟹座": "cancer",
+    "獅子座": "leo",
+    "乙女座": "virgo",
+    "天秤座": "libra",
+    "蠍座": "scorpio",
+    "射手座": "sagittarius",
+    "山羊座": "capricorn",
+    "水瓶座": "aquarius",
+    "魚座": "pisces",
+}
+
+# 読み込み済みのチャート（(星座, 形式) → バイト列）
+_cache: Dict[Tuple[str, str], bytes] = {}
+_lock = threading.Lock()
+
+def enabled() -> bool:
+    """
+    チャートを表示するか（チャートのデータを持つ占術が有効か）
+    """
+    return registry.is_enabled(CHART_SYSTEM)
+
+def _chart_data(sun_sign: str) -> Dict[str, float]:
+    """
+    太陽星座のチャートデータを取得する（西洋占星術のモジュールはここで初めて読み込む）
+    """
+    return registry.load(CHART_SYSTEM).get_instance()._create_chart_data(sun_sign)
+
+@functools.lru_cache(maxsize=None)
+def chart_digest(sun_sign: str) -> str:
+    """
+    太陽星座のチャートデータのハッシュ
+    データファイルを変更するとファイル名が変わるため、古いチャート画像は使われない
+    """
+    categories, values = display_utils.chart_data_to_series(_chart_data(sun_sign))
+    data = json.dumps([sun_sign, categories, values], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:12]
+
+def chart_asset_path(sun_sign: str, fmt: str, asset_dir: str = CHART_ASSET_DIR) -> str:
+    """
+    チャート画像のファイルパスを取得する（ファイル名にチャートデータのハッシュを含める）
+    """
+    return os.path.join(asset_dir, f"{SIGN_SLUGS[sun_sign]}-{chart_digest(sun_sign)}.{fmt}")
+
+def render_chart_asset(sun_sign: str, fmt: str) -> bytes:
+    """
+    太陽星座のチャート画像を描画する
+    SVGはmatplotlibを使わない軽量バックエンドで、PNGはmatplotlibで描画する
+    """
+    categories, values = display_utils.chart_data_to_series(_chart_data(sun_sign))
+    if fmt == "svg":
+        return svg_chart.radar_chart_svg(categories, values, sun_sign).encode("utf-8")
+    return display_utils.render_radar_chart(categories, values, sun_sign, fmt=fmt)
+
+def build_chart_assets(asset_dir: str = CHART_ASSET_DIR, formats: Iterable[str] = CHART_FORMATS) -> List[str]:
+    """
+    全ての太陽星座のチャート画像を描画して保存する
+
+    Args:
+        asset_dir: 保存先ディレクトリ
+        formats: 出力形式
+
+    Returns:
+        保存したファイルパスのリスト
+    """
+    os.makedirs(asset_dir, exist_ok=True)
+
+    written = []
+    for sun_sign in SIGN_SLUGS:
+        for fmt in formats:
+            path = chart_asset_path(sun_sign, fmt, asset_dir)
+            _write_atomic(path, render_chart_asset(sun_sign, fmt))
+            written.append(path)
+            _remove_stale(sun_sign, fmt, asset_dir, path)
+
+    return written
+
+def _remove_stale(sun_sign: str, fmt: str, asset_dir: str, current: str):
+    """
+    チャートデータが変わる前に描画した同じ星座・形式のファイルを削除する
+    """
+    slug = SIGN_SLUGS[sun_sign]
+    for path in glob.glob(os.path.join(asset_dir, f"{slug}-*.{fmt}")) + [os.path.join(asset_dir, f"{slug}.{fmt}")]:
+        if path != current and os.path.exists(path):
+            os.remove(path)
+
+def _write_atomic(path: str, data: bytes):
+    """
+    書き込み途中のファイルが読まれないよう、一時ファイル経由で保存する
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def get_chart_asset(sun_sign: str, fmt: str = "svg") -> bytes:
+    """
+    太陽星座のチャート画像を取得する
+    事前描画済みのファイルを読み込み、以降はメモリ上のバイト列を返す
+    ファイルがない場合はその場で描画して保存する
+    （読み取り専用の環境などで保存できない場合は、描画したバイト列をメモリ上にだけ保持する）
+
+    Args:
+        sun_sign: 太陽星座
+        fmt: 画像形式（"png" または "svg"）
+
+    Returns:
+        画像のバイト列
+    """
+    if sun_sign not in SIGN_SLUGS:
+        raise KeyError(f"Unknown sun sign: {sun_sign}")
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+
+    key = (sun_sign, fmt)
+    data = _cache.get(key)
+    if data is not None:
+        return data
+
+    with _lock:
+        if key not in _cache:
+            path = chart_asset_path(sun_sign, fmt)
+            try:
+                with open(path, "rb") as f:
+                    _cache[key] = f.read()
+            except OSError:
+                _cache[key] = render_chart_asset(sun_sign, fmt)
+                try:
+                    os.makedirs(CHART_ASSET_DIR, exist_ok=True)
+                    _write_atomic(path, _cache[key])
+                except OSError as e:
+                    print(f"Could not save chart asset {path}: {e}", file=sys.stderr)
+        return _cache[key]
+
+def chart_html(sun_sign: str, backend: str = None) -> str:
+    """
+    太陽星座のチャートをHTMLに埋め込める形式で取得する
+    SVGバックエンドではインラインSVG、matplotlibバックエンドではPNGのimg要素を返す
+    """
+    backend = backend or display_utils.CHART_BACKEND
+    if backend == "svg":
+        return get_chart_asset(sun_sign, "svg").decode("utf-8")
+
+    return display_utils.png_image_html(get_chart_asset(sun_sign, "png"), sun_sign)
@@ -1,5 +1,6 @@
 import datetime
 import calendar
+import re
 from typing import Tuple, Dict
 
 def get_lunar_date(date: datetime.date) -> Dict:
@@ -83,4 +84,21 @@ def is_leap_year(year: int) -> bool:
     """
     閏年かどうかを判定する
     """
-    return calendar.isleap(year) 
\ No newline at end of file
+    return calendar.isleap(year) 
+
+_DATE_PATTERN = re.compile(r"^\s*(\d{4})[-/.年](\d{1,2})[-/.月](\d{1,2})日?\s*$")
+
+def parse_date(text: str) -> datetime.date:
+    """
+    文字列から日付を取得する
+    「1990-01-02」「1990/1/2」「1990.1.2」「1990年1月2日」「19900102」の形式に対応する
+    """
+    match = _DATE_PATTERN.match(text)
+    if match:
+        year, month, day = match.groups()
+    elif len(text.strip()) == 8 and text.strip().isdigit():
+        digits = text.strip()
+        year, month, day = digits[:4], digits[4:6], digits[6:]
+    else:
+        raise ValueError(f"Invalid date: {text!r}")
+    return datetime.date(int(year), int(month), int(day))
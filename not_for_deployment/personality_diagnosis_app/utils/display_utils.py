@@ -1,7 +1,25 @@
-import streamlit as st
-import matplotlib.pyplot as plt
+import base64
+import functools
+import html
+import io
+import os
+from typing import TYPE_CHECKING, Dict, List, Any, Sequence, Tuple
+
 import numpy as np
-from typing import Dict, List, Any
+import streamlit as st
+
+from personality_diagnosis_app.fortune_systems import instrumentation
+from . import svg_chart
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# レーダーチャート画像のキャッシュ件数
+RADAR_CHART_CACHE_SIZE = 128
+
+# レーダーチャートの描画バックエンド（"svg" または "matplotlib"）
+CHART_BACKENDS = ("svg", "matplotlib")
+CHART_BACKEND = os.environ.get("PDA_CHART_BACKEND", "svg")
 
 def display_common_header(title: str):
     """
@@ -10,9 +28,23 @@ def display_common_header(title: str):
     st.markdown(f"## {title}")
     st.markdown("---")
 
-def create_radar_chart(categories: List[str], values: List[float], title: str):
+@functools.lru_cache(maxsize=None)
+def _figure_class():
+    """
+    matplotlibのFigureクラスを取得する
+    importが重いため、matplotlibバックエンドを使う場合のみ読み込む
+    """
+    import matplotlib
+    # サーバー上ではGUIを持たないAggバックエンドで描画する
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    return Figure
+
+def create_radar_chart(categories: Sequence[str], values: Sequence[float], title: str) -> "Figure":
     """
     レーダーチャートを作成する
+    引数のリストは変更しない
+    pyplotの管理下に置かないため、呼び出し側で閉じる必要はなく参照が切れれば解放される
     """
     # カテゴリ数を取得
     N = len(categories)
@@ -20,21 +52,92 @@ def create_radar_chart(categories: List[str], values: List[float], title: str):
     # 角度を計算
     angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
     
-    # 閉じた図形にするため、最初の要素を最後にも追加
-    values.append(values[0])
-    angles.append(angles[0])
-    categories.append(categories[0])
+    # 閉じた図形にするため、最初の要素を最後にも追加した新しいリストを作る
+    closed_values = list(values) + list(values[:1])
+    closed_angles = angles + angles[:1]
+    closed_categories = list(categories) + list(categories[:1])
     
     # プロットの作成
-    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
-    ax.plot(angles, values, 'o-', linewidth=2)
-    ax.fill(angles, values, alpha=0.25)
-    ax.set_thetagrids(np.degrees(angles), categories)
+    fig = _figure_class()(figsize=(8, 8))
+    ax = fig.add_subplot(polar=True)
+    ax.plot(closed_angles, closed_values, 'o-', linewidth=2)
+    ax.fill(closed_angles, closed_values, alpha=0.25)
+    ax.set_thetagrids(np.degrees(closed_angles), closed_categories)
     ax.set_title(title, size=20, y=1.05)
     ax.grid(True)
     
     return fig
 
+@functools.lru_cache(maxsize=RADAR_CHART_CACHE_SIZE)
+def _render_radar_chart(categories: Tuple[str, ...], values: Tuple[float, ...], title: str, fmt: str) -> bytes:
+    """
+    レーダーチャートを画像のバイト列に変換する（キャッシュ付き）
+    """
+    fig = create_radar_chart(categories, values, title)
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, bbox_inches="tight")
+    finally:
+        # 描画後はFigureの内容を破棄してメモリを解放する
+        fig.clear()
+    return buffer.getvalue()
+
+instrumentation.register_cache("display.radar_chart_image", _render_radar_chart)
+instrumentation.register_cache("display.radar_chart_svg", svg_chart._radar_chart_svg)
+
+def render_radar_chart(categories: Sequence[str], values: Sequence[float], title: str = "", fmt: str = "png") -> bytes:
+    """
+    レーダーチャートをPNGまたはSVGのバイト列として取得する
+    同じ値の組み合わせは再描画せずキャッシュを返す
+    
+    Args:
+        categories: 軸のラベル
+        values: 各軸の値
+        title: チャートのタイトル
+        fmt: 出力形式（"png" または "svg"）
+        
+    Returns:
+        画像のバイト列
+    """
+    if fmt not in ("png", "svg"):
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    return _render_radar_chart(tuple(categories), tuple(float(v) for v in values), title, fmt)
+
+def radar_chart_html(chart_data: Dict[str, float], title: str = "", backend: str = None) -> str:
+    """
+    レーダーチャートをHTMLに埋め込める形式で取得する
+    
+    Args:
+        chart_data: 軸名 → 値のチャートデータ
+        title: チャートのタイトル
+        backend: 描画バックエンド（省略時は CHART_BACKEND）
+        
+    Returns:
+        インラインSVG、またはPNGを埋め込んだimg要素
+    """
+    backend = backend or CHART_BACKEND
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"Unsupported chart backend: {backend}")
+    
+    categories, values = chart_data_to_series(chart_data)
+    if backend == "svg":
+        return svg_chart.radar_chart_svg(categories, values, title)
+    
+    return png_image_html(render_radar_chart(categories, values, title, fmt="png"), title)
+
+def png_image_html(png: bytes, alt: str = "") -> str:
+    """
+    PNG画像をHTMLに埋め込めるimg要素に変換する
+    """
+    encoded = base64.b64encode(png).decode("ascii")
+    return f'<img class="radar-chart" src="data:image/png;base64,{encoded}" alt="{html.escape(alt)}">'
+
+def chart_data_to_series(chart_data: Dict[str, float]) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    """
+    チャートデータ（軸名 → 値）を軸ラベルと値のタプルに分解する
+    """
+    return tuple(chart_data.keys()), tuple(float(v) for v in chart_data.values())
+
 def display_personality_traits(traits: Dict[str, Any]):
     """
     性格特性を表示する
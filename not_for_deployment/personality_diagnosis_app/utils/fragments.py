@@ -0,0 +1,78 @@
+import contextlib
+import functools
+from typing import Callable, Iterator
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from personality_diagnosis_app.fortune_systems import instrumentation
+
+# 再実行の範囲（スクリプト全体）
+APP_SCOPE = "app"
+
+# 部分再実行のデコレーター（Streamlit 1.33で experimental_fragment、1.37で fragment として追加）
+# どちらもない版では通常の関数のまま呼び出し、操作のたびにスクリプト全体を再実行する
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def supported() -> bool:
+    """
+    インストールされているStreamlitが部分再実行に対応しているか
+    """
+    return _st_fragment is not None
+
+@contextlib.contextmanager
+def measure(scope: str) -> Iterator[None]:
+    """
+    with文の中で送信した差分（delta）メッセージのバイト数を、再実行の範囲ごとに記録する
+    計測しない場合（instrumentation が無効な場合）は何もしない
+
+    バイト数はフォワードメッセージキャッシュで参照に置き換える前の大きさで数える。
+    範囲が入れ子になっている場合は、外側の範囲にも内側の範囲のバイト数を含める。
+    """
+    ctx = get_script_run_ctx() if instrumentation.enabled else None
+    if ctx is None:
+        yield
+        return
+
+    # 外側の範囲で差し替えた関数（ない場合は ScriptRunContext.enqueue）を呼び出す
+    replaced = vars(ctx).get("enqueue")
+    enqueue = ctx.enqueue
+    sent = 0
+
+    def counting_enqueue(msg):
+        nonlocal sent
+        if msg.WhichOneof("type") == "delta":
+            sent += msg.ByteSize()
+        enqueue(msg)
+
+    ctx.enqueue = counting_enqueue
+    try:
+        yield
+    finally:
+        # st.rerun() などで途中で抜けた場合も、そこまでに送信した分を記録する
+        if replaced is None:
+            del ctx.enqueue
+        else:
+            ctx.enqueue = replaced
+        instrumentation.count_deltas(scope, sent)
+
+def fragment(scope: str) -> Callable[[Callable], Callable]:
+    """
+    関数を部分再実行の単位（フラグメント）にするデコレーター
+
+    フラグメント内のウィジェットを操作した場合は、その関数だけを再実行して差分を送信する。
+    送信した差分のバイト数は scope の名前で記録する。
+
+    Args:
+        scope: 再実行の範囲の名前（計測値のラベル）
+
+    Returns:
+        関数をフラグメントに変換するデコレーター
+    """
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def measured(*args, **kwargs):
+            with measure(scope):
+                return func(*args, **kwargs)
+        return _st_fragment(measured) if _st_fragment is not None else measured
+    return decorate
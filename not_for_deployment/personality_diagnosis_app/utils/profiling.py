@@ -0,0 +1,143 @@
+import collections
+import cProfile
+import datetime
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import streamlit as st
+
+# プロファイルの方式
+CPROFILE = "cprofile"  # 関数ごとの呼び出し回数と時間（.pstats、snakeviz などで表示）
+SAMPLE = "sample"      # 一定間隔でスタックを記録（.collapsed、flamegraph.pl や speedscope で表示）
+MODES = (CPROFILE, SAMPLE)
+
+# 環境変数
+# PDA_PROFILE=cprofile|sample      全ての再実行をプロファイルする（1 は cprofile と同じ）
+# PDA_PROFILE_QUERY=1              URLの ?profile=cprofile|sample で対象の再実行だけをプロファイルできるようにする
+# PDA_PROFILE_DIR                  出力先ディレクトリ
+# PDA_PROFILE_KEEP                 出力先に残すファイル数（古いものから削除）
+_env_mode = os.environ.get("PDA_PROFILE", "").strip().lower()
+ENV_MODE = CPROFILE if _env_mode in ("1", "true", CPROFILE) else (SAMPLE if _env_mode == SAMPLE else None)
+QUERY_ENABLED = os.environ.get("PDA_PROFILE_QUERY", "") == "1"
+PROFILE_DIR = os.environ.get("PDA_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "pda_profiles")
+KEEP_FILES = int(os.environ.get("PDA_PROFILE_KEEP") or 50)
+
+# 出力するファイルの名前（_rotate はこの名前のファイルだけを削除する）
+OUTPUT_PREFIX = "rerun-"
+OUTPUT_EXTENSIONS = (".pstats", ".collapsed")
+
+# スタックを記録する間隔（秒）
+SAMPLE_INTERVAL = 0.001
+
+# cProfileは同時に1つしか有効にできないため、プロファイル中の再実行は1つに限る
+_profile_lock = threading.Lock()
+_sequence = itertools.count()
+
+def requested_mode() -> Optional[str]:
+    """
+    この再実行で使うプロファイルの方式を取得する（プロファイルしない場合はNone）
+    """
+    if ENV_MODE:
+        return ENV_MODE
+    if QUERY_ENABLED:
+        mode = st.query_params.get("profile", "").lower()
+        if mode in ("1", "true"):
+            return CPROFILE
+        if mode in MODES:
+            return mode
+    return None
+
+def _output_path(extension: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{OUTPUT_PREFIX}{timestamp}-{os.getpid()}-{next(_sequence)}{extension}")
+
+def _rotate():
+    """
+    出力先のプロファイルを新しいものから KEEP_FILES 件だけ残す
+    出力先を共有のディレクトリにした場合に備えて、_output_path が書き出した名前の通常のファイル以外は削除しない
+    """
+    try:
+        entries = [entry for entry in os.scandir(PROFILE_DIR)
+                   if entry.name.startswith(OUTPUT_PREFIX) and entry.name.endswith(OUTPUT_EXTENSIONS)
+                   and entry.is_file(follow_symlinks=False)]
+        entries.sort(key=lambda entry: entry.stat(follow_symlinks=False).st_mtime, reverse=True)
+        for entry in entries[KEEP_FILES:]:
+            os.remove(entry.path)
+    except OSError:
+        pass
+
+class StackSampler:
+    """
+    別スレッドから対象スレッドのスタックを一定間隔で記録し、折りたたみ形式（collapsed stacks）で出力する
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def run(main: Callable[[], None]):
+    """
+    main() を実行する
+    プロファイルが要求された再実行のみ計測し、結果を出力先ディレクトリに書き出す
+    st.rerun() などで途中で抜けた場合も、そこまでの結果を書き出す
+    """
+    mode = requested_mode()
+    if mode is None or not _profile_lock.acquire(blocking=False):
+        main()
+        return
+
+    start = time.perf_counter()
+    profiler = cProfile.Profile() if mode == CPROFILE else StackSampler(threading.get_ident())
+    try:
+        if mode == CPROFILE:
+            profiler.runcall(main)
+        else:
+            profiler.start()
+            try:
+                main()
+            finally:
+                profiler.stop()
+    finally:
+        try:
+            if mode == CPROFILE:
+                path = _output_path(".pstats")
+                profiler.dump_stats(path)
+            else:
+                path = _output_path(".collapsed")
+                profiler.write(path)
+            _rotate()
+            print(f"Profiled rerun in {time.perf_counter() - start:.3f}s: {path}", file=sys.stderr)
+        finally:
+            _profile_lock.release()
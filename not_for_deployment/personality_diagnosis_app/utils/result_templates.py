@@ -0,0 +1,188 @@
+import datetime
+import html
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from personality_diagnosis_app.fortune_systems import instrumentation, registry
+from . import chart_assets
+
+# 値が取得できなかった場合の表示
+UNKNOWN = "不明"
+
+class CardField(NamedTuple):
+    """
+    結果カード内の1項目
+    """
+    label: Optional[str]  # ラベル（Noneの場合は値のみ表示）
+    value: str            # 値のフォーマット文字列（診断結果のキーを参照する）
+    glow: bool = False    # 強調表示するかどうか
+
+class CardSpec(NamedTuple):
+    """
+    占術ごとの結果カード定義
+    """
+    key: str
+    title: str
+    column: int
+    fields: Tuple[CardField, ...]
+    chart: Optional[str] = None  # 事前描画したチャートを引くための診断結果のキー
+
+class ResultSection(NamedTuple):
+    """
+    結果セクション全体を描画するための構造化データ
+    """
+    birth_date: datetime.date
+    results: Dict[str, Dict[str, Any]]  # 占術キー → 診断結果
+    errors: Dict[str, str]              # 占術キー → エラーメッセージ
+
+# 組み込みの占術の結果カードの定義（表示順と列は registry の定義に従う）
+CARD_SPECS: Tuple[CardSpec, ...] = (
+    CardSpec("shichuu_suimei", "四柱推命", 0, (
+        CardField("日柱天干", "{ten_kan}", True),
+        CardField("日柱十二運", "{juu_ni_shi}"),
+        CardField("月干の蔵干宿命星", "{tsuhen_sei}"),
+    )),
+    CardSpec("shukuyo", "宿曜", 0, (
+        CardField(None, "{shukuyo}", True),
+    )),
+    CardSpec("onmyo_gogyo", "陰陽五行", 0, (
+        CardField(None, "{gogyo}の{inyo}", True),
+    )),
+    CardSpec("kyusei_kigaku", "九星気学", 1, (
+        CardField("本命星", "{honmei_sei}", True),
+        CardField("月命星", "{getsu_mei_sei}"),
+    )),
+    CardSpec("western_astrology", "西洋占星術", 1, (
+        CardField("太陽", "{sun_sign}", True),
+        CardField("月", "{moon_sign}"),
+    ), chart="sun_sign"),
+    CardSpec("animal_fortune", "動物占い", 1, (
+        CardField(None, "{type}となる{animal}", True),
+    )),
+)
+
+_HEADER_TEMPLATE = (
+    '<div class="result-header result-element">'
+    '<h2>{year}年{month}月{day}日生まれの診断結果</h2>'
+    '</div>'
+    '<div class="section-divider result-element"><span>診断結果</span></div>'
+)
+
+_ERROR_TEMPLATE = '<div class="result-card result-element result-error">{title}データ取得エラー: {message}</div>'
+
+_SHARE_BUTTONS = (
+    '<div class="share-buttons result-element">'
+    '<button class="share-button primary">結果を保存</button>'
+    '<button class="share-button">結果をシェア</button>'
+    '</div>'
+)
+
+def _compile_field(field: CardField) -> str:
+    """
+    カード項目のHTMLテンプレートを組み立てる
+    """
+    label = f'<span class="data-label">{html.escape(field.label)}：</span>' if field.label else ""
+    value_class = "data-value glow" if field.glow else "data-value"
+    return f'<div class="data-point">{label}<span class="{value_class}">{field.value}</span></div>'
+
+def _compile_card(spec: CardSpec) -> str:
+    """
+    結果カードのHTMLテンプレートを組み立てる
+    値以外の部分はここで確定させ、描画時は値の埋め込みのみを行う
+    カードの閉じタグはチャートを差し込めるよう描画時に付与する
+    """
+    fields = "".join(_compile_field(field) for field in spec.fields)
+    return (
+        '<div class="result-card result-element">'
+        f'<div class="result-title">{html.escape(spec.title)}</div>'
+        f'<div class="result-content">{fields}</div>'
+    )
+
+# モジュール読み込み時に一度だけテンプレートを組み立てる
+_CARD_SPECS_BY_KEY: Dict[str, CardSpec] = {spec.key: spec for spec in CARD_SPECS}
+_CARD_TEMPLATES: Dict[str, str] = {spec.key: _compile_card(spec) for spec in CARD_SPECS}
+
+class _EscapedValues(dict):
+    """
+    診断結果をHTMLエスケープして参照するためのマッピング
+    存在しないキーは「不明」として扱う
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__()
+        self._result = result
+
+    def __missing__(self, key: str) -> str:
+        value = self._result.get(key, UNKNOWN)
+        return html.escape(str(value))
+
+def render_card(key: str, result: Dict[str, Any]) -> str:
+    """
+    1つの占術の結果カードを描画する
+    """
+    card = _CARD_TEMPLATES[key].format_map(_EscapedValues(result))
+
+    chart_key = _CARD_SPECS_BY_KEY[key].chart
+    if chart_key and chart_assets.enabled() and result.get(chart_key) in chart_assets.SIGN_SLUGS:
+        card += f'<div class="result-chart">{chart_assets.chart_html(result[chart_key])}</div>'
+
+    return card + '</div>'
+
+def render_plain_card(title: str, result: Dict[str, Any]) -> str:
+    """
+    カードの定義も描画関数もない占術（プラグインなど）の結果カードを描画する
+    文字列と数値の項目だけを「キー：値」で並べる
+    """
+    fields = "".join(
+        f'<div class="data-point"><span class="data-label">{html.escape(str(key))}：</span>'
+        f'<span class="data-value">{html.escape(str(value))}</span></div>'
+        for key, value in result.items() if isinstance(value, (str, int, float))
+    )
+    return (
+        '<div class="result-card result-element">'
+        f'<div class="result-title">{html.escape(title)}</div>'
+        f'<div class="result-content">{fields}</div></div>'
+    )
+
+def render_system_card(entry: registry.SystemEntry, result: Dict[str, Any]) -> str:
+    """
+    占術の結果カードを描画する
+    レジストリに描画関数が登録されていればそれを使い、なければ CARD_SPECS の定義で描画する
+    """
+    renderer = registry.renderer(entry.key)
+    if renderer is not None:
+        return renderer(result)
+    if entry.key in _CARD_TEMPLATES:
+        return render_card(entry.key, result)
+    return render_plain_card(entry.title, result)
+
+def render_error(title: str, message: str) -> str:
+    """
+    エラー表示用のカードを描画する
+    """
+    return _ERROR_TEMPLATE.format(title=html.escape(title), message=html.escape(message))
+
+def render_result_section(section: ResultSection) -> str:
+    """
+    結果セクション全体を1つのHTMLとして描画する
+    """
+    columns: List[List[str]] = [[], []]
+    for entry in registry.enabled():
+        column = columns[entry.column % len(columns)]
+        if entry.key in section.errors:
+            column.append(render_error(entry.title, section.errors[entry.key]))
+        elif entry.key in section.results:
+            column.append(render_system_card(entry, section.results[entry.key]))
+
+    birth_date = section.birth_date
+    html_parts = [
+        _HEADER_TEMPLATE.format(year=birth_date.year, month=birth_date.month, day=birth_date.day),
+        '<div class="result-grid">',
+        *(f'<div class="result-column">{"".join(cards)}</div>' for cards in columns),
+        '</div>',
+        _SHARE_BUTTONS,
+    ]
+    rendered = "".join(html_parts)
+
+    if instrumentation.enabled:
+        instrumentation.observe_size("render", "result_section", len(rendered.encode("utf-8")))
+    return rendered
@@ -0,0 +1,193 @@
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from personality_diagnosis_app.fortune_systems import instrumentation
+
+# 共有する診断結果HTMLの最大件数（参照中のセッションがある結果はこれを超えても保持する）
+MAX_ENTRIES = int(os.environ.get("PDA_RESULT_MEMO_SIZE") or 2048)
+
+# この秒数以上再実行のないセッションは結果への参照を解放する
+IDLE_TIMEOUT = float(os.environ.get("PDA_SESSION_IDLE_TIMEOUT") or 1800)
+
+# アイドルセッションを確認する間隔（秒）
+SWEEP_INTERVAL = 60.0
+
+class CacheInfo(NamedTuple):
+    """
+    functools.lru_cache の cache_info() と同じ形式の統計
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class SessionEntry(NamedTuple):
+    ordinal: int
+    last_seen: float
+    state_bytes: int  # セッション状態の概算サイズ
+
+class SessionMemo:
+    """
+    セッション間で共有する診断結果HTMLのキャッシュ
+    各セッションは生年月日の序数だけを保持し、結果HTMLはこのキャッシュから参照する
+    参照中のセッションがない結果から古い順に破棄し、一定時間再実行のないセッションの参照は解放する
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, idle_timeout: float = IDLE_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evicted_sessions = 0
+        self._results: "collections.OrderedDict[int, str]" = collections.OrderedDict()
+        self._sessions: Dict[str, SessionEntry] = {}
+        self._pins: Dict[int, int] = {}
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, ordinal: int, render: Callable[[int], Tuple[str, bool]],
+            state_bytes: int = 0) -> str:
+        """
+        セッションの結果HTMLを取得する（キャッシュにない場合は render(ordinal) で作成する）
+
+        Args:
+            session_id: セッションID
+            ordinal: 生年月日の序数
+            render: 序数から (結果HTML, キャッシュしてよいか) を作成する関数
+                    （一時的なエラーを含む結果は全セッションで共有しないよう、False を返す）
+            state_bytes: セッション状態の概算サイズ（計測用）
+
+        Returns:
+            結果HTML
+        """
+        now = self.clock()
+        with self._lock:
+            self._touch(session_id, ordinal, now, state_bytes)
+            rendered = self._results.get(ordinal)
+            if rendered is not None:
+                self.hits += 1
+                self._results.move_to_end(ordinal)
+            else:
+                self.misses += 1
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+        if rendered is None:
+            # 描画はロックの外で行い、他のセッションを待たせない
+            rendered, cacheable = render(ordinal)
+            if not cacheable:
+                return rendered
+            with self._lock:
+                rendered = self._results.setdefault(ordinal, rendered)
+                self._trim()
+        return rendered
+
+    def release(self, session_id: str):
+        """
+        セッションの結果への参照を解放する
+        """
+        with self._lock:
+            self._drop(session_id)
+            self._trim()
+
+    def sweep(self) -> int:
+        """
+        一定時間再実行のないセッションの参照を解放する
+
+        Returns:
+            解放したセッション数
+        """
+        with self._lock:
+            return self._sweep(self.clock())
+
+    def _touch(self, session_id: str, ordinal: int, now: float, state_bytes: int):
+        previous = self._sessions.get(session_id)
+        if previous is not None and previous.ordinal != ordinal:
+            self._unpin(previous.ordinal)
+        if previous is None or previous.ordinal != ordinal:
+            self._pins[ordinal] = self._pins.get(ordinal, 0) + 1
+        self._sessions[session_id] = SessionEntry(ordinal, now, state_bytes)
+
+    def _unpin(self, ordinal: int):
+        count = self._pins.get(ordinal, 0) - 1
+        if count > 0:
+            self._pins[ordinal] = count
+        else:
+            self._pins.pop(ordinal, None)
+
+    def _drop(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._unpin(entry.ordinal)
+
+    def _sweep(self, now: float) -> int:
+        self._next_sweep = now + SWEEP_INTERVAL
+        idle = [sid for sid, entry in self._sessions.items() if now - entry.last_seen >= self.idle_timeout]
+        for session_id in idle:
+            self._drop(session_id)
+        self.evicted_sessions += len(idle)
+        self._trim()
+        return len(idle)
+
+    def _trim(self):
+        excess = len(self._results) - self.max_entries
+        if excess <= 0:
+            return
+        for ordinal in [o for o in self._results if o not in self._pins][:excess]:
+            del self._results[ordinal]
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.max_entries, len(self._results))
+
+    def stats(self) -> Dict[str, float]:
+        """
+        セッションと共有キャッシュのメモリ使用量の概算
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "session_state_bytes": sum(entry.state_bytes for entry in self._sessions.values()),
+                "evicted_sessions": self.evicted_sessions,
+                "results": len(self._results),
+                "result_bytes": sum(sys.getsizeof(rendered) for rendered in self._results.values()),
+            }
+
+memo = SessionMemo()
+
+instrumentation.register_cache("session.result_html", memo)
+instrumentation.register_gauge("pda_sessions", "Sessions holding a result reference.",
+                               lambda: memo.stats()["sessions"])
+instrumentation.register_gauge("pda_session_state_bytes", "Approximate session_state size summed over sessions.",
+                               lambda: memo.stats()["session_state_bytes"])
+instrumentation.register_counter("pda_session_evictions_total", "Idle sessions whose result reference was released.",
+                                 lambda: memo.stats()["evicted_sessions"])
+instrumentation.register_gauge("pda_result_memo_bytes", "Approximate size of the shared result HTML cache.",
+                               lambda: memo.stats()["result_bytes"])
+
+def current_session_id() -> str:
+    """
+    実行中のセッションIDを取得する（Streamlitの外で実行した場合は空文字列）
+    """
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
+def state_size(state) -> int:
+    """
+    セッション状態の概算サイズ（キーと値の浅いサイズの合計）
+    """
+    return sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in state.items())
+
+def result_html(ordinal: int, render: Callable[[int], Tuple[str, bool]], state: Optional[Dict] = None) -> str:
+    """
+    実行中のセッションの結果HTMLを共有キャッシュから取得する
+    """
+    return memo.get(current_session_id(), ordinal, render, state_size(state) if state is not None else 0)
@@ -0,0 +1,44 @@
+import functools
+import hashlib
+import os
+from typing import Dict
+
+import streamlit.components.v1 as components
+
+# 静的アセットのディレクトリ（CSS・パーティクル・ブートストラップHTML）
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+# 同梱フォント（Noto Sans JP のサブセット、tools/build_font_subset.py で作成）
+FONT_FILE = "fonts/noto-sans-jp-subset.woff2"
+
+# アセットディレクトリ全体を1つのコンポーネントとして配信する
+# ファイルはStreamlitのコンポーネント配信経由で読み込まれるため、外部CDNへの通信は発生しない
+_static_assets = components.declare_component("static_assets", path=STATIC_DIR)
+
+@functools.lru_cache(maxsize=None)
+def asset_path(filename: str) -> str:
+    """
+    コンテンツハッシュ付きのアセットパスを取得する
+    ファイル内容が変わった場合のみURLが変わるため、ブラウザキャッシュを有効に使える
+    """
+    with open(os.path.join(STATIC_DIR, filename), "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"{filename}?v={digest}"
+
+def asset_manifest(particles: bool = True) -> Dict[str, str]:
+    """
+    コンポーネントに渡すアセットの一覧を取得する
+    """
+    manifest = {"css": asset_path("app.css"), "font": asset_path(FONT_FILE)}
+    if particles:
+        manifest["particles_js"] = asset_path("particles.js")
+        manifest["particles_config"] = asset_path("particles.json")
+    return manifest
+
+def inject_static_assets(particles: bool = True):
+    """
+    CSS・フォント・パーティクルを親ページに読み込む
+    毎回のリランで送信されるのはハッシュ付きファイル名のみで、
+    実際の読み込みはブラウザ側で一度だけ行われる
+    """
+    _static_assets(key="static_assets", default=None, **asset_manifest(particles))
@@ -0,0 +1,99 @@
+import functools
+import html
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# チャートの描画サイズ（viewBox単位）
+SIZE = 240
+CENTER = SIZE / 2
+RADIUS = 80
+LABEL_RADIUS = RADIUS + 22
+
+# 目盛りの段数
+GRID_LEVELS = 4
+
+# 配色（static/app.css の配色に合わせる）
+FILL_COLOR = "#6C63FF"
+STROKE_COLOR = "#6EC5FF"
+GRID_COLOR = "rgba(255,255,255,0.15)"
+LABEL_COLOR = "#E8F3F6"
+
+def _unit_vectors(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    各軸の方向ベクトルを取得する（最初の軸を真上に置き、時計回りに並べる）
+    """
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False) - np.pi / 2
+    return np.cos(angles), np.sin(angles)
+
+def _points(xs: np.ndarray, ys: np.ndarray) -> str:
+    """
+    座標配列をSVGのpoints属性の文字列に変換する
+    """
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs.tolist(), ys.tolist()))
+
+@functools.lru_cache(maxsize=256)
+def _radar_chart_svg(categories: Tuple[str, ...], values: Tuple[float, ...], title: str, max_value: float) -> str:
+    """
+    レーダーチャートのSVGを生成する（キャッシュ付き）
+    """
+    cos, sin = _unit_vectors(len(categories))
+
+    # 目盛りの多角形（全段をまとめて計算）
+    levels = np.arange(1, GRID_LEVELS + 1)[:, None] / GRID_LEVELS * RADIUS
+    grid_x = CENTER + levels * cos
+    grid_y = CENTER + levels * sin
+    grid = "".join(
+        f'<polygon points="{_points(gx, gy)}" fill="none" stroke="{GRID_COLOR}"/>'
+        for gx, gy in zip(grid_x, grid_y)
+    )
+
+    # 軸線
+    axes = "".join(
+        f'<line x1="{CENTER}" y1="{CENTER}" x2="{x:.1f}" y2="{y:.1f}" stroke="{GRID_COLOR}"/>'
+        for x, y in zip(grid_x[-1].tolist(), grid_y[-1].tolist())
+    )
+
+    # 値の多角形
+    radii = np.clip(np.asarray(values, dtype=float) / max_value, 0, 1) * RADIUS
+    data_x = CENTER + radii * cos
+    data_y = CENTER + radii * sin
+    polygon = (
+        f'<polygon points="{_points(data_x, data_y)}" fill="{FILL_COLOR}" fill-opacity="0.25" '
+        f'stroke="{STROKE_COLOR}" stroke-width="2"/>'
+    )
+    dots = "".join(
+        f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{STROKE_COLOR}"/>'
+        for x, y in zip(data_x.tolist(), data_y.tolist())
+    )
+
+    # 軸ラベル
+    label_x = CENTER + LABEL_RADIUS * cos
+    label_y = CENTER + LABEL_RADIUS * sin
+    labels = "".join(
+        f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="middle" dominant-baseline="middle">{html.escape(c)}</text>'
+        for x, y, c in zip(label_x.tolist(), label_y.tolist(), categories)
+    )
+
+    title_markup = f"<title>{html.escape(title)}</title>" if title else ""
+    return (
+        f'<svg class="radar-chart" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SIZE} {SIZE}" role="img">'
+        f'{title_markup}{grid}{axes}{polygon}{dots}'
+        f'<g fill="{LABEL_COLOR}" font-size="11">{labels}</g>'
+        '</svg>'
+    )
+
+def radar_chart_svg(categories: Sequence[str], values: Sequence[float], title: str = "", max_value: float = 10.0) -> str:
+    """
+    matplotlibを使わずにレーダーチャートをSVG文字列として生成する
+
+    Args:
+        categories: 軸のラベル
+        values: 各軸の値
+        title: チャートのタイトル
+        max_value: 軸の最大値
+
+    Returns:
+        インライン表示用のSVG文字列
+    """
+    return _radar_chart_svg(tuple(categories), tuple(float(v) for v in values), title, float(max_value))
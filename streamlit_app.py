@@ -17,8 +17,9 @@ import streamlit.components.v1 as components
 
 # personality_diagnosis_appディレクトリをパスに追加
 current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, current_dir)
-sys.path.insert(0, os.path.join(current_dir, "personality_diagnosis_app"))
+app_root = os.path.join(current_dir, "not_for_deployment")
+sys.path.insert(0, app_root)
+sys.path.insert(0, os.path.join(app_root, "personality_diagnosis_app"))
 
 # 相対インポートを使用
 try:
@@ -31,6 +32,9 @@ except ImportError as e:
     result = subprocess.run(['pip', 'list'], capture_output=True, text=True)
     st.code(result.stdout)
 
+# 静的アセットとプロファイラーはこのファイルの main で使うため、失敗した場合はそのまま例外にする
+from personality_diagnosis_app.utils import profiling, static_assets
+
 # ディレクトリ情報を表示（デバッグ用）
 current_dir = os.path.dirname(os.path.abspath(__file__))
 st.sidebar.write("現在のディレクトリ:", current_dir)
@@ -42,241 +46,6 @@ if "personality_diagnosis_app" in os.listdir(current_dir):
 # システムパスにアプリケーションディレクトリを追加（デバッグ用）
 st.sidebar.write("システムパス:", sys.path)
 
-# カスタムCSS
-def load_css():
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@300;400;500;700&display=swap');
-    
-    :root {
-        --primary: #6C63FF;
-        --secondary: #6EC5FF;
-        --accent: #FF6584;
-        --background: #111132;
-        --text: #E8F3F6;
-        --card-bg: rgba(18, 18, 60, 0.6);
-        --card-border: rgba(108, 99, 255, 0.3);
-    }
-    
-    html, body, [class*="css"] {
-        font-family: 'Noto Sans JP', sans-serif;
-        color: var(--text);
-    }
-    
-    .stApp {
-        background: linear-gradient(135deg, var(--background), #232351);
-    }
-    
-    /* カスタムフォントヘッダー */
-    h1, h2, h3, h4 {
-        font-family: 'Noto Sans JP', sans-serif;
-        font-weight: 700;
-        color: white;
-        text-shadow: 0 2px 15px rgba(108, 99, 255, 0.4);
-    }
-    
-    h1 {
-        font-size: 3rem !important;
-        letter-spacing: -0.5px;
-        background: linear-gradient(to right, #FFFFFF, #6EC5FF);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 0 !important;
-    }
-    
-    h2 {
-        font-size: 1.8rem !important;
-        opacity: 0.9;
-    }
-    
-    h3 {
-        font-size: 1.5rem !important;
-        color: white;
-        margin-top: 2rem !important;
-    }
-    
-    /* 診断ボタン */
-    .stButton>button {
-        background: linear-gradient(135deg, var(--primary), var(--secondary));
-        color: white;
-        border: none;
-        padding: 0.6rem 2rem;
-        border-radius: 50px;
-        font-weight: 500;
-        font-size: 1.1rem;
-        box-shadow: 0 6px 15px rgba(108, 99, 255, 0.4);
-        transition: all 0.3s ease;
-        width: 100%;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 10px 25px rgba(108, 99, 255, 0.6);
-    }
-    
-    .stButton>button:active {
-        transform: translateY(0);
-    }
-    
-    /* 日付入力 */
-    .date-picker-container {
-        background: var(--card-bg);
-        border: 1px solid var(--card-border);
-        border-radius: 18px;
-        padding: 20px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-        margin-bottom: 20px;
-    }
-    
-    /* 結果カード */
-    .result-card {
-        background: var(--card-bg);
-        border: 1px solid var(--card-border);
-        border-radius: 18px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .result-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(to right, var(--primary), var(--secondary));
-        border-radius: 18px 18px 0 0;
-    }
-    
-    .result-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.3);
-    }
-    
-    .result-title {
-        font-size: 1.4rem;
-        font-weight: 700;
-        margin-bottom: 15px;
-        padding-bottom: 15px;
-        border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        color: white;
-    }
-    
-    .result-content {
-        font-size: 1.1rem;
-        color: rgba(255, 255, 255, 0.9);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# パーティクルアニメーション用JS
-def add_particles():
-    particles_js = """
-    <div class="particles-container" id="particles-js"></div>
-    <script src="https://cdn.jsdelivr.net/particles.js/2.0.0/particles.min.js"></script>
-    <script>
-        document.addEventListener("DOMContentLoaded", function() {
-            particlesJS("particles-js", {
-                "particles": {
-                    "number": {
-                        "value": 80,
-                        "density": {
-                            "enable": true,
-                            "value_area": 800
-                        }
-                    },
-                    "color": {
-                        "value": ["#6C63FF", "#6EC5FF", "#A594F9"]
-                    },
-                    "shape": {
-                        "type": "circle",
-                        "stroke": {
-                            "width": 0,
-                            "color": "#000000"
-                        }
-                    },
-                    "opacity": {
-                        "value": 0.3,
-                        "random": true,
-                        "anim": {
-                            "enable": true,
-                            "speed": 1,
-                            "opacity_min": 0.1,
-                            "sync": false
-                        }
-                    },
-                    "size": {
-                        "value": 3,
-                        "random": true,
-                        "anim": {
-                            "enable": true,
-                            "speed": 2,
-                            "size_min": 0.1,
-                            "sync": false
-                        }
-                    },
-                    "line_linked": {
-                        "enable": true,
-                        "distance": 150,
-                        "color": "#6C63FF",
-                        "opacity": 0.2,
-                        "width": 1
-                    },
-                    "move": {
-                        "enable": true,
-                        "speed": 1,
-                        "direction": "none",
-                        "random": true,
-                        "straight": false,
-                        "out_mode": "out",
-                        "bounce": false,
-                        "attract": {
-                            "enable": false,
-                            "rotateX": 600,
-                            "rotateY": 1200
-                        }
-                    }
-                },
-                "interactivity": {
-                    "detect_on": "canvas",
-                    "events": {
-                        "onhover": {
-                            "enable": true,
-                            "mode": "grab"
-                        },
-                        "onclick": {
-                            "enable": true,
-                            "mode": "push"
-                        },
-                        "resize": true
-                    },
-                    "modes": {
-                        "grab": {
-                            "distance": 140,
-                            "line_linked": {
-                                "opacity": 0.4
-                            }
-                        },
-                        "push": {
-                            "particles_nb": 4
-                        }
-                    }
-                },
-                "retina_detect": true
-            });
-        });
-    </script>
-    """
-    st.markdown(particles_js, unsafe_allow_html=True)
-
 # 分析アニメーション
 def show_analysis_animation():
     animation_html = """
@@ -497,8 +266,7 @@ def main():
         st.session_state.birth_date = None
     
     # CSSとパーティクルの読み込み
-    load_css()
-    add_particles()
+    static_assets.inject_static_assets()
     
     # ヘッダー
     st.markdown('<h1>性格診断システム</h1>', unsafe_allow_html=True)
@@ -549,7 +317,7 @@ def main():
 # アプリケーションの実行
 if __name__ == "__main__":
     try:
-        main()
+        profiling.run(main)
     except Exception as e:
         st.error(f"エラーが発生しました: {e}")
         st.write("ディレクトリ構造:")